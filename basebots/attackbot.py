@@ -28,6 +28,10 @@ class AttackBot(sc2.BotAI, WaitBot):
             self.attack_enemy_start,
             self.attack_known_enemy_unit
         ]
+        # predictions run on an InferenceService; one too late for its
+        # timeout falls back to this choice
+        self.inference = None
+        self.fallback_choice = 0
 
     async def attack(self, monitor, use_model) -> [np.array, np.array]:
         """
@@ -37,8 +41,9 @@ class AttackBot(sc2.BotAI, WaitBot):
         if len(self.units(VOIDRAY).idle) > 0:
 
             if self.minute > self.do_something_after:
-                flipped = monitor.get_flipped()
+                flipped = None
                 if use_model:
+                    flipped = monitor.get_flipped()
                     choice = await self.predict_attack_choice(flipped)
                 else:
                     choice = random.randrange(0, 4)
@@ -49,13 +54,15 @@ class AttackBot(sc2.BotAI, WaitBot):
                 choice_array = np.zeros(4)
                 choice_array[choice] = 1
                 # Training data consits of two tensors, which are random choice
-                # array(1*4) and game_data map(176*200*3)
-                return [choice_array, flipped]
+                # array(1*4) and game_data map(176*200*3), or a unit record
+                # which is rasterized into that map while training
+                return [choice_array, self.observe(monitor, flipped)]
             return None
 
     async def predict_attack_choice(self, flipped) -> int:
-        prediction = self.model.predict([flipped.reshape([-1, 176, 200, 3])])
-        choice = np.argmax(prediction[0])
+        prediction = await self.inference.predict(flipped.reshape((-1,) + self.monitor.spec.shape),
+                                                  self.monitor.resources)
+        choice = self.fallback_choice if prediction is None else np.argmax(prediction[0])
         logger.debug(f'Attack Choice #{choice}:{self.attack_choice_dict[choice]}')
         return choice
 
@@ -35,6 +35,7 @@ class FullChoiceBot(AttackBot, BuildBot, ExpandBot, ScoutBot, DataBot):
             (self.expand, 'expand'),
             (self.do_nothing, 'do_nothing')
         ]
+        self.fallback_choice = 13
 
     async def on_step(self, iteration):
         """
@@ -52,9 +53,12 @@ class FullChoiceBot(AttackBot, BuildBot, ExpandBot, ScoutBot, DataBot):
 
     async def do_something(self):
         if self.minute > self.do_something_after:
+            flipped = None
             if self.use_model:
-                prediction = self.model.predict([self.monitor.flipped.reshape([-1, 176, 200, 3])])
-                choice = np.argmax(prediction[0])
+                flipped = self.monitor.get_flipped()
+                prediction = await self.inference.predict(flipped.reshape((-1,) + self.monitor.spec.shape),
+                                                          self.monitor.resources)
+                choice = self.fallback_choice if prediction is None else np.argmax(prediction[0])
             else:
                 choice = random.randrange(0, 14)
 
@@ -65,8 +69,8 @@ class FullChoiceBot(AttackBot, BuildBot, ExpandBot, ScoutBot, DataBot):
 
             choice_array = np.zeros(14)
             choice_array[choice] = 1
-            new_data = [choice_array, self.monitor.flipped]
-            self.train_data.append(new_data)
+            new_data = [choice_array, self.observe(self.monitor, flipped)]
+            self.append_data(new_data)
             return new_data
 
     async def do_nothing(self):
@@ -1,10 +1,28 @@
+from ..datasets import ReplayBuffer
+from ..monitors import UnitRecord
+
+# latest decisions kept in memory, about 100 MB of chromatic frames
+REPLAY_CAPACITY = 1000
+
+
 class DataBot:
-    def __init__(self):
-        self.train_data = list()
+    def __init__(self, capacity=REPLAY_CAPACITY):
+        self.train_data = ReplayBuffer(capacity)
+        self.record_units = False
 
     def append_data(self, data):
-        if data is not None:
+        # unit records have no fixed shape; they are only streamed to disk
+        if data is not None and not UnitRecord.is_record(data[1]):
             self.train_data.append(data)
 
     def get_data(self):
         return self.train_data
+
+    def observe(self, monitor, flipped=None):
+        """
+        return what is stored for a decision: a compact unit record if
+        record_units is set, otherwise the flipped frame
+        """
+        if self.record_units:
+            return monitor.get_record()
+        return flipped if flipped is not None else monitor.get_flipped()
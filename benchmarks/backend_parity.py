@@ -0,0 +1,69 @@
+"""
+check that the NumPy backend picks the same choices as keras: export a model,
+saved or freshly initialized, predict random frames with both and compare
+argmax, largest probability difference and latency; exits with 1 on a
+mismatch
+
+$ python -m yuri.benchmarks.backend_parity [--model <model path>] [--type attack | full] [--frames 20]
+"""
+import sys
+import time
+import argparse
+import tempfile
+
+from ..inference.export import export_model
+from ..inference.keras_backend import KerasBackend
+from ..models import AttackCNNModel, FullCNNModel, load_spec
+from ..observation import CHROMATIC_SPEC, MONOCHROME_SPEC
+
+import numpy as np
+from keras.models import load_model
+
+
+def timed_predict(backend, x):
+    start = time.perf_counter()
+    prediction = np.concatenate([backend.predict(x[i:i + 1]) for i in range(len(x))])
+    return prediction, (time.perf_counter() - start) / len(x)
+
+
+def compare(model, spec, frames_num, seed=0):
+    rng = np.random.RandomState(seed)
+    x = rng.randint(0, 256, (frames_num,) + spec.shape).astype(np.uint8)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        numpy_backend = export_model(model, f'{tmp_dir}/model.npz', spec)
+    keras_prediction, keras_seconds = timed_predict(KerasBackend(model), x)
+    numpy_prediction, numpy_seconds = timed_predict(numpy_backend, x)
+    return {
+        'frames': frames_num,
+        'argmax_matches': int(np.sum(keras_prediction.argmax(1) == numpy_prediction.argmax(1))),
+        'max_abs_diff': float(np.abs(keras_prediction - numpy_prediction).max()),
+        'keras_ms': keras_seconds * 1000,
+        'numpy_ms': numpy_seconds * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='backend_parity.py')
+    parser.add_argument('--model', help='saved keras model, a freshly initialized one by default')
+    parser.add_argument('--type', choices=['attack', 'full'], default='attack')
+    parser.add_argument('--frames', type=int, default=20)
+    cmd_args = parser.parse_args()
+
+    if cmd_args.model is not None:
+        model = load_model(cmd_args.model)
+        spec = load_spec(cmd_args.model) or (CHROMATIC_SPEC if cmd_args.type == 'attack' else MONOCHROME_SPEC)
+    elif cmd_args.type == 'attack':
+        spec = CHROMATIC_SPEC
+        model = AttackCNNModel(spec).init().get_model()
+    else:
+        spec = MONOCHROME_SPEC
+        model = FullCNNModel(spec).init().get_model()
+
+    result = compare(model, spec, cmd_args.frames)
+    print(result)
+    if result['argmax_matches'] != result['frames']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
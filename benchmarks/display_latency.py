@@ -0,0 +1,62 @@
+"""
+step latency of drawing a monitor with the window refreshed inline, through
+the display worker, and headless; needs a desktop session for the window
+
+$ python -m yuri.benchmarks.display_latency [--units 200] [--steps 300] [--simulate-refresh <ms>]
+
+--simulate-refresh replaces the window refresh by resizing the frame as
+show() does and sleeping that long, for machines without a display
+"""
+import time
+import asyncio
+import argparse
+
+from .fixtures import make_bot
+from ..monitors import ChromaticMonitor
+
+import cv2
+import numpy as np
+
+
+def simulated_show(seconds):
+    def show(title, flipped):
+        cv2.resize(flipped, dsize=None, fx=2, fy=2)
+        time.sleep(seconds)
+    return show
+
+
+def measure(mode, unit_num=200, steps=300, simulate_refresh=None):
+    loop = asyncio.get_event_loop()
+    bot = make_bot(unit_num)
+    monitor = ChromaticMonitor(headless=(mode != 'worker'))
+    show = monitor.show if simulate_refresh is None else simulated_show(simulate_refresh / 1000)
+    if monitor.display is not None:
+        monitor.display.show = show
+
+    latencies = list()
+    for _ in range(steps):
+        bot.jitter()
+        start = time.perf_counter()
+        loop.run_until_complete(monitor.draw(bot))
+        if mode == 'inline':
+            show(bot.title, monitor.refresh())
+        latencies.append(time.perf_counter() - start)
+    monitor.close()
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {'mode': mode, 'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99,
+            **monitor.get_render_stats()}
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='display_latency.py')
+    parser.add_argument('--units', type=int, default=200)
+    parser.add_argument('--steps', type=int, default=300)
+    parser.add_argument('--simulate-refresh', type=float, help='milliseconds a simulated window refresh takes')
+    cmd_args = parser.parse_args()
+    for mode in ('inline', 'worker', 'headless'):
+        print(measure(mode, cmd_args.units, cmd_args.steps, cmd_args.simulate_refresh))
+
+
+if __name__ == '__main__':
+    main()
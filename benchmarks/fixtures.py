@@ -0,0 +1,131 @@
+"""
+synthetic stand-ins for python-sc2 game state so monitors and bots can be
+benchmarked offline
+"""
+import random
+
+from ..datasets import EpisodeWriter
+
+import numpy as np
+from sc2.constants import NEXUS, PROBE, PYLON, ASSIMILATOR, GATEWAY, \
+    CYBERNETICSCORE, STARGATE, VOIDRAY, OBSERVER, ROBOTICSFACILITY, \
+    SCV, ZEALOT, MARINE
+
+MAP_SIZE = (200, 176)
+
+OWN_TYPES = [
+    (NEXUS, 2.75), (PYLON, 1.0), (PROBE, 0.375), (ASSIMILATOR, 1.75),
+    (OBSERVER, 0.5), (GATEWAY, 1.75), (CYBERNETICSCORE, 1.75),
+    (ROBOTICSFACILITY, 1.75), (STARGATE, 1.75), (VOIDRAY, 1.0)
+]
+ENEMY_TYPES = [
+    (NEXUS, 2.75, True), (GATEWAY, 1.75, True), (PROBE, 0.375, False),
+    (SCV, 0.375, False), (ZEALOT, 0.5, False), (MARINE, 0.375, False)
+]
+
+
+def game_point(x, y):
+    """
+    the game reports positions as 32-bit floats
+    """
+    return float(np.float32(x)), float(np.float32(y))
+
+
+class FakeUnit:
+
+    def __init__(self, tag, type_id, name, position, radius, is_structure=False):
+        self.tag = tag
+        self.type_id = type_id
+        self.name = name
+        self.position = position
+        self.radius = radius
+        self.is_structure = is_structure
+        self.is_ready = True
+
+
+class FakeUnits(list):
+
+    @property
+    def ready(self):
+        return self
+
+    @property
+    def idle(self):
+        return self
+
+    @property
+    def amount(self):
+        return len(self)
+
+
+class FakeGameInfo:
+
+    def __init__(self, map_size):
+        self.map_size = map_size
+
+
+class FakeBot:
+    """
+    the subset of sc2.BotAI read by the monitors
+    """
+
+    def __init__(self, own_units, enemy_units, map_size=MAP_SIZE, title='bench'):
+        self.title = title
+        self.game_info = FakeGameInfo(map_size)
+        self.own_units = FakeUnits(own_units)
+        self.known_enemy_units = FakeUnits(enemy_units)
+        self.known_enemy_structures = FakeUnits(u for u in enemy_units if u.is_structure)
+        self.minerals = 800
+        self.vespene = 300
+        self.supply_left = 12
+        self.supply_cap = 60
+
+    def units(self, unit_type=None):
+        if unit_type is None:
+            return self.own_units
+        return FakeUnits(u for u in self.own_units if u.type_id == unit_type)
+
+    def jitter(self, fraction=0.1, step=1.0):
+        """
+        move a fraction of the units a little, like consecutive game steps do
+        """
+        width, height = self.game_info.map_size
+        for unit in self.own_units + self.known_enemy_units:
+            if random.random() < fraction:
+                x = min(max(unit.position[0] + random.uniform(-step, step), 0), width - 1)
+                y = min(max(unit.position[1] + random.uniform(-step, step), 0), height - 1)
+                unit.position = game_point(x, y)
+
+
+def make_bot(unit_num, enemy_ratio=0.3, map_size=MAP_SIZE, seed=0):
+    """
+    build a bot with unit_num units scattered over the map
+    """
+    rng = random.Random(seed)
+    width, height = map_size
+    own_units, enemy_units = list(), list()
+    for tag in range(unit_num):
+        position = game_point(rng.uniform(0, width - 1), rng.uniform(0, height - 1))
+        if rng.random() < enemy_ratio:
+            type_id, radius, is_structure = rng.choice(ENEMY_TYPES)
+            enemy_units.append(
+                FakeUnit(tag, type_id, type_id.name.lower(), position, radius, is_structure)
+            )
+        else:
+            type_id, radius = rng.choice(OWN_TYPES)
+            own_units.append(FakeUnit(tag, type_id, type_id.name.lower(), position, radius))
+    return FakeBot(own_units, enemy_units, map_size)
+
+
+def write_game_files(data_dir, files_num, samples_per_file, frame_shape, num_choices=4, seed=0):
+    """
+    write files_num game files of random frames and choices, as the game does
+    """
+    rng = np.random.RandomState(seed)
+    for i in range(files_num):
+        writer = EpisodeWriter(data_dir, chunk_size=samples_per_file, name=f'bench{i:05d}')
+        for _ in range(samples_per_file):
+            choice_array = np.zeros(num_choices)
+            choice_array[rng.randint(num_choices)] = 1
+            writer.append([choice_array, rng.randint(0, 256, frame_shape, np.uint8)])
+        writer.commit()
@@ -0,0 +1,100 @@
+"""
+step latency of the attack bot's decisions with predictions inline and on the
+inference service, and how late a heartbeat task on the same event loop, like
+python-sc2's websocket handling, gets meanwhile
+
+$ python -m yuri.benchmarks.inference_latency [--steps 200] [--timeout <ms>] [--stand-in <ms>]
+
+--stand-in replaces the CNN by a model sleeping that long outside the GIL, as
+a TensorFlow session run does, for machines without TensorFlow
+"""
+import time
+import asyncio
+import argparse
+
+from .fixtures import make_bot
+from ..inference import InferenceService
+from ..monitors import ChromaticMonitor
+from ..observation import CHROMATIC_SPEC
+
+import numpy as np
+
+HEARTBEAT_INTERVAL = 0.005
+
+
+class StandInModel:
+
+    def __init__(self, seconds, num_choices=4):
+        self.seconds = seconds
+        self.num_choices = num_choices
+
+    def predict(self, x):
+        time.sleep(self.seconds)
+        return np.ones((len(x), self.num_choices)) / self.num_choices
+
+
+def make_model(stand_in):
+    if stand_in is not None:
+        return StandInModel(stand_in / 1000)
+    from ..inference.keras_backend import KerasBackend
+    from ..models import AttackCNNModel
+    return KerasBackend(AttackCNNModel(CHROMATIC_SPEC).init().get_model())
+
+
+async def heartbeat(lags, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        lags.append(time.perf_counter() - start - HEARTBEAT_INTERVAL)
+
+
+async def play(service, steps):
+    bot = make_bot(200)
+    monitor = ChromaticMonitor(headless=True)
+    latencies, lags, stop = list(), list(), asyncio.Event()
+    beat = asyncio.ensure_future(heartbeat(lags, stop))
+    for _ in range(steps):
+        bot.jitter()
+        start = time.perf_counter()
+        await monitor.draw(bot)
+        await service.predict(monitor.get_flipped().reshape((-1,) + CHROMATIC_SPEC.shape))
+        latencies.append(time.perf_counter() - start)
+        # let the heartbeat run between steps, as the game does
+        await asyncio.sleep(0)
+    stop.set()
+    await beat
+    return latencies, lags
+
+
+def measure(model, threaded, steps, timeout=None):
+    service = InferenceService(model, timeout, threaded)
+    # the first prediction builds the graph
+    service.run(np.zeros((1,) + CHROMATIC_SPEC.shape, np.uint8))
+    service.latencies.clear()
+    latencies, lags = asyncio.get_event_loop().run_until_complete(play(service, steps))
+    service.close()
+    p50, p95, p99 = (np.percentile(latencies, [50, 95, 99]) * 1000).tolist()
+    return {
+        'inference': 'threaded' if threaded else 'inline',
+        'step_p50_ms': p50, 'step_p95_ms': p95, 'step_p99_ms': p99,
+        'heartbeat_max_lag_ms': max(lags, default=0) * 1000,
+        'heartbeats': len(lags),
+        **service.get_stats()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='inference_latency.py')
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--timeout', type=float, help='milliseconds')
+    parser.add_argument('--stand-in', type=float, help='milliseconds a stand-in prediction takes')
+    cmd_args = parser.parse_args()
+
+    model = make_model(cmd_args.stand_in)
+    timeout = cmd_args.timeout / 1000 if cmd_args.timeout is not None else None
+    for threaded in (False, True):
+        print(measure(model, threaded, cmd_args.steps, timeout))
+
+
+if __name__ == '__main__':
+    main()
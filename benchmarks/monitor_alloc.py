@@ -0,0 +1,66 @@
+"""
+per-step allocation of the monitor frame path
+
+$ python -m yuri.benchmarks.monitor_alloc
+"""
+import asyncio
+import tracemalloc
+
+from .fixtures import make_bot
+from ..monitors import ChromaticMonitor, MonochromeMonitor
+
+import cv2
+import numpy as np
+
+
+def legacy_frame_path(bot, gray):
+    """
+    the allocations the monitors used to make every step: a fresh canvas,
+    a flipped copy and, for monochrome, a gray copy
+    """
+    game_data = np.zeros((bot.game_info.map_size[1], bot.game_info.map_size[0], 3), np.uint8)
+    if gray:
+        game_data = cv2.cvtColor(game_data, cv2.COLOR_BGR2GRAY)
+    return cv2.flip(game_data, 0)
+
+
+def traced_peak(func):
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def measure(monitor_class, unit_num=200, steps=50):
+    loop = asyncio.get_event_loop()
+    bot = make_bot(unit_num)
+    monitor = monitor_class(headless=True)
+    gray = monitor_class is MonochromeMonitor
+
+    def draw_step():
+        loop.run_until_complete(monitor.draw(bot))
+        monitor.refresh()
+
+    # warm up the frame buffers
+    draw_step()
+
+    legacy = [traced_peak(lambda: legacy_frame_path(bot, gray)) for _ in range(steps)]
+    draw = [traced_peak(draw_step) for _ in range(steps)]
+    retain = [traced_peak(monitor.get_flipped) for _ in range(steps)]
+    return {
+        'monitor': monitor_class.__name__,
+        'legacy_frame_bytes': int(np.median(legacy)),
+        'draw_bytes': int(np.median(draw)),
+        'get_flipped_bytes': int(np.median(retain)),
+        'pool_bytes': monitor.frames.nbytes()
+    }
+
+
+def main():
+    for monitor_class in (ChromaticMonitor, MonochromeMonitor):
+        print(measure(monitor_class))
+
+
+if __name__ == '__main__':
+    main()
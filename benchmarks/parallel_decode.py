@@ -0,0 +1,56 @@
+"""
+decoding throughput of ParallelLoader at 1, 2, 4 and 8 worker processes
+
+$ python -m yuri.benchmarks.parallel_decode [--files 200] [--repeat 5]
+
+the first load starts the pool and is reported on its own; the throughput is
+that of the loads after it, as the trainers see chunk after chunk
+"""
+import os
+import time
+import argparse
+import tempfile
+
+from .fixtures import write_game_files
+from ..datasets import Manifest, ParallelLoader
+from ..observation import CHROMATIC_SPEC
+
+
+def measure(data_dir, workers, repeat, spec=CHROMATIC_SPEC):
+    manifest = Manifest(data_dir).update()
+    loader = ParallelLoader(data_dir, manifest, spec, 4, workers)
+    files = manifest.valid_files()
+    start = time.perf_counter()
+    frames, _, _ = loader.load(files)
+    first_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(repeat):
+        frames, _, _ = loader.load(files)
+    seconds = (time.perf_counter() - start) / repeat
+    loader.close()
+    return {
+        'workers': workers,
+        'samples': len(frames),
+        'first_load_seconds': round(first_seconds, 3),
+        'seconds': round(seconds, 3),
+        'samples_per_second': round(len(frames) / seconds)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='parallel_decode.py')
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--samples', type=int, default=20, help='samples per file')
+    parser.add_argument('--repeat', type=int, default=5, help='loads timed after the first')
+    cmd_args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = os.path.join(tmp_dir, 'train')
+        write_game_files(data_dir, cmd_args.files, cmd_args.samples, CHROMATIC_SPEC.frame_shape)
+        print(f'cpus: {os.cpu_count()}')
+        for workers in (1, 2, 4, 8):
+            print(measure(data_dir, workers, cmd_args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+how long main.py takes to get ready in each mode, and whether it imported
+TensorFlow on the way; every mode runs with --startup-only in a fresh
+interpreter, so nothing is imported yet
+
+$ python -m yuri.benchmarks.startup_time [--model <model path>] [--npz <exported model>] [--repeat 3] [--imports 10]
+
+--imports lists the slowest imports of every mode from -X importtime
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+import numpy as np
+
+# runs main the way python -m yuri.main does and reports what it imported
+PROBE = '''
+import sys, runpy
+sys.argv = ['main.py'] + sys.argv[1:]
+runpy.run_module('yuri.main', run_name='__main__')
+print('heavy', *[name for name in ('tensorflow', 'keras', 'h5py') if name in sys.modules])
+'''
+
+
+def modes(model, npz):
+    yield 'game, random', ['--type', 'game']
+    if npz is not None:
+        yield 'game, numpy model', ['--type', 'game', '--model', npz]
+    if model is not None:
+        yield 'game, keras model', ['--type', 'game', '--model', model]
+    yield 'train', ['--type', 'train']
+
+
+def package_root():
+    return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run(args, importtime=False):
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', PROBE]
+    start = time.perf_counter()
+    process = subprocess.run(command + args + ['--startup-only'], cwd=package_root(),
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    seconds = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1])
+    heavy = [line.split()[1:] for line in process.stdout.splitlines() if line.startswith('heavy')]
+    return seconds, heavy[-1] if heavy else list(), process.stderr
+
+
+def slowest_imports(stderr, top):
+    """
+    the top modules of -X importtime output by cumulative microseconds
+    """
+    imports = dict()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        imports[name] = max(imports.get(name, 0), int(cumulative))
+    return sorted(((cumulative, name) for name, cumulative in imports.items()), reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='startup_time.py')
+    parser.add_argument('--model', help='saved keras model for the keras game mode')
+    parser.add_argument('--npz', help='exported model for the numpy game mode')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--imports', type=int, default=0, help='slowest imports to list per mode')
+    cmd_args = parser.parse_args()
+
+    for name, args in modes(cmd_args.model, cmd_args.npz):
+        try:
+            runs = [run(args) for _ in range(cmd_args.repeat)]
+        except RuntimeError as e:
+            print(f'{name}: failed, {e}')
+            continue
+        seconds = [s for s, _, _ in runs]
+        print(f'{name}: median {np.median(seconds):.2f}s, min {min(seconds):.2f}s, '
+              f'heavy modules {runs[-1][1]}')
+        if cmd_args.imports and sys.version_info >= (3, 7):
+            for cumulative, module in slowest_imports(run(args, importtime=True)[2], cmd_args.imports):
+                print(f'  {cumulative / 1000:8.1f} ms  {module}')
+
+
+if __name__ == '__main__':
+    main()
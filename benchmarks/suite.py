@@ -0,0 +1,212 @@
+"""
+benchmark suite over synthetic fixtures: monitor drawing, training data
+loading, model fitting and attack inference; every case reports ops/s,
+latency percentiles and peak traced memory into a JSON file, which a later
+run compares itself against
+
+$ python -m yuri.benchmarks.suite [--output results.json] [--compare old.json] [--only monitors,loaders,fit,inference] [--quick]
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import datetime
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+
+from .fixtures import make_bot, write_game_files
+from ..datasets import Manifest, ParallelLoader
+from ..monitors import ChromaticMonitor, MonochromeMonitor
+from ..observation import CHROMATIC_SPEC, MONOCHROME_SPEC
+
+import numpy as np
+
+GROUPS = ['monitors', 'loaders', 'fit', 'inference']
+
+
+def measure(name, func, repeat, warmup=1, ops=1, **params):
+    """
+    time repeat calls of func, each doing ops operations, after warmup
+    untimed ones; one more call is traced for its peak allocation
+    """
+    for _ in range(warmup):
+        func()
+    latencies = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = np.array(latencies) / ops
+    result = {
+        'name': name,
+        'params': params,
+        'ops_per_second': float(1 / latencies.mean()),
+        'latency_ms': {f'p{q}': float(np.percentile(latencies, q) * 1000) for q in (50, 90, 99)},
+        'peak_bytes': int(peak)
+    }
+    print(f'{name} {params}: {result["ops_per_second"]:.1f} ops/s, '
+          f'p50 {result["latency_ms"]["p50"]:.2f} ms, peak {peak / 2 ** 20:.1f} MiB')
+    return result
+
+
+def bench_monitors(quick):
+    loop = asyncio.get_event_loop()
+    results = list()
+    for monitor_class in (ChromaticMonitor, MonochromeMonitor):
+        for unit_num in ([50, 200] if quick else [50, 200, 800]):
+            bot = make_bot(unit_num)
+            monitor = monitor_class(headless=True)
+
+            def draw():
+                bot.jitter()
+                loop.run_until_complete(monitor.draw(bot))
+                monitor.get_flipped()
+
+            results.append(measure(f'{monitor_class.__name__}.draw', draw,
+                                   repeat=20 if quick else 200, units=unit_num))
+    return results
+
+
+def bench_loaders(quick, tmp_dir):
+    """
+    a chunk of the attack and the full training data, decoded as the trainers
+    load them
+    """
+    results = list()
+    files_num = 10 if quick else 50
+    for name, spec, num_choices in (('AttackTrainer', CHROMATIC_SPEC, 4), ('FullTrainer', MONOCHROME_SPEC, 14)):
+        data_dir = os.path.join(tmp_dir, name)
+        write_game_files(data_dir, files_num, 20, spec.frame_shape, num_choices)
+        manifest = Manifest(data_dir).update()
+        loader = ParallelLoader(data_dir, manifest, spec, num_choices)
+        files = manifest.valid_files()
+        results.append(measure(f'{name} chunk load', lambda: loader.load(files), repeat=3 if quick else 10,
+                               ops=files_num * 20, files=files_num, samples_per_file=20))
+    return results
+
+
+def bench_fit(quick, tmp_dir):
+    """
+    training steps of the attack model, timed through BaseModel.fit
+    """
+    from ..models import AttackCNNModel
+
+    spec = CHROMATIC_SPEC
+    batch_size = 32
+    steps = 4 if quick else 16
+    model = AttackCNNModel(spec)
+    model.log_dir = os.path.join(tmp_dir, 'logs')
+    model.init().compile(lr=0.0001)
+    rng = np.random.RandomState(0)
+    x = rng.randint(0, 256, (steps * batch_size,) + spec.shape).astype(np.uint8)
+    y = np.eye(4, dtype=np.float32)[rng.randint(4, size=len(x))]
+    x_test, y_test = x[:batch_size], y[:batch_size]
+    return [measure('BaseModel.fit', lambda: model.fit(x, y, x_test, y_test, 1, batch_size),
+                    repeat=2 if quick else 5, ops=steps, batch_size=batch_size, steps=steps)]
+
+
+def bench_inference(quick, tmp_dir):
+    """
+    attack decisions on the keras backend, inline and threaded, and on the
+    NumPy backend running the same weights
+    """
+    from ..basebots.attackbot import AttackBot
+    from ..inference import InferenceService
+    from ..inference.export import export_model
+    from ..inference.keras_backend import KerasBackend
+    from ..models import AttackCNNModel
+
+    loop = asyncio.get_event_loop()
+    spec = CHROMATIC_SPEC
+    model = AttackCNNModel(spec).init().get_model()
+    backends = [('keras', KerasBackend(model)),
+                ('numpy', export_model(model, os.path.join(tmp_dir, 'attack.npz'), spec))]
+    bot = AttackBot()
+    bot.monitor = ChromaticMonitor(headless=True)
+    flipped = np.random.RandomState(0).randint(0, 256, spec.frame_shape).astype(np.uint8)
+    results = list()
+    for name, backend in backends:
+        for threaded in (False, True):
+            bot.inference = InferenceService(backend, threaded=threaded)
+            results.append(measure('AttackBot.predict_attack_choice',
+                                   lambda: loop.run_until_complete(bot.predict_attack_choice(flipped)),
+                                   repeat=20 if quick else 200, warmup=3, backend=name, threaded=threaded))
+            bot.inference.close()
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(__file__),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """
+    print the ops/s of every case against the same case in baseline
+    """
+    old = {(r['name'], json.dumps(r['params'], sort_keys=True)): r for r in baseline['results']}
+    print(f'against {baseline.get("commit")}:')
+    for result in results:
+        previous = old.get((result['name'], json.dumps(result['params'], sort_keys=True)))
+        if previous is None:
+            continue
+        ratio = result['ops_per_second'] / previous['ops_per_second']
+        print(f'  {result["name"]} {result["params"]}: {ratio:.2f}x ops/s, '
+              f'p99 {previous["latency_ms"]["p99"]:.2f} -> {result["latency_ms"]["p99"]:.2f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='suite.py')
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--compare', help='results of an earlier run')
+    parser.add_argument('--only', default=','.join(GROUPS), help=f'comma separated of {GROUPS}')
+    parser.add_argument('--quick', action='store_true', help='fewer sizes and repetitions')
+    cmd_args = parser.parse_args()
+    groups = cmd_args.only.split(',')
+    baseline = None
+    if cmd_args.compare is not None:
+        with open(cmd_args.compare) as f:
+            baseline = json.load(f)
+
+    results = list()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if 'monitors' in groups:
+            results.extend(bench_monitors(cmd_args.quick))
+        if 'loaders' in groups:
+            results.extend(bench_loaders(cmd_args.quick, tmp_dir))
+        if 'fit' in groups:
+            results.extend(bench_fit(cmd_args.quick, tmp_dir))
+        if 'inference' in groups:
+            results.extend(bench_inference(cmd_args.quick, tmp_dir))
+
+    report = {
+        'commit': git_commit(),
+        'time': datetime.datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'quick': cmd_args.quick,
+        'results': results
+    }
+    with open(cmd_args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'wrote {cmd_args.output}')
+
+    if baseline is not None:
+        compare(results, baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,8 @@
+from .columnar import ColumnarDataset, ColumnarWriter, convert_legacy
+from .episode_writer import EpisodeWriter
+from .manifest import Manifest
+from .parallel import ParallelLoader
+from .replay_buffer import ReplayBuffer
+from .sampler import ClassSampler
+from .shards import ShardedDataset, compact
+from .stream import BatchStream
@@ -0,0 +1,214 @@
+from ..loggers import logger
+from ..monitors.unit_record import UnitRecord
+
+import os
+import json
+import shutil
+
+import numpy as np
+
+FRAMES_FILE = 'frames.npy'
+LABELS_FILE = 'labels.npy'
+OFFSETS_FILE = 'offsets.npy'
+META_FILE = 'meta.json'
+
+# npy header size reserved by NpyStreamWriter, large enough for any shape
+HEADER_SIZE = 256
+
+
+class NpyStreamWriter:
+    """
+    append rows to an .npy file whose length is only known once it is closed;
+    the header is written with reserved space and rewritten on close
+    """
+
+    def __init__(self, path, dtype, row_shape):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.row_shape = tuple(row_shape)
+        self.rows = 0
+        self.file = open(path, 'wb')
+        self.write_header()
+
+    def write_header(self):
+        header = str({
+            'descr': np.lib.format.dtype_to_descr(self.dtype),
+            'fortran_order': False,
+            'shape': (self.rows,) + self.row_shape
+        })
+        # magic(6) + version(2) + header length(2) + padded header
+        header = header.ljust(HEADER_SIZE - 10 - 1) + '\n'
+        self.file.seek(0)
+        self.file.write(b'\x93NUMPY\x01\x00')
+        self.file.write(np.uint16(len(header)).tobytes())
+        self.file.write(header.encode('latin1'))
+
+    def write(self, rows):
+        rows = np.ascontiguousarray(rows, dtype=self.dtype)
+        if rows.shape[1:] != self.row_shape:
+            raise ValueError(f'Rows of shape {rows.shape[1:]} do not match {self.row_shape}')
+        self.file.write(rows.tobytes())
+        self.rows += len(rows)
+
+    def close(self):
+        self.write_header()
+        self.file.close()
+
+
+class ColumnarWriter:
+    """
+    write a columnar dataset directory:
+
+    frames.npy   uint8 frames, N*H*W*C
+    labels.npy   int8 choice of every frame, N
+    offsets.npy  int64 first frame of every episode plus N, E+1
+    meta.json    number of choices, frame shape and episode names
+
+    files are written to <path>.tmp and renamed into place on close
+    """
+
+    def __init__(self, path, num_choices, frame_shape):
+        self.path = path
+        self.tmp_path = f'{path.rstrip(os.sep)}.tmp'
+        self.num_choices = num_choices
+        self.frame_shape = tuple(frame_shape)
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+        os.makedirs(self.tmp_path)
+        self.frames = NpyStreamWriter(os.path.join(self.tmp_path, FRAMES_FILE), np.uint8, frame_shape)
+        self.labels = NpyStreamWriter(os.path.join(self.tmp_path, LABELS_FILE), np.int8, ())
+        self.offsets = [0]
+        self.episodes = list()
+
+    def append_episode(self, name, labels, frames):
+        """
+        append one episode; frames of a single channel may omit the channel axis
+        """
+        self.write_rows(labels, frames)
+        self.end_episode(name)
+
+    def write_rows(self, labels, frames):
+        """
+        append samples to the current episode
+        """
+        frames = np.asarray(frames, dtype=np.uint8).reshape((-1,) + self.frame_shape)
+        if len(frames) != len(labels):
+            raise ValueError(f'{len(frames)} frames do not match {len(labels)} labels')
+        self.frames.write(frames)
+        self.labels.write(np.asarray(labels, dtype=np.int8))
+
+    def end_episode(self, name):
+        self.offsets.append(self.labels.rows)
+        self.episodes.append(name)
+
+    def close(self):
+        self.frames.close()
+        self.labels.close()
+        np.save(os.path.join(self.tmp_path, OFFSETS_FILE), np.array(self.offsets, np.int64))
+        with open(os.path.join(self.tmp_path, META_FILE), 'w') as f:
+            json.dump({
+                'num_choices': self.num_choices,
+                'frame_shape': list(self.frame_shape),
+                'episodes': self.episodes
+            }, f)
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.replace(self.tmp_path, self.path)
+        logger.info(f'Wrote {self.offsets[-1]} samples of {len(self.episodes)} episodes to {self.path}')
+
+
+class ColumnarDataset:
+    """
+    read a columnar dataset through memory maps; only the rows asked for are
+    ever read from disk
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        self.num_choices = meta['num_choices']
+        self.frame_shape = tuple(meta['frame_shape'])
+        self.episodes = meta['episodes']
+        self.frames = np.load(os.path.join(path, FRAMES_FILE), mmap_mode='r')
+        self.labels = np.load(os.path.join(path, LABELS_FILE), mmap_mode='r')
+        self.offsets = np.load(os.path.join(path, OFFSETS_FILE))
+
+    @staticmethod
+    def is_columnar(path):
+        return os.path.isfile(os.path.join(path, META_FILE))
+
+    def __len__(self):
+        return len(self.labels)
+
+    def get_batch(self, indices, spec=None):
+        """
+        gather frames and one-hot choices of indices, converted to spec
+        """
+        # reading rows in file order keeps the memory map access sequential
+        indices = np.sort(np.asarray(indices))
+        x = self.frames[indices]
+        if spec is not None and x.shape[1:] != spec.shape:
+            x = np.stack([spec.convert(frame) for frame in x]).reshape((-1,) + spec.shape)
+        y = np.eye(self.num_choices, dtype=np.float32)[self.labels[indices]]
+        return x, y
+
+
+def load_legacy_samples(path):
+    """
+    load a legacy [choice_array, observation] object array, skipping steps
+    where no choice was recorded
+    """
+    data = np.load(path, allow_pickle=True)
+    return [d for d in data if d is not None]
+
+
+def read_legacy_file(path, render=None):
+    """
+    load a legacy file; return choices(n) and frames(n*H*W[*C]), turning unit
+    records into frames with render
+    """
+    data = np.load(path, allow_pickle=True)
+    if data.dtype.names is not None:
+        # chunks written from a ReplayBuffer hold whole columns already
+        return np.argmax(data['choice'], axis=1).astype(np.int8), data['frame'], \
+            data.dtype['choice'].shape[0]
+
+    samples = [d for d in data if d is not None]
+    if render is None and any(UnitRecord.is_record(d[1]) for d in samples):
+        raise ValueError('unit records can only be read with a renderer')
+    choices = np.array([np.argmax(d[0]) for d in samples], np.int8)
+    if render is None:
+        frames = np.array([d[1] for d in samples], np.uint8)
+    else:
+        frames = np.array([render(d[1]) for d in samples], np.uint8)
+    num_choices = len(samples[0][0]) if len(samples) > 0 else None
+    return choices, frames, num_choices
+
+
+def convert_legacy(src_dir, dst_path, render=None, files=None, head=None):
+    """
+    convert the legacy .npy files of src_dir, all of them unless files is
+    given, into one columnar dataset, one episode per file, holding only one
+    file in memory at a time; unit records are rasterized with render
+
+    the samples of head, a columnar dataset, are copied in first as one
+    episode
+    """
+    writer = None
+    if head is not None:
+        writer = ColumnarWriter(dst_path, head.num_choices, head.frame_shape)
+        writer.append_episode(os.path.basename(head.path), head.labels, head.frames)
+    for file in sorted(files if files is not None else os.listdir(src_dir)):
+        try:
+            choices, frames, num_choices = read_legacy_file(os.path.join(src_dir, file), render)
+            if len(choices) == 0:
+                continue
+            if writer is None:
+                frame_shape = frames.shape[1:] if frames.ndim == 4 else frames.shape[1:] + (1,)
+                writer = ColumnarWriter(dst_path, num_choices, frame_shape)
+            writer.append_episode(file, choices, frames)
+        except Exception as e:
+            logger.error(f'{file}: {e}')
+    if writer is None:
+        raise ValueError(f'No training data found in {src_dir}')
+    writer.close()
+    return ColumnarDataset(dst_path)
@@ -0,0 +1,38 @@
+"""
+merge a directory of legacy per-game .npy files into fixed-size shards with
+an index; running it again only compacts the files added since
+
+$ python -m yuri.datasets.compact attack_train attack_train.shards
+"""
+import argparse
+
+from .shards import compact, measure_throughput
+from ..monitors import RecordRenderer
+from ..observation import CHROMATIC_SPEC, MONOCHROME_SPEC
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='compact.py',
+        description='Compact legacy training files into class-stratified shards'
+    )
+    parser.add_argument('src', help='directory of legacy .npy files')
+    parser.add_argument('dst', help='shard directory to create or extend')
+    parser.add_argument('--shard-size', type=int, default=1024, help='samples per shard')
+    parser.add_argument(
+        '--monitor', choices=['chromatic', 'monochrome'], default='chromatic',
+        help='monitor which rasterizes unit records'
+    )
+    parser.add_argument(
+        '--benchmark', action='store_true',
+        help='report read throughput of the shards against per-file loading'
+    )
+    cmd_args = parser.parse_args()
+    spec = CHROMATIC_SPEC if cmd_args.monitor == 'chromatic' else MONOCHROME_SPEC
+    dataset = compact(cmd_args.src, cmd_args.dst, cmd_args.shard_size, RecordRenderer(spec))
+    if cmd_args.benchmark and dataset is not None:
+        measure_throughput(cmd_args.src, dataset)
+
+
+if __name__ == '__main__':
+    main()
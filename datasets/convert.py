@@ -0,0 +1,31 @@
+"""
+convert a directory of legacy [choice_array, frame] .npy files into a
+columnar dataset; unit records are rasterized by the monitor of --monitor
+
+$ python -m yuri.datasets.convert attack_train attack_train.columnar
+"""
+import argparse
+
+from .columnar import convert_legacy
+from ..monitors import RecordRenderer
+from ..observation import CHROMATIC_SPEC, MONOCHROME_SPEC
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='convert.py',
+        description='Convert legacy training files into a columnar dataset'
+    )
+    parser.add_argument('src', help='directory of legacy .npy files')
+    parser.add_argument('dst', help='columnar dataset directory to write')
+    parser.add_argument(
+        '--monitor', choices=['chromatic', 'monochrome'], default='chromatic',
+        help='monitor which rasterizes unit records'
+    )
+    cmd_args = parser.parse_args()
+    spec = CHROMATIC_SPEC if cmd_args.monitor == 'chromatic' else MONOCHROME_SPEC
+    convert_legacy(cmd_args.src, cmd_args.dst, RecordRenderer(spec))
+
+
+if __name__ == '__main__':
+    main()
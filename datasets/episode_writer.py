@@ -0,0 +1,153 @@
+from .columnar import NpyStreamWriter
+from .replay_buffer import ReplayBuffer
+from ..loggers import logger
+from ..monitors.unit_record import UnitRecord
+
+import os
+import time
+import shutil
+
+import numpy as np
+
+
+# partial directories untouched for this long were left by a crashed game
+STALE_PARTIAL_SECONDS = 12 * 60 * 60
+
+
+class EpisodeWriter:
+    """
+    stream the [choice_array, frame] pairs of one game to disk in fixed-size
+    chunks, so memory stays bounded however long the game runs; the episode
+    waits in a partial directory until it is committed, with one rename, or
+    discarded
+
+    frames are appended to one episode file as they are flushed; unit
+    records are flushed to chunks of their own and merged into the episode
+    file on commit
+    """
+
+    def __init__(self, out_dir, chunk_size=200, name=None):
+        self.out_dir = out_dir
+        self.chunk_size = chunk_size
+        # games started in the same second by other processes get names of their own
+        self.name = name if name is not None else f'{int(time.time())}-{os.getpid()}'
+        # sibling of out_dir so the episode can be renamed into it atomically
+        # and trainers listing out_dir never see unfinished episodes
+        self.partial_root = f'{out_dir.rstrip(os.sep)}.partial'
+        self.partial_dir = os.path.join(self.partial_root, self.name)
+        self.partial_path = os.path.join(self.partial_dir, f'{self.name}.npy')
+        # frames are copied into one preallocated buffer; unit records, which
+        # have no fixed shape, are kept as they are
+        self.buffer = ReplayBuffer(chunk_size)
+        self.frames = None
+        self.records = list()
+        self.record_paths = list()
+        self.samples = 0
+        remove_stale_partials(self.partial_root)
+
+    def append(self, sample):
+        if sample is None:
+            return
+        if UnitRecord.is_record(sample[1]):
+            self.records.append(sample)
+        else:
+            self.buffer.append(sample)
+        self.samples += 1
+        if len(self.buffer) + len(self.records) >= self.chunk_size:
+            self.flush()
+
+    def __len__(self):
+        return self.samples
+
+    def flush(self):
+        if len(self.buffer) > 0:
+            if self.frames is None:
+                os.makedirs(self.partial_dir, exist_ok=True)
+                self.frames = NpyStreamWriter(self.partial_path, self.buffer.npy_dtype(), ())
+            self.buffer.write_npy(self.frames)
+            self.buffer.clear()
+        if len(self.records) > 0:
+            data = np.empty((len(self.records), 2), dtype=object)
+            for i, (choice_array, record) in enumerate(self.records):
+                data[i, 0] = choice_array
+                data[i, 1] = record
+            os.makedirs(self.partial_dir, exist_ok=True)
+            path = os.path.join(self.partial_dir, f'records-{len(self.record_paths):04d}.npy')
+            np.save(path, data)
+            self.record_paths.append(path)
+            self.records = list()
+
+    def close_frames(self):
+        if self.frames is not None:
+            self.frames.close()
+            self.frames = None
+
+    def merge_records(self):
+        """
+        rewrite the episode file as one object array of the record chunks
+        and the frames flushed so far
+        """
+        rows = [row for path in self.record_paths for row in np.load(path, allow_pickle=True)]
+        if os.path.exists(self.partial_path):
+            rows += [[d['choice'], d['frame']] for d in np.load(self.partial_path)]
+        data = np.empty((len(rows), 2), dtype=object)
+        for i, (choice_array, observation) in enumerate(rows):
+            data[i, 0] = choice_array
+            data[i, 1] = observation
+        np.save(self.partial_path, data)
+
+    def commit(self):
+        """
+        rename the episode file into out_dir and return its path, None if
+        the episode has no samples
+        """
+        self.flush()
+        self.close_frames()
+        if len(self.record_paths) > 0:
+            self.merge_records()
+        target = None
+        if os.path.exists(self.partial_path):
+            os.makedirs(self.out_dir, exist_ok=True)
+            target = os.path.join(self.out_dir, os.path.basename(self.partial_path))
+            os.replace(self.partial_path, target)
+        self.remove_partial_dir()
+        logger.info(f'Committed episode {self.name}: {self.samples} samples')
+        return target
+
+    def discard(self):
+        self.buffer.clear()
+        self.records = list()
+        self.record_paths = list()
+        self.close_frames()
+        self.remove_partial_dir()
+        logger.debug(f'Discarded episode {self.name}: {self.samples} samples')
+
+    def remove_partial_dir(self):
+        shutil.rmtree(self.partial_dir, ignore_errors=True)
+        try:
+            os.rmdir(self.partial_root)
+        except OSError:
+            pass
+
+
+def remove_stale_partials(partial_root, max_age=STALE_PARTIAL_SECONDS):
+    """
+    remove the episodes of partial_root nothing was written to for max_age
+    seconds, left behind by games which crashed before committing
+    """
+    if not os.path.isdir(partial_root):
+        return
+    now = time.time()
+    for name in os.listdir(partial_root):
+        path = os.path.join(partial_root, name)
+        if not os.path.isdir(path):
+            continue
+        try:
+            paths = [path] + [os.path.join(path, f) for f in os.listdir(path)]
+            age = now - max(os.path.getmtime(p) for p in paths)
+        except OSError:
+            # committed or discarded meanwhile
+            continue
+        if age > max_age:
+            logger.info(f'Removing stale partial episode {path}')
+            shutil.rmtree(path, ignore_errors=True)
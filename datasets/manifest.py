@@ -0,0 +1,114 @@
+from .columnar import load_legacy_samples
+from ..loggers import logger
+from ..monitors.unit_record import UnitRecord
+
+import os
+import json
+
+import numpy as np
+
+
+class Manifest:
+    """
+    index of a directory of legacy training files: sample count, per-choice
+    counts, frame shape and validity of every file
+
+    the index is kept in <data_dir>.manifest.json next to the directory, so
+    trainers listing data_dir never see it, and only files whose mtime or
+    size changed are read again on update
+    """
+
+    def __init__(self, data_dir, path=None):
+        self.data_dir = data_dir
+        self.path = path if path is not None else f'{data_dir.rstrip(os.sep)}.manifest.json'
+        self.entries = dict()
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path) as f:
+                    self.entries = json.load(f)
+            except ValueError as e:
+                logger.error(f'Ignoring broken manifest {self.path}: {e}')
+
+    def update(self):
+        """
+        index new and changed files, forget removed ones and save the manifest
+        """
+        files = set(os.listdir(self.data_dir))
+        changed = False
+        for file in sorted(files):
+            stat = os.stat(os.path.join(self.data_dir, file))
+            entry = self.entries.get(file)
+            if entry is not None and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size:
+                continue
+            self.entries[file] = self.index_file(file, stat)
+            changed = True
+        for file in set(self.entries) - files:
+            del self.entries[file]
+            changed = True
+        if changed:
+            self.save()
+        quarantined = self.quarantined()
+        if len(quarantined) > 0:
+            logger.info(f'{len(quarantined)} files of {self.data_dir} are quarantined')
+        return self
+
+    def index_file(self, file, stat):
+        entry = {'mtime': stat.st_mtime, 'size': stat.st_size}
+        try:
+            samples = load_legacy_samples(os.path.join(self.data_dir, file))
+            if len(samples) == 0:
+                raise ValueError('no samples')
+            choices = [np.argmax(d[0]) for d in samples]
+            observation = samples[0][1]
+            records = UnitRecord.is_record(observation)
+            entry.update({
+                'valid': True,
+                'samples': len(samples),
+                'counts': np.bincount(choices, minlength=len(samples[0][0])).tolist(),
+                # unit records are rasterized to whatever spec trains on them
+                'frame_shape': None if records else list(np.shape(observation)),
+                'records': records
+            })
+        except Exception as e:
+            logger.error(f'Quarantining {file}: {e}')
+            entry.update({'valid': False, 'error': str(e)})
+        return entry
+
+    def save(self):
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+    def valid_files(self):
+        return sorted(file for file, entry in self.entries.items() if entry['valid'])
+
+    def quarantined(self):
+        return sorted(file for file, entry in self.entries.items() if not entry['valid'])
+
+    def counts(self, files):
+        """
+        number of samples of every choice held by files together
+        """
+        counts = None
+        for file in files:
+            entry = self.entries.get(file)
+            if entry is None or not entry['valid']:
+                continue
+            file_counts = np.array(entry['counts'])
+            if counts is None:
+                counts = file_counts
+            else:
+                length = max(len(counts), len(file_counts))
+                counts = np.pad(counts, (0, length - len(counts)), 'constant') \
+                    + np.pad(file_counts, (0, length - len(file_counts)), 'constant')
+        return counts if counts is not None else np.zeros(0, np.int64)
+
+    def balanced_length(self, files, num_choices):
+        """
+        number of samples of every choice left after balancing files
+        """
+        counts = self.counts(files)
+        if len(counts) < num_choices:
+            return 0
+        return int(counts[:num_choices].min())
@@ -0,0 +1,129 @@
+from .columnar import read_legacy_file
+from ..loggers import logger
+from ..monitors import RecordRenderer
+from ..observation import ObservationSpec
+
+import os
+import multiprocessing
+from multiprocessing.sharedctypes import RawArray
+
+import numpy as np
+
+# buffers and renderer of a pool worker, set up once by init_worker
+worker_state = dict()
+
+
+def init_worker(frames_buffer, labels_buffer, spec_json):
+    spec = ObservationSpec.from_json(spec_json)
+    worker_state['spec'] = spec
+    worker_state['render'] = RecordRenderer(spec)
+    worker_state['frames'] = np.frombuffer(frames_buffer, np.uint8).reshape((-1,) + spec.shape)
+    worker_state['labels'] = np.frombuffer(labels_buffer, np.int8)
+
+
+def decode_file(task):
+    """
+    decode one file into the shared buffers at offset; return the number of
+    samples written and their per-choice counts
+    """
+    path, offset, capacity, num_choices = task
+    render = worker_state['render']
+    frames = worker_state['frames']
+    labels = worker_state['labels']
+    try:
+        choices, file_frames, _ = read_legacy_file(path, render)
+    except Exception as e:
+        logger.error(f'{path}: {e}')
+        return 0, np.zeros(num_choices, np.int64)
+    # a file rewritten since it was indexed may hold more samples
+    count = min(len(choices), capacity)
+    for i in range(count):
+        frames[offset + i] = render(file_frames[i]).reshape(frames.shape[1:])
+    labels[offset:offset + count] = choices[:count]
+    return count, np.bincount(choices[:count], minlength=num_choices)
+
+
+class ParallelLoader:
+    """
+    decode training files on a pool of worker processes; every file gets its
+    slice of one shared buffer, sized from the manifest, so frames never
+    travel back through pickling
+
+    the pool and its buffers live as long as the loader, see close(); the
+    buffers grow, and the pool is started again, only when a load needs more
+    room than any before. Workers are spawned, not forked, so they inherit
+    neither the TensorFlow session nor its threads; frames and labels a load
+    returns are views of the buffers, valid until the next load
+
+    with workers=1 files are decoded in this process
+    """
+
+    def __init__(self, data_dir, manifest, spec, num_choices, workers=1):
+        self.data_dir = data_dir
+        self.manifest = manifest
+        self.spec = spec
+        self.num_choices = num_choices
+        self.workers = workers
+        self.capacity = 0
+        self.frames_buffer = None
+        self.labels_buffer = None
+        self.pool = None
+
+    def allocate(self, capacity):
+        """
+        make room for capacity samples and start the pool on the new buffers
+        """
+        self.close()
+        self.capacity = capacity
+        self.frames_buffer = RawArray('B', capacity * int(np.prod(self.spec.shape)))
+        self.labels_buffer = RawArray('b', capacity)
+        args = (self.frames_buffer, self.labels_buffer, self.spec.to_json())
+        if self.workers > 1:
+            self.pool = multiprocessing.get_context('spawn').Pool(self.workers, init_worker, args)
+        else:
+            init_worker(*args)
+
+    def load(self, files):
+        """
+        return frames(n*spec.shape), labels(n) and the per-choice counts of
+        files; frames and labels live in shared memory
+        """
+        files = [file for file in files if file in self.manifest.entries and self.manifest.entries[file]['valid']]
+        sizes = [self.manifest.entries[file]['samples'] for file in files]
+        offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        total = int(offsets[-1])
+        if total == 0:
+            return np.zeros((0,) + self.spec.shape, np.uint8), np.zeros(0, np.int8), \
+                np.zeros(self.num_choices, np.int64)
+
+        if total > self.capacity:
+            # chunks differ in size a little; grow ahead so they rarely restart the pool
+            self.allocate(max(total, self.capacity * 3 // 2))
+        tasks = [(os.path.join(self.data_dir, file), int(offsets[i]), sizes[i], self.num_choices)
+                 for i, file in enumerate(files)]
+        if self.pool is not None:
+            results = self.pool.map(decode_file, tasks)
+        else:
+            results = [decode_file(task) for task in tasks]
+
+        frames = np.frombuffer(self.frames_buffer, np.uint8).reshape((-1,) + self.spec.shape)
+        labels = np.frombuffer(self.labels_buffer, np.int8)
+
+        # close the gaps left by files which held fewer samples than indexed
+        written = 0
+        for (count, _), offset in zip(results, offsets):
+            if offset != written:
+                frames[written:written + count] = frames[offset:offset + count]
+                labels[written:written + count] = labels[offset:offset + count]
+            written += count
+        counts = sum((file_counts for _, file_counts in results), np.zeros(self.num_choices, np.int64))
+        return frames[:written], labels[:written], counts
+
+    def close(self):
+        """
+        stop the worker processes
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
@@ -0,0 +1,108 @@
+from .columnar import ColumnarWriter, NpyStreamWriter
+
+import numpy as np
+
+
+class ReplayBuffer:
+    """
+    keep the latest capacity [choice_array, frame] samples in preallocated
+    contiguous uint8 frame and int8 label arrays; appending is O(1) and
+    overwrites the oldest sample once the buffer is full
+
+    the arrays are allocated on the first sample, whose frame gives their
+    shape; pages the buffer never fills are not touched
+    """
+
+    def __init__(self, capacity, frame_shape=None, num_choices=None):
+        self.capacity = capacity
+        self.frames = None
+        self.labels = None
+        self.num_choices = num_choices
+        self.head = 0
+        self.size = 0
+        if frame_shape is not None and num_choices is not None:
+            self.allocate(frame_shape, num_choices)
+
+    def allocate(self, frame_shape, num_choices):
+        self.frames = np.empty((self.capacity,) + tuple(frame_shape), np.uint8)
+        self.labels = np.empty(self.capacity, np.int8)
+        self.num_choices = num_choices
+
+    def append(self, sample):
+        if sample is None:
+            return
+        choice_array, frame = sample
+        if self.frames is None:
+            self.allocate(np.shape(frame), len(choice_array))
+        self.frames[self.head] = frame
+        self.labels[self.head] = np.argmax(choice_array)
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        self.head = 0
+        self.size = 0
+
+    def slices(self):
+        """
+        return the filled part of the ring as at most two slices, oldest first
+        """
+        start = (self.head - self.size) % self.capacity
+        if start + self.size <= self.capacity:
+            return [slice(start, start + self.size)]
+        return [slice(start, self.capacity), slice(0, self.head)]
+
+    def get_labels(self):
+        if self.size == 0:
+            return np.zeros(0, np.int8)
+        return np.concatenate([self.labels[s] for s in self.slices()])
+
+    def get_frames(self):
+        if self.size == 0:
+            return np.zeros((0,) + (self.frames.shape[1:] if self.frames is not None else ()), np.uint8)
+        return np.concatenate([self.frames[s] for s in self.slices()])
+
+    def export_columnar(self, path, name):
+        """
+        write the buffer as a columnar dataset of one episode
+        """
+        frame_shape = self.frames.shape[1:]
+        if len(frame_shape) == 2:
+            frame_shape += (1,)
+        writer = ColumnarWriter(path, self.num_choices, frame_shape)
+        for s in self.slices():
+            writer.write_rows(self.labels[s], self.frames[s])
+        writer.end_episode(name)
+        writer.close()
+
+    def npy_dtype(self):
+        """
+        the rows of export_npy: d[0] is the one-hot choice, d[1] the frame
+        """
+        return np.dtype([
+            ('choice', np.float64, (self.num_choices,)),
+            ('frame', np.uint8, self.frames.shape[1:])
+        ])
+
+    def write_npy(self, writer):
+        """
+        append the buffer, oldest first, to an NpyStreamWriter of npy_dtype
+        """
+        for s in self.slices():
+            rows = np.zeros(s.stop - s.start, writer.dtype)
+            rows['choice'][np.arange(len(rows)), self.labels[s]] = 1
+            rows['frame'] = self.frames[s]
+            writer.write(rows)
+
+    def export_npy(self, path):
+        """
+        write the buffer as a training file the trainers read like the
+        [choice_array, frame] object arrays: a structured array whose rows
+        index as d[0], the one-hot choice, and d[1], the frame
+        """
+        writer = NpyStreamWriter(path, self.npy_dtype(), ())
+        self.write_npy(writer)
+        writer.close()
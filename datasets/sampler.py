@@ -0,0 +1,56 @@
+import numpy as np
+
+
+class ClassSampler:
+    """
+    draw epochs of sample indices from one index array per choice; frames
+    are never touched, they are gathered once a batch is drawn
+    """
+
+    def __init__(self, labels, num_choices, rng=np.random):
+        labels = np.asarray(labels)
+        self.num_choices = num_choices
+        self.rng = rng
+        self.class_indices = [np.flatnonzero(labels == c) for c in range(num_choices)]
+
+    def counts(self):
+        return np.array([len(indices) for indices in self.class_indices])
+
+    def truncated(self):
+        """
+        shuffle the indices of every choice, cut them to the rarest choice and
+        shuffle them together
+        """
+        lowest_length = self.counts().min()
+        indices = np.concatenate([self.rng.permutation(indices)[:lowest_length]
+                                  for indices in self.class_indices])
+        return self.rng.permutation(indices)
+
+    def hold_out(self, size):
+        """
+        take size random samples out of the sampler and return their indices
+        """
+        indices = np.concatenate(self.class_indices)
+        held = self.rng.choice(indices, min(size, len(indices)), replace=False)
+        self.class_indices = [np.setdiff1d(class_indices, held, assume_unique=True)
+                              for class_indices in self.class_indices]
+        return held
+
+    def sample(self, weights=None, size=None):
+        """
+        draw size indices, all samples by default, with the choices in
+        proportion to weights, equal by default; a choice with fewer samples
+        than its share is drawn with replacement, one missing entirely is left
+        out; no indices at all once every sample is held out
+        """
+        counts = self.counts()
+        if counts.sum() == 0:
+            return np.empty(0, np.int64)
+        weights = np.ones(self.num_choices) if weights is None else np.asarray(weights, np.float64)
+        weights = np.where(counts > 0, weights, 0)
+        weights = weights / weights.sum()
+        size = counts.sum() if size is None else size
+        shares = np.round(weights * size).astype(np.int64)
+        indices = [self.rng.choice(class_indices, share, replace=share > len(class_indices))
+                   for class_indices, share in zip(self.class_indices, shares) if share > 0]
+        return self.rng.permutation(np.concatenate(indices))
@@ -0,0 +1,178 @@
+from .columnar import ColumnarDataset, ColumnarWriter, convert_legacy, load_legacy_samples
+from .manifest import Manifest
+from ..loggers import logger
+
+import os
+import json
+import time
+import shutil
+
+import numpy as np
+
+INDEX_FILE = 'index.json'
+STAGING_DIR = 'staging'
+
+
+class ShardedDataset:
+    """
+    a directory of fixed-size columnar shards plus index.json; every shard
+    holds about the same share of every choice, so training can go through
+    the shards one at a time with one sequential read each
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE)) as f:
+            self.index = json.load(f)
+        self.num_choices = self.index['num_choices']
+        self.frame_shape = tuple(self.index['frame_shape'])
+        self.shards = [ColumnarDataset(os.path.join(path, shard['name']))
+                       for shard in self.index['shards']]
+
+    @staticmethod
+    def is_sharded(path):
+        return os.path.isfile(os.path.join(path, INDEX_FILE))
+
+    def __len__(self):
+        return sum(len(shard) for shard in self.shards)
+
+
+def load_index(dst_dir):
+    if ShardedDataset.is_sharded(dst_dir):
+        with open(os.path.join(dst_dir, INDEX_FILE)) as f:
+            return json.load(f)
+    return {'num_choices': None, 'frame_shape': None, 'shards': list(), 'sources': dict()}
+
+
+def save_index(dst_dir, index):
+    tmp_path = os.path.join(dst_dir, f'{INDEX_FILE}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_path, os.path.join(dst_dir, INDEX_FILE))
+
+
+def stratify(labels, shard_size, seed=0):
+    """
+    split the sample indices into shards of shard_size, the last one possibly
+    smaller, so every shard gets an equal share of every choice; each shard
+    is shuffled
+    """
+    rng = np.random.RandomState(seed)
+    labels = np.asarray(labels)
+    positions = np.empty(len(labels))
+    for c in np.unique(labels):
+        indices = rng.permutation(np.flatnonzero(labels == c))
+        # spread the samples of every choice evenly over the whole order
+        positions[indices] = (np.arange(len(indices)) + rng.uniform(size=len(indices))) / len(indices)
+    order = np.argsort(positions, kind='stable')
+    return [rng.permutation(order[k:k + shard_size]) for k in range(0, len(order), shard_size)]
+
+
+def compact(src_dir, dst_dir, shard_size=1024, render=None):
+    """
+    merge the legacy files of src_dir not compacted yet into shards of
+    shard_size samples; files already listed in the index are skipped, so
+    running it again as new episodes arrive only adds shards. Only the last
+    shard may hold fewer samples, it is filled up first by the next run
+
+    a file rewritten after it was compacted is not compacted again, its old
+    samples are in the shards already; it is only reported
+    """
+    os.makedirs(dst_dir, exist_ok=True)
+    index = load_index(dst_dir)
+    manifest = Manifest(src_dir).update()
+    pending = [file for file in manifest.valid_files() if file not in index['sources']]
+    changed = [file for file in manifest.valid_files()
+               if file in index['sources'] and index['sources'][file] != manifest.entries[file]['mtime']]
+    if len(changed) > 0:
+        logger.warning(f'{len(changed)} files of {src_dir} changed since they were compacted '
+                       f'and are left out, e.g. {changed[0]}; compact into a new directory to include them')
+    if len(pending) == 0:
+        logger.info(f'Nothing to compact in {src_dir}')
+        return ShardedDataset(dst_dir) if len(index['shards']) > 0 else None
+
+    # the last shard is rewritten if it is not full yet
+    first, head = len(index['shards']), None
+    if first > 0 and index['shards'][-1]['samples'] < shard_size:
+        first -= 1
+        head = ColumnarDataset(os.path.join(dst_dir, index['shards'][-1]['name']))
+
+    # one sequential pass over the small files into a memory-mapped staging
+    # dataset, from which the shards are gathered
+    staging_path = os.path.join(dst_dir, STAGING_DIR)
+    staging = convert_legacy(src_dir, staging_path, render, pending, head)
+    del head
+    if index['num_choices'] is None:
+        index['num_choices'] = staging.num_choices
+        index['frame_shape'] = list(staging.frame_shape)
+    elif list(staging.frame_shape) != index['frame_shape']:
+        frame_shape = staging.frame_shape
+        del staging
+        shutil.rmtree(staging_path)
+        raise ValueError(f'Frames of {frame_shape} do not match shards of {index["frame_shape"]}')
+
+    del index['shards'][first:]
+    for indices in stratify(staging.labels, shard_size, seed=first):
+        name = f'shard-{len(index["shards"]):05d}'
+        sorted_indices = np.sort(indices)
+        writer = ColumnarWriter(os.path.join(dst_dir, name), staging.num_choices, staging.frame_shape)
+        # gather in file order, then restore the shuffled order in memory
+        order = np.argsort(np.argsort(indices))
+        writer.append_episode(name, staging.labels[sorted_indices][order],
+                              staging.frames[sorted_indices][order])
+        writer.close()
+        counts = np.bincount(staging.labels[indices], minlength=staging.num_choices)
+        index['shards'].append({'name': name, 'samples': len(indices), 'counts': counts.tolist()})
+
+    # files which failed to convert are listed too, so they are not retried
+    for file in pending:
+        index['sources'][file] = manifest.entries[file]['mtime']
+    save_index(dst_dir, index)
+    del staging
+    shutil.rmtree(staging_path)
+    logger.info(f'Compacted {len(pending)} files into shards {first} to {len(index["shards"]) - 1} of {dst_dir}')
+    return ShardedDataset(dst_dir)
+
+
+def measure_throughput(src_dir, dataset, files_num=200):
+    """
+    compare reading files_num legacy files one np.load at a time, the way the
+    trainers read a chunk, with reading as many samples from the shards
+
+    both sides may be served from the page cache right after compacting
+    """
+    files = sorted(os.listdir(src_dir))[:files_num]
+    start = time.perf_counter()
+    samples, nbytes = 0, 0
+    for file in files:
+        try:
+            data = load_legacy_samples(os.path.join(src_dir, file))
+        except Exception as e:
+            logger.error(f'{file}: {e}')
+            continue
+        for d in data:
+            samples += 1
+            nbytes += np.asarray(d[1]).nbytes
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    shard_samples, shard_bytes = 0, 0
+    for shard in dataset.shards:
+        if shard_samples >= samples:
+            break
+        frames = np.array(shard.frames)
+        shard_samples += len(frames)
+        shard_bytes += frames.nbytes
+    shard_time = time.perf_counter() - start
+
+    report = {
+        'legacy_samples_per_second': samples / max(legacy_time, 1e-9),
+        'legacy_mb_per_second': nbytes / 2 ** 20 / max(legacy_time, 1e-9),
+        'shard_samples_per_second': shard_samples / max(shard_time, 1e-9),
+        'shard_mb_per_second': shard_bytes / 2 ** 20 / max(shard_time, 1e-9)
+    }
+    logger.info(f'Per-file reads: {report["legacy_samples_per_second"]:.0f} samples/s, '
+                f'{report["legacy_mb_per_second"]:.1f} MB/s; '
+                f'shard reads: {report["shard_samples_per_second"]:.0f} samples/s, '
+                f'{report["shard_mb_per_second"]:.1f} MB/s')
+    return report
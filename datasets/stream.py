@@ -0,0 +1,208 @@
+from .columnar import read_legacy_file
+from ..loggers import logger
+
+import os
+import queue
+import threading
+
+import numpy as np
+
+# seconds a blocked worker waits before checking whether the stream closed
+POLL_INTERVAL = 0.1
+
+
+class BatchStream:
+    """
+    stream shuffled, balanced batches from the files of a manifest
+
+    worker threads decode files while the current batch trains; samples pass
+    through a bounded shuffle buffer and are kept with probability
+    lowest count / count of their choice, so every pass is balanced in
+    expectation; memory is bounded by the buffer, the decoded files in
+    flight and the prefetched batches, however many files there are
+
+    an error of a worker, or failing to decode a whole round of files in a
+    row, stops the stream and is raised by the next call of next(); with a
+    seed the batches are reproducible for a single worker only, more workers
+    hand their files over in whatever order they finish
+    """
+
+    def __init__(self, data_dir, manifest, render, spec, num_choices, batch_size,
+                 test_size=0, buffer_size=1024, workers=2, prefetch=4, seed=None):
+        self.data_dir = data_dir
+        self.render = render
+        self.spec = spec
+        self.num_choices = num_choices
+        self.batch_size = batch_size
+        self.rng = np.random.RandomState(seed)
+        # every thread draws from its own generator
+        self.files_rng = np.random.RandomState(self.rng.randint(2 ** 31))
+        self.assemble_rng = np.random.RandomState(self.rng.randint(2 ** 31))
+
+        files = manifest.valid_files()
+        self.rng.shuffle(files)
+        self.x_test, self.y_test, self.test_files = self.hold_out(files, manifest, test_size)
+        self.files = [file for file in files if file not in self.test_files]
+        if len(self.files) == 0:
+            raise ValueError(f'No training files left in {data_dir}')
+
+        counts = manifest.counts(self.files)[:num_choices]
+        counts = np.pad(counts, (0, num_choices - len(counts)), 'constant')
+        lowest_count = counts.min()
+        if lowest_count == 0:
+            raise ValueError(f'Some choices never occur in {data_dir}: {counts.tolist()}')
+        self.keep_ratios = lowest_count / counts
+        self.steps = max(int(lowest_count * num_choices) // batch_size, 1)
+
+        self.buffer_frames = np.empty((buffer_size,) + spec.shape, np.uint8)
+        self.buffer_labels = np.empty(buffer_size, np.int8)
+        self.buffer_fill = 0
+
+        self.stop = threading.Event()
+        self.error = None
+        self.failures = 0
+        self.lock = threading.Lock()
+        self.next_files = self.cycle_files()
+        self.decoded = queue.Queue(maxsize=workers)
+        self.batches = queue.Queue(maxsize=prefetch)
+        self.threads = [threading.Thread(target=self.decode, daemon=True) for _ in range(workers)]
+        self.threads.append(threading.Thread(target=self.assemble, daemon=True))
+        for thread in self.threads:
+            thread.start()
+
+    def hold_out(self, files, manifest, test_size):
+        """
+        set aside the first files until they hold test_size balanced samples
+        """
+        if test_size == 0:
+            return None, None, list()
+        test_files = list()
+        for file in files:
+            test_files.append(file)
+            if manifest.balanced_length(test_files, self.num_choices) * self.num_choices >= test_size:
+                break
+        else:
+            raise ValueError(f'Not enough balanced samples in {self.data_dir} to test on')
+
+        x, y = list(), list()
+        for file in test_files:
+            choices, frames, _ = read_legacy_file(os.path.join(self.data_dir, file), self.render)
+            x.extend(self.spec.convert(frame) for frame in frames)
+            y.extend(choices)
+        y = np.array(y)
+        lowest_length = min(np.sum(y == c) for c in range(self.num_choices))
+        indices = np.concatenate([self.rng.permutation(np.flatnonzero(y == c))[:lowest_length]
+                                  for c in range(self.num_choices)])
+        indices = self.rng.permutation(indices)[:test_size]
+        x_test = np.array([x[i] for i in indices], np.uint8).reshape((-1,) + self.spec.shape)
+        y_test = np.eye(self.num_choices, dtype=np.float32)[y[indices]]
+        return x_test, y_test, test_files
+
+    def cycle_files(self):
+        while True:
+            files = list(self.files)
+            self.files_rng.shuffle(files)
+            for file in files:
+                yield file
+
+    def put(self, q, item):
+        while not self.stop.is_set():
+            try:
+                q.put(item, timeout=POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def fail(self, error):
+        """
+        stop the stream; the first error is raised to the consumer
+        """
+        with self.lock:
+            if self.error is None:
+                self.error = error
+        self.stop.set()
+
+    def decode(self):
+        try:
+            while not self.stop.is_set():
+                with self.lock:
+                    file = next(self.next_files)
+                try:
+                    choices, frames, _ = read_legacy_file(os.path.join(self.data_dir, file), self.render)
+                except Exception as e:
+                    logger.error(f'{file}: {e}')
+                    with self.lock:
+                        self.failures += 1
+                        if self.failures >= len(self.files):
+                            raise ValueError(f'Could not decode {self.failures} files of {self.data_dir} in a row')
+                    continue
+                with self.lock:
+                    self.failures = 0
+                if not self.put(self.decoded, (choices, frames)):
+                    return
+        except Exception as e:
+            self.fail(e)
+
+    def assemble(self):
+        try:
+            self.assemble_batches()
+        except Exception as e:
+            self.fail(e)
+
+    def assemble_batches(self):
+        x = np.empty((self.batch_size,) + self.spec.shape, np.uint8)
+        y = np.empty(self.batch_size, np.int8)
+        filled = 0
+        while not self.stop.is_set():
+            try:
+                choices, frames = self.decoded.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            kept = np.flatnonzero(self.assemble_rng.random_sample(len(choices)) < self.keep_ratios[choices])
+            for i in kept:
+                frame, label = self.shuffle(self.spec.convert(frames[i]), choices[i])
+                if frame is None:
+                    continue
+                x[filled] = frame.reshape(self.spec.shape)
+                y[filled] = label
+                filled += 1
+                if filled == self.batch_size:
+                    batch = (x.copy(), np.eye(self.num_choices, dtype=np.float32)[y])
+                    if not self.put(self.batches, batch):
+                        return
+                    filled = 0
+
+    def shuffle(self, frame, label):
+        """
+        put a sample into the shuffle buffer; once it is full, a random sample
+        leaves it in exchange
+        """
+        if self.buffer_fill < len(self.buffer_labels):
+            self.buffer_frames[self.buffer_fill] = frame.reshape(self.spec.shape)
+            self.buffer_labels[self.buffer_fill] = label
+            self.buffer_fill += 1
+            return None, None
+        i = self.assemble_rng.randint(len(self.buffer_labels))
+        out = self.buffer_frames[i].copy(), self.buffer_labels[i]
+        self.buffer_frames[i] = frame.reshape(self.spec.shape)
+        self.buffer_labels[i] = label
+        return out
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while True:
+            try:
+                return self.batches.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if self.error is not None:
+                    raise self.error
+                if self.stop.is_set():
+                    raise StopIteration
+
+    def close(self):
+        self.stop.set()
+        for thread in self.threads:
+            thread.join()
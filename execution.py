@@ -0,0 +1,93 @@
+from .loggers import logger
+
+import os
+
+
+def available_cores():
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class ExecutionProfile:
+    """
+    how the TensorFlow session of this process uses the machine: which
+    device, how many intra-op and inter-op threads and, if pinned, which
+    cores; 0 threads lets TensorFlow pick
+
+    TensorFlow is only imported once the profile is applied
+    """
+
+    def __init__(self, device='gpu', intra_op_threads=0, inter_op_threads=0,
+                 gpu_fraction=0.85, cores=None):
+        self.device = device
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.gpu_fraction = gpu_fraction
+        self.cores = cores
+
+    @staticmethod
+    def gpu(gpu_fraction=0.85):
+        return ExecutionProfile('gpu', gpu_fraction=gpu_fraction)
+
+    @staticmethod
+    def cpu(mode, games=1, game_index=0, pin=False, cores=None):
+        """
+        split cores between games concurrent game processes; a game leaves
+        half of its share to its StarCraft II client, training takes all
+        """
+        cores = available_cores() if cores is None else list(cores)
+        games = max(min(games, len(cores)), 1)
+        share = len(cores) // games
+        own_cores = cores[game_index % games * share:(game_index % games + 1) * share]
+        if mode == 'game':
+            intra_op_threads, inter_op_threads = max(share // 2, 1), 1
+        else:
+            intra_op_threads, inter_op_threads = share, min(2, share)
+        return ExecutionProfile('cpu', intra_op_threads, inter_op_threads,
+                                cores=own_cores if pin else None)
+
+    def config_proto(self):
+        import tensorflow as tf
+
+        config = tf.ConfigProto(
+            intra_op_parallelism_threads=self.intra_op_threads,
+            inter_op_parallelism_threads=self.inter_op_threads
+        )
+        if self.device == 'cpu':
+            config.device_count['GPU'] = 0
+        else:
+            config.gpu_options.per_process_gpu_memory_fraction = self.gpu_fraction
+        return config
+
+    def pin(self):
+        """
+        restrict the process to the cores of the profile, if it has any, and
+        log the profile
+        """
+        if self.cores is not None:
+            if hasattr(os, 'sched_setaffinity'):
+                os.sched_setaffinity(0, self.cores)
+            else:
+                logger.warning('Pinning to cores is not supported on this platform')
+        logger.info(f'Execution profile: {self}')
+        return self
+
+    def apply(self):
+        """
+        pin the process to its cores and install the keras session
+        """
+        import tensorflow as tf
+        import keras.backend.tensorflow_backend as backend
+
+        self.pin()
+        backend.set_session(tf.Session(config=self.config_proto()))
+        return self
+
+    def __repr__(self):
+        if self.device == 'gpu':
+            return f'ExecutionProfile(gpu, memory fraction {self.gpu_fraction}, ' \
+                f'intra-op {self.intra_op_threads}, inter-op {self.inter_op_threads})'
+        cores = 'unpinned' if self.cores is None else f'cores {self.cores}'
+        return f'ExecutionProfile(cpu, intra-op {self.intra_op_threads}, ' \
+            f'inter-op {self.inter_op_threads}, {cores})'
@@ -8,28 +8,43 @@ from sc2.player import Bot, Computer
 
 class GameLauncher:
 
-    def __init__(self, bot, use_model, model_path, realtime):
+    def __init__(self, bot, use_model, model_path, realtime, headless=False, downscale=1,
+                 record_units=False, inference_timeout=None, threaded_inference=True, fallback_choice=None,
+                 cache_size=0, cache_ttl=None, cache_block=8):
         logger.debug('Game Launcher inited')
         self.map = 'AbyssalReefLE'
         self.bot = bot
         self.use_model = use_model
         self.model_path = model_path
         self.realtime = realtime
+        self.headless = headless
+        self.downscale = downscale
+        self.record_units = record_units
+        self.inference_timeout = inference_timeout
+        self.threaded_inference = threaded_inference
+        self.fallback_choice = fallback_choice
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.cache_block = cache_block
         self.difficulty_dict = {
             'easy': Difficulty.Easy,
             'medium': Difficulty.Medium,
             'hard': Difficulty.Hard
         }
 
-    def create_bot(self, bot_title, train_data_tensor):
+    def create_bot(self, bot_title, episode_writer):
         return Bot(
             Race.Protoss,
-            self.bot(train_data_tensor, self.use_model, bot_title, self.model_path)
+            self.bot(episode_writer, self.use_model, bot_title, self.model_path,
+                     headless=self.headless, downscale=self.downscale,
+                     record_units=self.record_units, inference_timeout=self.inference_timeout,
+                     threaded_inference=self.threaded_inference, fallback_choice=self.fallback_choice,
+                     cache_size=self.cache_size, cache_ttl=self.cache_ttl, cache_block=self.cache_block)
         )
 
-    def start_game(self, difficulty, train_data_tensor):
+    def start_game(self, difficulty, episode_writer):
         result = run_game(maps.get(self.map), [
-            self.create_bot('bot 1', train_data_tensor),
+            self.create_bot('bot 1', episode_writer),
             self.create_computer(difficulty)
         ], realtime=self.realtime)
         return result
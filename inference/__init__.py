@@ -0,0 +1,5 @@
+from .backends import check_saved_spec, load_backend
+from .cache import PredictionCache
+from .numpy_backend import NumpyBackend
+from .preload import ModelPreloader
+from .service import InferenceService
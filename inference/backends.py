@@ -0,0 +1,37 @@
+from .numpy_backend import NumpyBackend
+from ..observation import ObservationSpec, load_spec
+
+import os
+
+import numpy as np
+
+# suffix of models exported for the NumPy backend
+NUMPY_SUFFIX = '.npz'
+
+
+def load_backend(path, spec):
+    """
+    load the model at path with the backend it was saved for: exported .npz
+    files run on NumPy, anything else on keras, which is only imported then
+    """
+    if path.endswith(NUMPY_SUFFIX):
+        return NumpyBackend.load(path, spec)
+    from .keras_backend import KerasBackend
+    return KerasBackend.load(path, spec)
+
+
+def check_saved_spec(path, spec):
+    """
+    make sure the model at path was saved for observations of spec; only the
+    spec saved with it is read, so this is cheap enough to run before the
+    game starts while the model itself loads in the background
+    """
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f'No model at {path}')
+    if path.endswith(NUMPY_SUFFIX):
+        with np.load(path) as f:
+            saved_spec = ObservationSpec.from_json(str(f['spec'])) if 'spec' in f else None
+    else:
+        saved_spec = load_spec(path)
+    if saved_spec is not None and saved_spec != spec:
+        raise ValueError(f'Model {path} was trained on {saved_spec}, not {spec}')
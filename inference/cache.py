@@ -0,0 +1,66 @@
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+    """
+    LRU cache of predictions keyed by a coarse hash of the observation: which
+    block x block cells of every channel hold anything, plus the resource
+    ratios cut into resource_levels steps; frames which differ by less share
+    a prediction
+
+    entries older than ttl seconds of clock are predicted anew
+    """
+
+    def __init__(self, capacity=256, ttl=None, block=8, resource_levels=20, clock=time.monotonic):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.block = block
+        self.resource_levels = resource_levels
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def key(self, observation, resources=None):
+        block = self.block
+        height, width = observation.shape[0] // block * block, observation.shape[1] // block * block
+        # pool rows, then columns; one reduction over both axes is 8x slower
+        rows = observation[:height, :width].reshape(height // block, block, width, -1).max(axis=1)
+        cells = rows.reshape(height // block, width // block, block, -1).max(axis=2)
+        occupancy = np.packbits(cells > 0)
+        levels = tuple() if resources is None else \
+            tuple(int(r * self.resource_levels) for r in resources)
+        return occupancy.tobytes(), levels
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None and self.ttl is not None and self.clock() - entry[1] > self.ttl:
+            del self.entries[key]
+            self.expired += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, prediction):
+        self.entries[key] = (prediction, self.clock())
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def get_stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'cache_hits': self.hits,
+            'cache_misses': self.misses,
+            'cache_expired': self.expired,
+            'cache_hit_rate': round(self.hits / lookups, 3) if lookups > 0 else None,
+            'cache_entries': len(self.entries)
+        }
@@ -0,0 +1,63 @@
+"""
+export a saved keras model for the NumPy backend
+
+$ python -m yuri.inference.export <model path> <exported path>.npz
+"""
+import argparse
+
+from .numpy_backend import NumpyBackend
+from ..loggers import logger
+from ..models import load_spec
+
+from keras.models import load_model
+
+
+def export_layers(model):
+    """
+    the layer list and weights of model for NumpyBackend
+    """
+    layers, weights = list(), list()
+    for layer in model.layers:
+        config = layer.get_config()
+        kind = layer.__class__.__name__
+        if kind == 'Conv2D':
+            if tuple(config['strides']) != (1, 1) or tuple(config['dilation_rate']) != (1, 1):
+                raise ValueError(f'{layer.name}: only stride 1, undilated convolutions are supported')
+            layers.append({'type': 'conv2d', 'padding': config['padding'], 'activation': config['activation']})
+        elif kind == 'MaxPooling2D':
+            if tuple(config['strides']) != tuple(config['pool_size']) or config['padding'] != 'valid':
+                raise ValueError(f'{layer.name}: only valid pooling with strides of the pool size is supported')
+            layers.append({'type': 'max_pooling2d', 'pool_size': list(config['pool_size'])})
+        elif kind == 'Flatten':
+            layers.append({'type': 'flatten'})
+        elif kind == 'Dense':
+            layers.append({'type': 'dense', 'activation': config['activation']})
+        elif kind == 'Dropout':
+            continue
+        else:
+            raise ValueError(f'{layer.name}: {kind} layers are not supported')
+        if kind in ('Conv2D', 'Dense'):
+            if not config['use_bias']:
+                raise ValueError(f'{layer.name}: layers without bias are not supported')
+            weights.extend(layer.get_weights())
+    return layers, weights
+
+
+def export_model(model, path, spec=None):
+    backend = NumpyBackend(*export_layers(model), spec)
+    backend.save(path)
+    return backend
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='export.py')
+    parser.add_argument('model', help='saved keras model')
+    parser.add_argument('dst', help='exported model, ending in .npz')
+    cmd_args = parser.parse_args()
+
+    export_model(load_model(cmd_args.model), cmd_args.dst, load_spec(cmd_args.model))
+    logger.info(f'Exported {cmd_args.model} to {cmd_args.dst}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+from ..models import check_spec
+
+from keras import backend
+from keras.models import load_model
+
+
+class KerasBackend:
+    """
+    predict with a keras model; predictions may come from another thread, they
+    run in the graph the model was built in
+    """
+
+    def __init__(self, model):
+        self.model = model
+        # keras builds its predict function lazily in the graph of the first
+        # caller; build it here
+        model._make_predict_function()
+        self.graph = backend.get_session().graph
+
+    @staticmethod
+    def load(path, spec):
+        model = load_model(path)
+        check_spec(model, path, spec)
+        return KerasBackend(model)
+
+    def predict(self, x):
+        with self.graph.as_default():
+            return self.model.predict(x)
@@ -0,0 +1,158 @@
+from ..observation import ObservationSpec
+
+import json
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+# layer types an exported model may hold, see export.py
+LAYER_TYPES = ['conv2d', 'max_pooling2d', 'flatten', 'dense']
+
+
+def relu(x):
+    return np.maximum(x, 0, out=x)
+
+
+def softmax(x):
+    x = np.exp(x - x.max(axis=-1, keepdims=True))
+    return x / x.sum(axis=-1, keepdims=True)
+
+
+ACTIVATIONS = {'linear': lambda x: x, 'relu': relu, 'softmax': softmax}
+
+# rows of an int8 dense kernel turned back to float32 at a time
+DEQUANTIZE_BLOCK = 4096
+
+
+class Int8Weight:
+    """
+    a kernel stored as int8 with one float32 scale per output channel, the
+    last axis; it is turned back to float32 only block by block while it is
+    used, so it stays a quarter of the size in memory
+    """
+
+    def __init__(self, values, scales):
+        self.values = values
+        self.scales = np.asarray(scales, np.float32)
+        self.shape = values.shape
+        self.nbytes = values.nbytes + self.scales.nbytes
+
+    def dequantize(self):
+        return self.values.astype(np.float32) * self.scales
+
+    def reshape(self, *shape):
+        return self.dequantize().reshape(*shape)
+
+    def dot(self, x):
+        """
+        x @ kernel
+        """
+        out = np.zeros((len(x), self.shape[-1]), np.float32)
+        for start in range(0, self.shape[0], DEQUANTIZE_BLOCK):
+            out += x[:, start:start + DEQUANTIZE_BLOCK] @ \
+                self.values[start:start + DEQUANTIZE_BLOCK].astype(np.float32)
+        out *= self.scales
+        return out
+
+
+def conv2d(x, kernel, bias, padding):
+    """
+    a stride 1 convolution as one matrix product: every output pixel's
+    receptive field is laid out as a row (im2col) and multiplied by the kernel
+    flattened in the same (height, width, channel) order
+    """
+    kh, kw, channels, filters = kernel.shape
+    if padding == 'same':
+        # padded like TensorFlow, the odd pixel goes to the bottom and right
+        top, left = (kh - 1) // 2, (kw - 1) // 2
+        x = np.pad(x, ((0, 0), (top, kh - 1 - top), (left, kw - 1 - left), (0, 0)), 'constant')
+    n, h, w, _ = x.shape
+    out_h, out_w = h - kh + 1, w - kw + 1
+    s = x.strides
+    cols = as_strided(x, (n, out_h, out_w, kh, kw, channels), (s[0], s[1], s[2], s[1], s[2], s[3]))
+    out = cols.reshape(n * out_h * out_w, kh * kw * channels) @ kernel.reshape(-1, filters)
+    out += bias
+    return out.reshape(n, out_h, out_w, filters)
+
+
+def max_pooling2d(x, pool_size):
+    ph, pw = pool_size
+    n, h, w, c = x.shape
+    x = x[:, :h // ph * ph, :w // pw * pw]
+    return x.reshape(n, h // ph, ph, w // pw, pw, c).max(axis=(2, 4))
+
+
+class NumpyBackend:
+    """
+    run a CNN exported by export.py with NumPy alone: no TensorFlow session,
+    no Keras; dropout is left out as at inference time
+
+    layers is a list of dicts with a type of LAYER_TYPES and its settings,
+    weights their kernels and biases in order; kernels may be Int8Weight,
+    see quantize.py
+    """
+
+    def __init__(self, layers, weights, spec=None):
+        self.layers = layers
+        self.weights = [w if isinstance(w, Int8Weight) else np.asarray(w, np.float32) for w in weights]
+        self.spec = spec
+        self.params = list()
+        weights = iter(self.weights)
+        for layer in layers:
+            if layer['type'] in ('conv2d', 'dense'):
+                self.params.append((next(weights), next(weights)))
+            else:
+                self.params.append(())
+
+    @staticmethod
+    def load(path, spec=None):
+        """
+        load an exported model, checking it was trained on observations of
+        spec
+        """
+        with np.load(path) as f:
+            layers = json.loads(str(f['layers']))
+            weights = [Int8Weight(f[f'weight_{i}'], f[f'scale_{i}']) if f'scale_{i}' in f else f[f'weight_{i}']
+                       for i in range(int(f['weights_num']))]
+            saved_spec = ObservationSpec.from_json(str(f['spec'])) if 'spec' in f else None
+        if spec is not None and saved_spec is not None and saved_spec != spec:
+            raise ValueError(f'Model {path} was trained on {saved_spec}, not {spec}')
+        return NumpyBackend(layers, weights, saved_spec if saved_spec is not None else spec)
+
+    def save(self, path):
+        arrays = dict()
+        for i, w in enumerate(self.weights):
+            if isinstance(w, Int8Weight):
+                arrays[f'weight_{i}'], arrays[f'scale_{i}'] = w.values, w.scales
+            else:
+                arrays[f'weight_{i}'] = w
+        if self.spec is not None:
+            arrays['spec'] = np.array(self.spec.to_json())
+        np.savez(path, layers=np.array(json.dumps(self.layers)), weights_num=np.array(len(self.weights)),
+                 **arrays)
+
+    def nbytes(self):
+        return sum(w.nbytes for w in self.weights)
+
+    def predict(self, x):
+        x = np.asarray(x, np.float32)
+        for layer, params in zip(self.layers, self.params):
+            x = apply_layer(layer, x, params)
+        return x
+
+
+def apply_layer(layer, x, params):
+    if layer['type'] == 'conv2d':
+        kernel, bias = params
+        x = conv2d(x, kernel, bias, layer['padding'])
+    elif layer['type'] == 'max_pooling2d':
+        x = max_pooling2d(x, layer['pool_size'])
+    elif layer['type'] == 'flatten':
+        x = x.reshape(len(x), -1)
+    elif layer['type'] == 'dense':
+        kernel, bias = params
+        x = kernel.dot(x) if isinstance(kernel, Int8Weight) else x @ kernel
+        x += bias
+    if 'activation' in layer:
+        x = ACTIVATIONS[layer['activation']](x)
+    return x
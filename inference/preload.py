@@ -0,0 +1,46 @@
+from .backends import load_backend
+from ..loggers import logger
+
+import time
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class ModelPreloader:
+    """
+    load a saved model and warm it up with a forward pass on a dummy frame on
+    a background thread; the bot is built without waiting for it and the
+    first decision does not pay for building the graph
+
+    future resolves to the warm inference backend, see load_backend
+    """
+
+    def __init__(self, model_path, spec):
+        self.model_path = model_path
+        self.spec = spec
+        self.future = Future()
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.thread = threading.Thread(target=self.run, name='model-preload', daemon=True)
+        self.thread.start()
+
+    def run(self):
+        try:
+            self.future.set_result(self.load())
+        except Exception as e:
+            logger.error(f'Could not load {self.model_path}: {e}')
+            self.future.set_exception(e)
+
+    def load(self):
+        start = time.perf_counter()
+        model = load_backend(self.model_path, self.spec)
+        self.load_seconds = time.perf_counter() - start
+        logger.info(f'Loaded {self.model_path} in {self.load_seconds * 1000:.0f}ms')
+
+        start = time.perf_counter()
+        model.predict(np.zeros((1,) + self.spec.shape, np.uint8))
+        self.warmup_seconds = time.perf_counter() - start
+        logger.info(f'Warmed up {self.model_path} in {self.warmup_seconds * 1000:.0f}ms')
+        return model
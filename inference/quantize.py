@@ -0,0 +1,143 @@
+"""
+quantize a model for the NumPy backend to int8 kernels with one scale per
+output channel, calibrated on frames of the training data, and report its
+accuracy, size and latency against float32
+
+$ python -m yuri.inference.quantize <model path> <training data directory> <dst>.npz [--type attack | full] [--calibration 64] [--evaluation 256]
+
+the model is a saved keras model or one exported with yuri.inference.export
+"""
+import time
+import argparse
+
+from .backends import NUMPY_SUFFIX
+from .numpy_backend import Int8Weight, NumpyBackend, apply_layer
+from ..datasets import Manifest, ParallelLoader
+from ..loggers import logger
+from ..observation import CHROMATIC_SPEC, MONOCHROME_SPEC
+
+import numpy as np
+
+# per-channel percentiles of the absolute weights tried as the int8 range;
+# clipping a few outliers buys resolution for all other weights
+PERCENTILES = [100, 99.99, 99.9, 99.5]
+
+
+def quantize_kernel(kernel, percentile=100):
+    magnitudes = np.abs(kernel).reshape(-1, kernel.shape[-1])
+    limits = magnitudes.max(axis=0) if percentile == 100 else np.percentile(magnitudes, percentile, axis=0)
+    scales = (np.maximum(limits, 1e-12) / 127).astype(np.float32)
+    values = np.clip(np.round(kernel / scales), -127, 127).astype(np.int8)
+    return Int8Weight(values, scales)
+
+
+def calibrate(backend, frames):
+    """
+    quantize every kernel of backend with the percentile whose layer outputs
+    on frames come closest to float32, given the float32 inputs
+    """
+    candidates = [[quantize_kernel(params[0], p) for p in PERCENTILES] if params else list()
+                  for params in backend.params]
+    errors = np.zeros((len(backend.layers), len(PERCENTILES)))
+    for frame in frames:
+        x = frame[np.newaxis].astype(np.float32)
+        for i, (layer, params) in enumerate(zip(backend.layers, backend.params)):
+            out = apply_layer(layer, x, params)
+            for j, kernel in enumerate(candidates[i]):
+                errors[i, j] += np.mean(np.square(apply_layer(layer, x, (kernel, params[1])) - out))
+            x = out
+
+    weights = list()
+    for i, params in enumerate(backend.params):
+        if not params:
+            continue
+        best = int(np.argmin(errors[i]))
+        logger.info(f'Layer {i} {backend.layers[i]["type"]}: {PERCENTILES[best]} percentile, '
+                    f'output mse {errors[i, best] / len(frames):.3g}')
+        weights.extend([candidates[i][best], params[1]])
+    return NumpyBackend(backend.layers, weights, backend.spec)
+
+
+def sample_frames(data_dir, spec, num_choices, sizes, seed=0):
+    """
+    frames and labels of sizes random samples each, every sample set read
+    from its own files
+    """
+    rng = np.random.RandomState(seed)
+    manifest = Manifest(data_dir).update()
+    files = manifest.valid_files()
+    rng.shuffle(files)
+    loader = ParallelLoader(data_dir, manifest, spec, num_choices)
+    samples = list()
+    for size in sizes:
+        chosen = list()
+        while files and sum(manifest.entries[file]['samples'] for file in chosen) < size:
+            chosen.append(files.pop())
+        frames, labels, _ = loader.load(chosen)
+        indices = rng.permutation(len(labels))[:size]
+        samples.append((frames[indices], labels[indices]))
+    return samples
+
+
+def measure(backend, frames):
+    choices = list()
+    start = time.perf_counter()
+    for frame in frames:
+        choices.append(int(np.argmax(backend.predict(frame[np.newaxis]))))
+    seconds = (time.perf_counter() - start) / max(len(frames), 1)
+    return np.array(choices), seconds
+
+
+def report(float_backend, int8_backend, frames, labels):
+    float_choices, float_seconds = measure(float_backend, frames)
+    int8_choices, int8_seconds = measure(int8_backend, frames)
+    float_accuracy = float(np.mean(float_choices == labels))
+    int8_accuracy = float(np.mean(int8_choices == labels))
+    return {
+        'frames': len(frames),
+        'float32_accuracy': float_accuracy,
+        'int8_accuracy': int8_accuracy,
+        'accuracy_delta': int8_accuracy - float_accuracy,
+        'argmax_agreement': float(np.mean(float_choices == int8_choices)),
+        'float32_bytes': float_backend.nbytes(),
+        'int8_bytes': int8_backend.nbytes(),
+        'float32_ms': float_seconds * 1000,
+        'int8_ms': int8_seconds * 1000
+    }
+
+
+def load_float(path):
+    if path.endswith(NUMPY_SUFFIX):
+        return NumpyBackend.load(path)
+    from .export import export_layers
+    from ..models import load_spec
+    from keras.models import load_model
+    return NumpyBackend(*export_layers(load_model(path)), load_spec(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='quantize.py')
+    parser.add_argument('model', help='saved keras model or exported .npz model')
+    parser.add_argument('data', help='training data directory to calibrate and evaluate on')
+    parser.add_argument('dst', help='quantized model, ending in .npz')
+    parser.add_argument('--type', choices=['attack', 'full'], default='attack',
+                        help='observations of models saved without their spec')
+    parser.add_argument('--calibration', type=int, default=64, help='frames to calibrate on')
+    parser.add_argument('--evaluation', type=int, default=256, help='frames to report on')
+    cmd_args = parser.parse_args()
+
+    float_backend = load_float(cmd_args.model)
+    if float_backend.spec is None:
+        float_backend.spec = CHROMATIC_SPEC if cmd_args.type == 'attack' else MONOCHROME_SPEC
+    num_choices = float_backend.params[-1][0].shape[-1]
+    (calibration_frames, _), (frames, labels) = sample_frames(
+        cmd_args.data, float_backend.spec, num_choices, [cmd_args.calibration, cmd_args.evaluation])
+
+    int8_backend = calibrate(float_backend, calibration_frames)
+    int8_backend.save(cmd_args.dst)
+    logger.info(f'Quantized {cmd_args.model} to {cmd_args.dst}: '
+                f'{report(float_backend, int8_backend, frames, labels)}')
+
+
+if __name__ == '__main__':
+    main()
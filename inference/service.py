@@ -0,0 +1,110 @@
+from ..loggers import logger
+
+import time
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+
+class InferenceService:
+    """
+    run model predictions on a dedicated thread and await them, so the event
+    loop, and with it python-sc2's websocket, keeps running during a forward
+    pass
+
+    a prediction later than timeout seconds resolves to None and the caller
+    falls back; it still finishes on the thread, and requests made before it
+    does resolve to None right away instead of queueing up behind it. With
+    threaded=False predictions run inline, as they used to
+
+    model is an inference backend, anything with predict(x), or a Future of
+    one still loading, see ModelPreloader; predictions wait for it without
+    blocking the loop, or resolve to None while it loads if there is a
+    timeout
+
+    with a PredictionCache, observations which hash alike share a
+    prediction; misses are predicted by the model
+    """
+
+    def __init__(self, model, timeout=None, threaded=True, cache=None):
+        self.model = None
+        self.cache = cache
+        self.loading = None
+        self.timeout = timeout
+        self.threaded = threaded
+        self.executor = ThreadPoolExecutor(max_workers=1) if threaded else None
+        self.running = None
+        self.latencies = list()
+        self.late = 0
+        self.created = time.perf_counter()
+        self.first_decision = True
+        if isinstance(model, Future):
+            self.loading = model
+        else:
+            self.set_model(model)
+
+    def set_model(self, model):
+        self.model = model
+        self.loading = None
+
+    def run(self, x):
+        start = time.perf_counter()
+        prediction = self.model.predict(x)
+        self.latencies.append(time.perf_counter() - start)
+        return prediction
+
+    async def predict(self, x, resources=None):
+        """
+        the prediction of the model for the batch x, None if it is late;
+        resources are the monitor's resource ratios, part of the cache key
+        """
+        key = None
+        if self.cache is not None and len(x) == 1:
+            key = self.cache.key(x[0], resources)
+            prediction = self.cache.get(key)
+            if prediction is not None:
+                return prediction
+
+        start = time.perf_counter()
+        prediction = await self.predict_now(x)
+        if key is not None and prediction is not None:
+            self.cache.put(key, prediction)
+        if self.first_decision and prediction is not None:
+            self.first_decision = False
+            logger.info(f'First decision took {(time.perf_counter() - start) * 1000:.0f}ms, '
+                        f'{(time.perf_counter() - self.created):.1f}s after the model was requested')
+        return prediction
+
+    async def predict_now(self, x):
+        if self.loading is not None:
+            if self.timeout is not None and not self.loading.done():
+                self.late += 1
+                return None
+            self.set_model(await asyncio.wrap_future(self.loading))
+        if not self.threaded:
+            return self.run(x)
+        if self.running is not None and not self.running.done():
+            self.late += 1
+            return None
+        self.running = asyncio.get_event_loop().run_in_executor(self.executor, self.run, x)
+        try:
+            return await asyncio.wait_for(asyncio.shield(self.running), self.timeout)
+        except asyncio.TimeoutError:
+            self.late += 1
+            logger.warning(f'Prediction later than {self.timeout * 1000:.0f}ms, falling back')
+            return None
+
+    def get_stats(self):
+        stats = {'predictions': len(self.latencies), 'late': self.late}
+        if self.cache is not None:
+            stats.update(self.cache.get_stats())
+        if len(self.latencies) > 0:
+            stats.update(zip(['p50_ms', 'p95_ms', 'p99_ms'],
+                             (np.percentile(self.latencies, [50, 95, 99]) * 1000).round(2).tolist()))
+        return stats
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
@@ -1,76 +1,213 @@
-import os
 import time
+
+# taken before any other import, so --startup-only reports all of startup
+start_time = time.perf_counter()
+
+import os
+import sys
 import argparse
 import datetime
 
-from .gamelauncher import GameLauncher
-from .trainers import FullTrainer, AttackTrainer
-from .mainbot import MainBot
+from .execution import ExecutionProfile
+from .inference.backends import NUMPY_SUFFIX
 from .loggers import logger
+from .observation import CHROMATIC_SPEC, MONOCHROME_SPEC
 
-import numpy as np
-from sc2 import Result
-
-import tensorflow as tf
-import keras.backend.tensorflow_backend as backend
+# the modules of a mode are imported once it is chosen: a game without a
+# keras model never imports TensorFlow
 
 
 MODEL_PATH = 'BasicCNN-10-epochs-0.0001-LR-STAGE1'
 
-
-def get_session(gpu_fraction=0.85):
-    gpu_options = tf.GPUOptions(per_process_gpu_memory_fraction=gpu_fraction)
-    return tf.Session(config=tf.ConfigProto(gpu_options=gpu_options))
-
-
-backend.set_session(get_session())
-
 parser = argparse.ArgumentParser(
     prog='main.py',
     description='Yuri, the StarCraft II bot'
 )
 parser.add_argument('--type')
 parser.add_argument('--model', help='model path')
+parser.add_argument('--data', help='training data directory, legacy files or a columnar dataset')
+parser.add_argument(
+    '--stream', action='store_true',
+    help='Train on batches streamed from the training files instead of whole chunks'
+)
+parser.add_argument(
+    '--sampling', choices=['balanced', 'truncate'], default='balanced',
+    help='Draw every choice equally often, oversampling rare ones, or cut every choice to the rarest'
+)
+parser.add_argument(
+    '--workers', type=int, default=1,
+    help='Processes decoding training files in parallel'
+)
+parser.add_argument(
+    '--checkpoint-minutes', type=float,
+    help='Save the model at most this often instead of after every chunk'
+)
+parser.add_argument('--keep-last', type=int, help='Also keep this many numbered checkpoints')
+parser.add_argument(
+    '--keep-best', action='store_true',
+    help='Also keep the checkpoint of best validation accuracy'
+)
 parser.add_argument('--difficulty', help='computer difficulty')
 parser.add_argument(
     '--realtime', action='store_true',
     help='Run the game in realtime speed'
 )
+parser.add_argument(
+    '--headless', action='store_true',
+    help='Run the game without the monitor window'
+)
+parser.add_argument(
+    '--inference-timeout', type=float,
+    help='Milliseconds a prediction may take before the bot falls back to a default choice'
+)
+parser.add_argument(
+    '--inline-inference', action='store_true',
+    help='Predict inside the game step instead of on the inference thread'
+)
+parser.add_argument('--fallback-choice', type=int, help='choice taken when a prediction is late')
+parser.add_argument(
+    '--cache-size', type=int, default=0,
+    help='Remember this many predictions of observations which look alike; 0 turns the cache off'
+)
+parser.add_argument('--cache-ttl', type=float, help='game seconds a cached prediction stays valid')
+parser.add_argument('--cache-block', type=int, default=8, help='cell size in pixels of the cache key')
+parser.add_argument(
+    '--records', action='store_true',
+    help='Record compact unit lists instead of frames; they are rasterized while training'
+)
+parser.add_argument(
+    '--downscale', type=int, default=1,
+    help='Shrink observations by this factor for recording, playing and training'
+)
+parser.add_argument(
+    '--profile', choices=['gpu', 'cpu'], default='gpu',
+    help='Run TensorFlow on the GPU or tune its thread pools for CPU-only machines'
+)
+parser.add_argument(
+    '--games', type=int,
+    help='Concurrent game processes sharing the cores of this machine, with --profile cpu'
+)
+parser.add_argument(
+    '--game-index', type=int,
+    help='Which of the concurrent games this process is, with --profile cpu'
+)
+parser.add_argument(
+    '--pin', action='store_true',
+    help='Pin the process to its share of the cores, with --profile cpu'
+)
+parser.add_argument('--intra-op-threads', type=int, help='override the intra-op thread pool size')
+parser.add_argument('--inter-op-threads', type=int, help='override the inter-op thread pool size')
+parser.add_argument(
+    '--startup-only', action='store_true',
+    help='Stop once the mode is set up, before the game or training starts, and log how long that took'
+)
 
-cmd_args = parser.parse_args()
-game_type = cmd_args.type
-model = cmd_args.model
-realtime = cmd_args.realtime
-difficulty = cmd_args.difficulty if cmd_args.difficulty is not None else 'medium'
-
-model_type = 'attack'
 
-if str(game_type) == 'game':
-    if model is None:
-        game_launcher = GameLauncher(MainBot, False, None, realtime=realtime)
+def main():
+    cmd_args = parser.parse_args()
+    if cmd_args.profile != 'cpu':
+        cpu_options = [option for option, given in (('--games', cmd_args.games is not None),
+                                                    ('--game-index', cmd_args.game_index is not None),
+                                                    ('--pin', cmd_args.pin)) if given]
+        if cpu_options:
+            parser.error(f'{", ".join(cpu_options)}: only valid with --profile cpu')
+    game_type = cmd_args.type
+    model = cmd_args.model
+    realtime = cmd_args.realtime
+    headless = cmd_args.headless
+    downscale = cmd_args.downscale
+    record_units = cmd_args.records
+    inference_timeout = cmd_args.inference_timeout / 1000 if cmd_args.inference_timeout is not None else None
+    difficulty = cmd_args.difficulty if cmd_args.difficulty is not None else 'medium'
+
+    model_type = 'attack'
+
+    if cmd_args.profile == 'cpu':
+        profile = ExecutionProfile.cpu(
+            'game' if str(game_type) == 'game' else 'train',
+            games=cmd_args.games or 1, game_index=cmd_args.game_index or 0, pin=cmd_args.pin
+        )
+    else:
+        profile = ExecutionProfile.gpu()
+    if cmd_args.intra_op_threads is not None:
+        profile.intra_op_threads = cmd_args.intra_op_threads
+    if cmd_args.inter_op_threads is not None:
+        profile.inter_op_threads = cmd_args.inter_op_threads
+    # only training and keras models need a TensorFlow session
+    if str(game_type) == 'train' or (str(game_type) == 'game' and model is not None
+                                     and not model.endswith(NUMPY_SUFFIX)):
+        profile.apply()
     else:
-        game_launcher = GameLauncher(MainBot, True, model, realtime=realtime)
-
-    train_data_tensor = list()
-    game_result = game_launcher.start_game(difficulty, train_data_tensor)
-    logger.debug(f'Game Result: {game_result}')
-
-    if game_result == Result.Victory:
-        np.save(
-            os.path.join(os.path.dirname(os.path.abspath(__file__)),
-                         f'{model_type}_local_train/{str(int(time.time()))}.npy'),
-            np.array(train_data_tensor))
-
-    with open('logs/log.txt', 'a') as f:
-        prefix = 'Model: ' if game_launcher.use_model else 'Random: '
-        f.write(f'{datetime.datetime.now()}:{prefix}{game_result}\n')
-
-elif str(game_type) == 'train':
-    if model_type == 'attack':
-        trainer = AttackTrainer()
-        trainer.prepare_model(model)
-        trainer.train()
-    elif model_type == 'full':
-        trainer = FullTrainer()
-        trainer.prepare_model(model)
-        trainer.train()
+        profile.pin()
+
+    if str(game_type) == 'game':
+        from .datasets import EpisodeWriter
+        from .gamelauncher import GameLauncher
+        from .mainbot import MainBot
+        from sc2 import Result
+
+    if str(game_type) == 'train':
+        from .trainers import FullTrainer, AttackTrainer
+
+    if cmd_args.startup_only:
+        heavy_modules = [name for name in ('tensorflow', 'keras', 'h5py') if name in sys.modules]
+        logger.info(f'{game_type} mode set up in {time.perf_counter() - start_time:.2f}s, '
+                    f'heavy modules imported: {heavy_modules}')
+
+    elif str(game_type) == 'game':
+        if model is None:
+            game_launcher = GameLauncher(MainBot, False, None, realtime=realtime, headless=headless,
+                                         downscale=downscale, record_units=record_units)
+        else:
+            game_launcher = GameLauncher(MainBot, True, model, realtime=realtime, headless=headless,
+                                         downscale=downscale, record_units=record_units,
+                                         inference_timeout=inference_timeout,
+                                         threaded_inference=not cmd_args.inline_inference,
+                                         fallback_choice=cmd_args.fallback_choice,
+                                         cache_size=cmd_args.cache_size, cache_ttl=cmd_args.cache_ttl,
+                                         cache_block=cmd_args.cache_block)
+
+        episode_writer = EpisodeWriter(
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), f'{model_type}_local_train')
+        )
+        try:
+            game_result = game_launcher.start_game(difficulty, episode_writer)
+        except BaseException:
+            episode_writer.discard()
+            raise
+        logger.debug(f'Game Result: {game_result}')
+
+        if game_result == Result.Victory:
+            episode_writer.commit()
+        else:
+            episode_writer.discard()
+
+        with open('logs/log.txt', 'a') as f:
+            prefix = 'Model: ' if game_launcher.use_model else 'Random: '
+            f.write(f'{datetime.datetime.now()}:{prefix}{game_result}\n')
+
+    elif str(game_type) == 'train':
+        if model_type == 'attack':
+            trainer = AttackTrainer(CHROMATIC_SPEC.scaled(downscale), cmd_args.data, cmd_args.stream,
+                                    cmd_args.workers)
+            trainer.sampling = cmd_args.sampling
+            trainer.checkpoint_minutes = cmd_args.checkpoint_minutes
+            trainer.keep_last = cmd_args.keep_last
+            trainer.keep_best = cmd_args.keep_best
+            trainer.prepare_model(model)
+            trainer.train()
+        elif model_type == 'full':
+            trainer = FullTrainer(MONOCHROME_SPEC.scaled(downscale), cmd_args.data, cmd_args.stream,
+                                  cmd_args.workers)
+            trainer.sampling = cmd_args.sampling
+            trainer.checkpoint_minutes = cmd_args.checkpoint_minutes
+            trainer.keep_last = cmd_args.keep_last
+            trainer.keep_best = cmd_args.keep_best
+            trainer.prepare_model(model)
+            trainer.train()
+
+
+# spawned worker processes, see ParallelLoader, import this module again
+# without running it
+if __name__ == '__main__':
+    main()
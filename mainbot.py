@@ -1,31 +1,49 @@
 from .basebots import AttackChoiceBot, FullChoiceBot
+from .inference import InferenceService, ModelPreloader, PredictionCache, check_saved_spec
 from .loggers import logger
 from .monitors import MonochromeMonitor, ChromaticMonitor
+from .observation import CHROMATIC_SPEC, MONOCHROME_SPEC
 
+import time
 import random
 
-import keras
+import numpy as np
 
 
 class MainBot(AttackChoiceBot):
 
-    def __init__(self, train_data_tensor, use_model, title, model_path=None):
+    def __init__(self, episode_writer, use_model, title, model_path=None, headless=False,
+                 downscale=1, record_units=False, inference_timeout=None, threaded_inference=True,
+                 fallback_choice=None, cache_size=0, cache_ttl=None, cache_block=8):
         if isinstance(self, AttackChoiceBot):
             AttackChoiceBot.__init__(self)
             monitor_class = ChromaticMonitor
+            spec = CHROMATIC_SPEC.scaled(downscale)
         elif isinstance(self, FullChoiceBot):
             FullChoiceBot.__init__(self)
             monitor_class = MonochromeMonitor
+            spec = MONOCHROME_SPEC.scaled(downscale)
 
         self.title = title
         self.IPS = 165  # probable Iteration Per Second
         self.use_model = use_model
-        self.monitor = monitor_class(headless=False)
-        self.train_data_tensor = train_data_tensor
+        self.monitor = monitor_class(headless=headless, spec=spec)
+        self.episode_writer = episode_writer
+        self.record_units = record_units
+        self.step_latencies = list()
 
         if self.use_model:
             logger.info(f'Running game with model: {model_path}')
-            self.model = keras.models.load_model(model_path)
+            # a missing model or one of another spec fails here, before the game starts;
+            # only loading and warming it up is left to the background
+            check_saved_spec(model_path, spec)
+            # cached predictions expire after cache_ttl seconds of game time
+            cache = PredictionCache(cache_size, cache_ttl, cache_block, clock=lambda: self.time) \
+                if cache_size > 0 else None
+            self.inference = InferenceService(ModelPreloader(model_path, spec).future,
+                                              inference_timeout, threaded_inference, cache)
+        if fallback_choice is not None:
+            self.fallback_choice = fallback_choice
         logger.debug(f'inited bot')
 
     def find_target(self):
@@ -40,8 +58,25 @@ class MainBot(AttackChoiceBot):
         return self.enemy_start_locations[0]
 
     async def on_step(self, iteration):
+        start = time.perf_counter()
         if isinstance(self, AttackChoiceBot):
             new_data = await AttackChoiceBot.on_step(self, iteration)
         elif isinstance(self, FullChoiceBot):
             new_data = await FullChoiceBot.on_step(self, iteration)
-        self.train_data_tensor.append(new_data)
+        self.episode_writer.append(new_data)
+        self.step_latencies.append(time.perf_counter() - start)
+
+    async def on_end(self, game_result):
+        self.monitor.close()
+        if self.inference is not None:
+            self.inference.close()
+            logger.info(f'Predictions: {self.inference.get_stats()}')
+        stats = self.monitor.get_render_stats()
+        logger.info(f'Monitor frames: {stats}')
+        if len(self.step_latencies) > 0:
+            p50, p95, p99 = np.percentile(self.step_latencies, [50, 95, 99]) * 1000
+            display = 'off' if self.monitor.headless else 'on'
+            inference = 'none' if self.inference is None else \
+                'threaded' if self.inference.threaded else 'inline'
+            logger.info(f'Step latency with display {display}, inference {inference}: '
+                        f'p50 {p50:.2f}ms, p95 {p95:.2f}ms, p99 {p99:.2f}ms')
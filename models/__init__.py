@@ -1,2 +1,4 @@
 from .attack_cnn import AttackCNNModel
 from .full_cnn import FullCNNModel
+from .base_model import load_spec, check_spec
+from .snapshot import ModelSnapshot
@@ -1,4 +1,5 @@
 from .base_model import BaseModel
+from ..observation import CHROMATIC_SPEC
 
 from keras.models import Sequential
 from keras.layers import Dense, Dropout, Flatten, Conv2D, MaxPooling2D
@@ -6,13 +7,13 @@ from keras.layers import Dense, Dropout, Flatten, Conv2D, MaxPooling2D
 
 class AttackCNNModel(BaseModel):
 
-    def __init__(self):
-        BaseModel.__init__(self)
+    def __init__(self, spec=CHROMATIC_SPEC):
+        BaseModel.__init__(self, spec)
         self.log_dir = 'logs/basic'
 
     def init(self):
         self.model = Sequential()
-        self.model.add(Conv2D(32, (3, 3), padding='same', input_shape=(176, 200, 3), activation='relu'))
+        self.model.add(Conv2D(32, (3, 3), padding='same', input_shape=self.spec.shape, activation='relu'))
         self.model.add(Conv2D(32, (3, 3), activation='relu'))
         self.model.add(MaxPooling2D(pool_size=(2, 2)))
         self.model.add(Dropout(0.2))
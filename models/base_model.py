@@ -1,15 +1,38 @@
+from .snapshot import ModelSnapshot
 from ..loggers import logger
+from ..observation import SPEC_ATTR, load_spec
 
+import h5py
 import keras
 from keras.models import load_model
 from keras.callbacks import TensorBoard
 
 
+def save_spec(model_path, spec):
+    with h5py.File(model_path, 'a') as f:
+        f.attrs[SPEC_ATTR] = spec.to_json()
+
+
+def check_spec(model, model_path, spec):
+    """
+    make sure a loaded model was trained on observations of spec
+    """
+    saved_spec = load_spec(model_path)
+    if saved_spec is not None and saved_spec != spec:
+        raise ValueError(f'Model {model_path} was trained on {saved_spec}, not {spec}')
+    input_shape = tuple(model.input_shape[1:])
+    if input_shape != spec.shape:
+        raise ValueError(f'Model {model_path} takes inputs of shape {input_shape}, '
+                         f'not observations of shape {spec.shape}')
+
+
 class BaseModel:
 
-    def __init__(self):
+    def __init__(self, spec):
         self.log_dir = None
         self.model = None
+        self.history = None
+        self.spec = spec
 
     def compile(self, lr):
         self.model.compile(
@@ -20,7 +43,7 @@ class BaseModel:
         return self
 
     def fit(self, x_train, y_train, x_test, y_test, epochs, batch_size):
-        self.model.fit(
+        self.history = self.model.fit(
             x_train, y_train,
             epochs=epochs,
             batch_size=batch_size,
@@ -29,6 +52,24 @@ class BaseModel:
         )
         return self
 
+    def fit_generator(self, generator, steps, x_test, y_test, epochs):
+        self.history = self.model.fit_generator(
+            generator,
+            steps_per_epoch=steps,
+            epochs=epochs,
+            validation_data=(x_test, y_test),
+            callbacks=[self.get_tensorboard()]
+        )
+        return self
+
+    def val_accuracy(self):
+        """
+        validation accuracy after the last epoch fit, None before any
+        """
+        if self.history is None or not self.history.history.get('val_acc'):
+            return None
+        return float(self.history.history['val_acc'][-1])
+
     def get_tensorboard(self):
         return TensorBoard(log_dir=self.log_dir)
 
@@ -38,8 +79,17 @@ class BaseModel:
     def save(self, fn):
         logger.debug(f'saved to {fn}')
         self.model.save(fn)
+        save_spec(fn, self.spec)
         return self
 
+    def snapshot(self):
+        """
+        copy the weights and optimizer state out of the session to be written
+        later, see ModelSnapshot
+        """
+        return ModelSnapshot(self.model, {SPEC_ATTR: self.spec.to_json()})
+
     def load(self, model_path):
         self.model = load_model(model_path)
+        check_spec(self.model, model_path, self.spec)
         return self
@@ -0,0 +1,105 @@
+import json
+
+import h5py
+import numpy as np
+import keras
+import keras.backend as K
+
+# the training config and optimizer weights are written as keras 2.2 does
+TRAINING_LAYOUT_VERSION = '2.2.'
+
+
+def json_default(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if hasattr(obj, 'get_config'):
+        return {'class_name': obj.__class__.__name__, 'config': obj.get_config()}
+    if callable(obj):
+        return obj.__name__
+    raise TypeError(f'Not JSON serializable: {obj!r}')
+
+
+class ModelSnapshot:
+    """
+    a copy of everything keras.models.save_model writes, taken out of the
+    session in one call; write() needs neither the session nor the model, so
+    it can run on another thread while training goes on
+
+    the file is laid out like one from model.save and loads with load_model;
+    attrs are extra string attributes stored with it
+
+    compiled models can only be snapshot on keras 2.2, whose training config
+    write() lays out; other versions raise a ValueError instead of writing
+    files whose optimizer state would not load
+    """
+
+    def __init__(self, model, attrs=None):
+        self.model_config = model.to_json()
+        self.attrs = dict() if attrs is None else dict(attrs)
+        self.layers = [(layer.name, [str(w.name) or f'param_{i}' for i, w in enumerate(layer.weights)])
+                       for layer in model.layers]
+        symbolic_weights = [w for layer in model.layers for w in layer.weights]
+
+        self.training_config = None
+        optimizer_weights = list()
+        if getattr(model, 'optimizer', None) is not None:
+            if not keras.__version__.startswith(TRAINING_LAYOUT_VERSION):
+                raise ValueError(f'Cannot snapshot a compiled model on keras {keras.__version__}, '
+                                 f'the training config is written for keras {TRAINING_LAYOUT_VERSION}x')
+            self.training_config = json.dumps({
+                'optimizer_config': {
+                    'class_name': model.optimizer.__class__.__name__,
+                    'config': model.optimizer.get_config()
+                },
+                'loss': model.loss,
+                'metrics': model.metrics,
+                'sample_weight_mode': model.sample_weight_mode,
+                'loss_weights': model.loss_weights
+            }, default=json_default)
+            optimizer_weights = getattr(model.optimizer, 'weights', list())
+        self.optimizer_names = [str(w.name) or f'param_{i}' for i, w in enumerate(optimizer_weights)]
+
+        values = K.batch_get_value(symbolic_weights + optimizer_weights)
+        self.weights = values[:len(symbolic_weights)]
+        self.optimizer_weights = values[len(symbolic_weights):]
+
+    def nbytes(self):
+        return sum(value.nbytes for value in self.weights + self.optimizer_weights)
+
+    def write(self, path):
+        with h5py.File(path, 'w') as f:
+            f.attrs['keras_version'] = keras.__version__.encode('utf8')
+            f.attrs['backend'] = K.backend().encode('utf8')
+            f.attrs['model_config'] = self.model_config.encode('utf8')
+            for key, value in self.attrs.items():
+                f.attrs[key] = value
+
+            group = f.create_group('model_weights')
+            group.attrs['layer_names'] = [name.encode('utf8') for name, _ in self.layers]
+            group.attrs['backend'] = K.backend().encode('utf8')
+            group.attrs['keras_version'] = keras.__version__.encode('utf8')
+            values = iter(self.weights)
+            for layer_name, weight_names in self.layers:
+                layer_group = group.create_group(layer_name)
+                layer_group.attrs['weight_names'] = [name.encode('utf8') for name in weight_names]
+                for name in weight_names:
+                    write_dataset(layer_group, name, next(values))
+
+            if self.training_config is not None:
+                f.attrs['training_config'] = self.training_config.encode('utf8')
+                if self.optimizer_names:
+                    group = f.create_group('optimizer_weights')
+                    group.attrs['weight_names'] = [name.encode('utf8') for name in self.optimizer_names]
+                    for name, value in zip(self.optimizer_names, self.optimizer_weights):
+                        write_dataset(group, name, value)
+            f.flush()
+
+
+def write_dataset(group, name, value):
+    dataset = group.create_dataset(name, value.shape, dtype=value.dtype)
+    if value.shape:
+        dataset[:] = value
+    else:
+        dataset[()] = value
@@ -1,2 +1,4 @@
 from .chromatic_monitor import ChromaticMonitor
 from .monochrome_monitor import MonochromeMonitor
+from .record_renderer import RecordRenderer
+from .unit_record import UnitRecord
@@ -1,18 +1,108 @@
+from .display import DisplayWorker
+from .frame_pool import FramePool
+from .incremental import IncrementalRenderer
+from .rasterizer import CircleRasterizer
+from .unit_record import UnitRecord
+
 import cv2
+import numpy as np
 from sc2.constants import PROBE
 
+# (x0, y0, x1, y1) box which holds every resource bar
+RESOURCE_REGION = (0, 0, 56, 24)
+
 
 class BaseMonitor:
 
-    def __init__(self, headless):
+    def __init__(self, headless, spec, incremental=False, debug=False):
         self.headless = headless
+        self.spec = spec
         self.flipped = None
+        self.rasterizer = CircleRasterizer()
+        self.frames = FramePool()
+        self.renderer = IncrementalRenderer(self.rasterizer) if incremental else None
+        self.debug = debug
+        self.display = None if headless else DisplayWorker(self.show)
+
+        # frames are rasterized lazily, only when something reads them
+        self.bot = None
+        self.resources = None
+        self.stale = False
+        self.frames_rendered = 0
+        self.frames_skipped = 0
+
+    async def draw(self, bot):
+        """
+        mark the frame stale; it is rasterized by refresh() once it is needed
+        """
+        if self.stale:
+            self.frames_skipped += 1
+        self.bot = bot
+        # resources are snapshotted now since actions issued later in the
+        # step may already spend minerals, while units stay the same
+        self.resources = await self.calculate_resources(bot)
+        self.stale = True
+
+        if self.display is not None:
+            self.display.submit(bot.title, self.refresh())
+
+    def refresh(self):
+        """
+        rasterize the latest drawn state if it has not been yet and return the
+        flipped frame
+        """
+        if self.stale:
+            self.rasterize(self.bot, self.resources)
+            self.stale = False
+            self.frames_rendered += 1
+        return self.flipped
+
+    def rasterize(self, bot, resources):
+        raise NotImplementedError
+
+    def acquire_frame(self, bot, channels=3):
+        """
+        return a cleared, preallocated frame of the map size
+        """
+        return self.frames.acquire(
+            (bot.game_info.map_size[1], bot.game_info.map_size[0], channels)
+        )
+
+    def render(self, bot, batch, resources):
+        """
+        rasterize the unit batch and the resource bars into a 3 channel frame,
+        incrementally if the monitor was created with incremental=True
+        """
+        if self.renderer is None:
+            game_data = self.acquire_frame(bot)
+            self.draw_frame(game_data, batch, resources)
+            return game_data
+
+        game_data = self.renderer.render(
+            (bot.game_info.map_size[1], bot.game_info.map_size[0], 3),
+            batch,
+            lambda frame: self.draw_resource_bars(frame, resources),
+            RESOURCE_REGION
+        )
+        if self.debug:
+            full = self.acquire_frame(bot)
+            self.draw_frame(full, batch, resources)
+            assert np.array_equal(game_data, full), 'incremental frame differs from full redraw'
+        return game_data
+
+    def draw_frame(self, game_data, batch, resources):
+        self.rasterizer.draw(game_data, batch)
+        self.draw_resource_bars(game_data, resources)
 
     async def draw_resources(self, bot, game_data):
+        self.draw_resource_bars(game_data, await self.calculate_resources(bot))
+
+    @staticmethod
+    def draw_resource_bars(game_data, resources):
         line_max = 50
 
         worker_weight, plausible_supply, population_ratio, vespene_ratio, mineral_ratio \
-            = await self.calculate_resources(bot)
+            = resources
 
         cv2.line(game_data, (0, 19), (int(line_max * worker_weight), 19), (250, 250, 200), 3)
         cv2.line(game_data, (0, 15), (int(line_max * plausible_supply), 15), (220, 200, 200), 3)
@@ -30,8 +120,9 @@ class BaseMonitor:
 
         return worker_weight, plausible_supply, population_ratio, vespene_ratio, mineral_ratio
 
-    async def flip(self, game_data):
-        self.flipped = cv2.flip(game_data, 0)
+    def flip(self, game_data):
+        # flip around the x-axis as a strided view; nothing is copied
+        self.flipped = game_data[::-1]
 
     @staticmethod
     def show(title, flipped):
@@ -41,4 +132,48 @@ class BaseMonitor:
         cv2.waitKey(1)
 
     def get_flipped(self):
-        return self.flipped
+        """
+        return the flipped frame as an observation of self.spec; the frame
+        buffers are reused by later steps, so this is always a copy
+        """
+        flipped = self.refresh()
+        if flipped is None:
+            return None
+        return np.ascontiguousarray(self.spec.apply(flipped))
+
+    def get_record(self):
+        """
+        return the latest drawn state as a stored UnitRecord; unlike
+        get_flipped nothing is rasterized
+        """
+        return UnitRecord.from_bot(self.bot, self.resources).to_dict()
+
+    def record_batch(self, record):
+        raise NotImplementedError
+
+    def to_channels(self, game_data):
+        """
+        turn a rendered 3 channel frame into the channels of this monitor
+        """
+        return game_data
+
+    def render_record(self, record):
+        """
+        rasterize a UnitRecord into the observation get_flipped returned for
+        the same step
+        """
+        width, height = record.map_size
+        game_data = np.zeros((height, width, 3), np.uint8)
+        self.draw_frame(game_data, self.record_batch(record), record.resources)
+        return np.ascontiguousarray(self.spec.apply(self.to_channels(game_data)[::-1]))
+
+    def get_render_stats(self):
+        stats = {'rendered': self.frames_rendered, 'skipped': self.frames_skipped}
+        if self.display is not None:
+            stats['shown'] = self.display.frames_shown
+            stats['dropped'] = self.display.frames_dropped
+        return stats
+
+    def close(self):
+        if self.display is not None:
+            self.display.close()
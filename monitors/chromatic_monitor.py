@@ -1,24 +1,19 @@
 from .base_monitor import BaseMonitor
+from .rasterizer import CircleBatch
+from .unit_record import STRUCTURE, MAIN_BASE, WORKER, WORKER_NAMES, MAIN_BASE_NAMES
+from ..observation import CHROMATIC_SPEC
 
-import cv2
-import numpy as np
 from sc2.constants import NEXUS, PROBE, PYLON, ASSIMILATOR, GATEWAY, \
     CYBERNETICSCORE, STALKER, STARGATE, VOIDRAY, OBSERVER, ROBOTICSFACILITY
 
 
 class ChromaticMonitor(BaseMonitor):
 
-    def __init__(self, headless):
-        super().__init__(headless=headless)
+    def __init__(self, headless, spec=CHROMATIC_SPEC, incremental=False, debug=False):
+        super().__init__(headless=headless, spec=spec, incremental=incremental, debug=debug)
         self.flipped = None
-        self.worker_names = ['probe', 'scv', 'drone']
-        self.main_base_names = [
-            'nexus',  # Protoss
-            'hatchery'  # Zerg
-            'commandcenter',  # Terran
-            'orbitalcommand',  # Terran(Upgraded)
-            'planetaryfortress'  # Terran(Upgraded)
-        ]
+        self.worker_names = WORKER_NAMES
+        self.main_base_names = MAIN_BASE_NAMES
         self.draw_dict = {
             NEXUS: [15, (0, 255, 0)],
             PYLON: [3, (20, 235, 0)],
@@ -32,91 +27,79 @@ class ChromaticMonitor(BaseMonitor):
             VOIDRAY: [3, (255, 100, 0)]
         }
 
-    async def draw(self, bot):
+    def rasterize(self, bot, resources):
         """
         convert data into OpenGL images
         """
-        game_data = np.zeros(
-            (bot.game_info.map_size[1], bot.game_info.map_size[0], 3),
-            dtype=np.uint8
-        )
-        await self.draw_own_units(bot, game_data)
-        await self.draw_enemy_buildings(bot, game_data)
-        await self.draw_enemy_units(bot, game_data)
-        await self.draw_resources(bot, game_data)
-        await self.flip(game_data)
+        batch = CircleBatch()
+        self.draw_own_units(bot, batch)
+        self.draw_enemy_buildings(bot, batch)
+        self.draw_enemy_units(bot, batch)
+        game_data = self.render(bot, batch, resources)
+        self.flip(game_data)
 
-        if not self.headless:
-            self.show(bot.title, self.flipped)
+    def record_batch(self, record):
+        """
+        collect the circles of a UnitRecord in the order rasterize draws them
+        """
+        batch = CircleBatch()
+        own_units = record.own_units()
+        for unit_type in self.draw_dict:
+            radius, color = self.draw_dict[unit_type]
+            for unit in own_units[own_units['type_id'] == unit_type.value]:
+                batch.add((unit['x'], unit['y']), radius, color)
+
+        enemy_units = record.enemy_units()
+        for unit in enemy_units[(enemy_units['flags'] & STRUCTURE) != 0]:
+            if unit['flags'] & MAIN_BASE:
+                self.draw_enemy_main_base(batch, (unit['x'], unit['y']))
+            else:
+                self.draw_anonymous_enemy_building(batch, (unit['x'], unit['y']))
+        for unit in enemy_units[(enemy_units['flags'] & STRUCTURE) == 0]:
+            if unit['flags'] & WORKER:
+                self.draw_enemy_worker(batch, (unit['x'], unit['y']))
+            else:
+                self.draw_anonymous_enemy_units(batch, (unit['x'], unit['y']))
+        return batch
 
-    async def draw_own_units(self, bot, game_data):
+    def draw_own_units(self, bot, batch):
         """
         draw bot own units
         """
         for unit_type in self.draw_dict:
+            radius, color = self.draw_dict[unit_type]
             for unit in bot.units(unit_type):
-                pos = unit.position
-                cv2.circle(
-                    game_data,
-                    (int(pos[0]), int(pos[1])),
-                    self.draw_dict[unit_type][0],
-                    self.draw_dict[unit_type][1],
-                    -1
-                )
+                batch.add(unit.position, radius, color, tag=unit.tag)
 
-    async def draw_enemy_buildings(self, bot, game_data):
+    def draw_enemy_buildings(self, bot, batch):
         for enemy_building in bot.known_enemy_structures:
             pos = enemy_building.position
             if enemy_building.name.lower() in self.main_base_names:
-                await self.draw_enemy_main_base(game_data, pos)
+                self.draw_enemy_main_base(batch, pos, enemy_building.tag)
             else:
-                await self.draw_anonymous_enemy_building(game_data, pos)
+                self.draw_anonymous_enemy_building(batch, pos, enemy_building.tag)
 
     @staticmethod
-    async def draw_enemy_main_base(game_data, pos):
-        cv2.circle(
-            game_data,
-            (int(pos[0]), int(pos[1])),
-            15,
-            (0, 0, 255),
-            -1
-        )
+    def draw_enemy_main_base(batch, pos, tag=None):
+        batch.add(pos, 15, (0, 0, 255), tag=tag)
 
     @staticmethod
-    async def draw_anonymous_enemy_building(game_data, pos):
-        cv2.circle(
-            game_data,
-            (int(pos[0]), int(pos[1])),
-            5,
-            (200, 50, 212),
-            -1
-        )
+    def draw_anonymous_enemy_building(batch, pos, tag=None):
+        batch.add(pos, 5, (200, 50, 212), tag=tag)
 
-    async def draw_enemy_units(self, bot, game_data):
+    def draw_enemy_units(self, bot, batch):
         for enemy_unit in bot.known_enemy_units:
             if not enemy_unit.is_structure:
                 pos = enemy_unit.position
                 if enemy_unit.name.lower() in self.worker_names:
-                    await self.draw_enemy_worker(game_data, pos)
+                    self.draw_enemy_worker(batch, pos, enemy_unit.tag)
                 else:
-                    await self.draw_anonymous_enemy_units(game_data, pos)
+                    self.draw_anonymous_enemy_units(batch, pos, enemy_unit.tag)
 
     @staticmethod
-    async def draw_enemy_worker(game_data, pos):
-        cv2.circle(
-            game_data,
-            (int(pos[0]), int(pos[1])),
-            1,
-            (55, 0, 155),
-            -1
-        )
+    def draw_enemy_worker(batch, pos, tag=None):
+        batch.add(pos, 1, (55, 0, 155), tag=tag)
 
     @staticmethod
-    async def draw_anonymous_enemy_units(game_data, pos):
-        cv2.circle(
-            game_data,
-            (int(pos[0]), int(pos[1])),
-            3,
-            (50, 0, 215),
-            -1
-        )
+    def draw_anonymous_enemy_units(batch, pos, tag=None):
+        batch.add(pos, 3, (50, 0, 215), tag=tag)
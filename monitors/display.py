@@ -0,0 +1,64 @@
+import threading
+
+import cv2
+import numpy as np
+
+
+class DisplayWorker:
+    """
+    refresh the monitor window on a background thread; frames go through a
+    one-slot queue where the latest frame wins, so a slow window drops frames
+    instead of stalling on_step
+    """
+
+    def __init__(self, show):
+        self.show = show
+        self.slot = None
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False
+        self.frames_shown = 0
+        self.frames_dropped = 0
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name='monitor-display', daemon=True)
+        self.thread.start()
+
+    def submit(self, title, frame):
+        # monitor frame buffers are reused by later steps, so hand over a copy
+        frame = np.array(frame, order='C')
+        with self.condition:
+            if self.slot is not None:
+                self.frames_dropped += 1
+            self.slot = (title, frame)
+            self.condition.notify()
+        if self.thread is None:
+            self.start()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.slot is None and self.running:
+                    self.condition.wait()
+                if not self.running:
+                    break
+                title, frame = self.slot
+                self.slot = None
+            self.show(title, frame)
+            self.frames_shown += 1
+        if self.frames_shown > 0:
+            try:
+                cv2.destroyAllWindows()
+            except cv2.error:
+                # OpenCV builds without a GUI, or a show() which opened none
+                pass
+
+    def close(self):
+        if self.thread is None:
+            return
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.thread.join(timeout=1)
+        self.thread = None
@@ -0,0 +1,31 @@
+import numpy as np
+
+
+class FramePool:
+    """
+    a small ring of preallocated frames which are cleared in place and reused
+    instead of allocating a new image every step
+    """
+
+    def __init__(self, size=2):
+        self.size = size
+        self.frames = list()
+        self.shape = None
+        self.current = 0
+
+    def acquire(self, shape, dtype=np.uint8, clear=True):
+        """
+        hand out the next frame of the ring; frames are (re)allocated only
+        when the requested shape changes
+        """
+        if self.shape != shape:
+            self.frames = [np.zeros(shape, dtype) for _ in range(self.size)]
+            self.shape = shape
+        self.current = (self.current + 1) % self.size
+        frame = self.frames[self.current]
+        if clear:
+            frame.fill(0)
+        return frame
+
+    def nbytes(self):
+        return sum(frame.nbytes for frame in self.frames)
@@ -0,0 +1,111 @@
+import numpy as np
+
+
+class IncrementalRenderer:
+    """
+    keep the previous frame and a per-tag record of what was drawn where, and
+    only erase and redraw the regions of units that appeared, disappeared or
+    moved
+    """
+
+    def __init__(self, rasterizer, max_dirty_ratio=0.3):
+        self.rasterizer = rasterizer
+        self.max_dirty_ratio = max_dirty_ratio
+        self.canvas = None
+        self.records = dict()
+        self.order = list()
+        self.full_redraws = 0
+        self.partial_redraws = 0
+
+    def render(self, shape, batch, draw_fixed, fixed_region):
+        """
+        bring the persistent canvas up to date with batch; draw_fixed(frame)
+        draws everything which is not a unit and lies inside fixed_region,
+        such as the resource bars, on top of the units
+        """
+        records = dict(batch.records())
+        dirty_tags = None
+        if self.canvas is not None and self.canvas.shape == shape:
+            dirty_tags = self.find_dirty_tags(batch, records)
+
+        if dirty_tags is None:
+            if self.canvas is None or self.canvas.shape != shape:
+                self.canvas = np.zeros(shape, np.uint8)
+            else:
+                self.canvas.fill(0)
+            self.rasterizer.draw(self.canvas, batch)
+            draw_fixed(self.canvas)
+            self.full_redraws += 1
+        else:
+            regions = [
+                self.get_region(record)
+                for tag in dirty_tags
+                for record in (self.records.get(tag), records.get(tag))
+                if record is not None
+            ]
+            # the fixed region goes last since draw_fixed paints on top of it
+            regions.append(fixed_region)
+            self.redraw_regions(batch, regions)
+            draw_fixed(self.canvas)
+            self.partial_redraws += 1
+
+        self.records = records
+        self.order = batch.tags
+        return self.canvas
+
+    def find_dirty_tags(self, batch, records):
+        """
+        return the tags whose drawing changed since the previous frame, or
+        None when only a full redraw is guaranteed to be exact
+        """
+        # untagged or duplicated units cannot be tracked between frames
+        if len(records) != len(batch) or None in records:
+            return None
+        # cv2 clips thick rings differently inside a region than on the frame
+        if any(thickness > 1 for thickness in batch.thicknesses):
+            return None
+
+        tags = set(self.records) | set(records)
+        dirty_tags = [tag for tag in tags if self.records.get(tag) != records.get(tag)]
+        if len(dirty_tags) > self.max_dirty_ratio * max(len(tags), 1):
+            return None
+
+        # overlapping units which did not move must still be stacked in the
+        # same order, otherwise their shared pixels would change
+        dirty = set(dirty_tags)
+        if [tag for tag in batch.tags if tag not in dirty] != \
+                [tag for tag in self.order if tag not in dirty]:
+            return None
+        return dirty_tags
+
+    @staticmethod
+    def get_region(record):
+        """
+        return the (x0, y0, x1, y1) box a recorded circle was drawn in
+        """
+        (x, y), radius, _, thickness = record
+        reach = radius + max(thickness, 1) + 1
+        return x - reach, y - reach, x + reach + 1, y + reach + 1
+
+    def redraw_regions(self, batch, regions):
+        height, width = self.canvas.shape[:2]
+        centers, radii, thicknesses, colors = batch.to_arrays()
+        reach = radii + np.maximum(thicknesses, 1) + 1
+        left, right = centers[:, 0] - reach, centers[:, 0] + reach + 1
+        top, bottom = centers[:, 1] - reach, centers[:, 1] + reach + 1
+
+        for x0, y0, x1, y1 in regions:
+            x0, y0 = max(x0, 0), max(y0, 0)
+            x1, y1 = min(x1, width), min(y1, height)
+            if x0 >= x1 or y0 >= y1:
+                continue
+            region = self.canvas[y0:y1, x0:x1]
+            region.fill(0)
+            hit = np.flatnonzero((left < x1) & (right > x0) & (top < y1) & (bottom > y0))
+            self.rasterizer.draw_arrays(
+                region,
+                centers[hit] - np.array([x0, y0], np.int32),
+                radii[hit],
+                thicknesses[hit],
+                colors[hit]
+            )
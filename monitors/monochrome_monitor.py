@@ -1,52 +1,72 @@
 from .base_monitor import BaseMonitor
+from .frame_pool import FramePool
+from .rasterizer import CircleBatch
+from .unit_record import READY
+from ..observation import MONOCHROME_SPEC
 
 import math
 
 import cv2
-import numpy as np
 
 
 class MonochromeMonitor(BaseMonitor):
 
-    def __init__(self, headless):
-        super().__init__(headless)
+    def __init__(self, headless, spec=MONOCHROME_SPEC, incremental=False, debug=False):
+        super().__init__(headless, spec, incremental=incremental, debug=debug)
         self.ally_color = (255, 255, 255)
         self.enemy_color = (125, 125, 125)
+        self.grayed_frames = FramePool()
 
-    async def draw(self, bot):
-        game_data = np.zeros(
-            (bot.game_info.map_size[1], bot.game_info.map_size[0], 3),
-            np.uint8
-        )
-        await self.draw_ally(bot, game_data)
-        await self.draw_enemy(bot, game_data)
-        await self.draw_resources(bot, game_data)
+    def rasterize(self, bot, resources):
+        batch = CircleBatch()
+        self.draw_ally(bot, batch)
+        self.draw_enemy(bot, batch)
+        game_data = self.render(bot, batch, resources)
 
         # flip horizontally to make our final fix in visual representation:
-        grayed = cv2.cvtColor(game_data, cv2.COLOR_BGR2GRAY)
-        await self.flip(grayed)
+        grayed = self.grayed_frames.acquire(game_data.shape[:2], clear=False)
+        cv2.cvtColor(game_data, cv2.COLOR_BGR2GRAY, dst=grayed)
+        self.flip(grayed)
+
+    def record_batch(self, record):
+        """
+        collect the circles of a UnitRecord in the order rasterize draws them
+        """
+        batch = CircleBatch()
+        own_units = record.own_units()
+        for unit in own_units[(own_units['flags'] & READY) != 0]:
+            self.draw_record_unit(batch, unit, self.ally_color)
+        for unit in record.enemy_units():
+            self.draw_record_unit(batch, unit, self.enemy_color)
+        return batch
 
-        if not self.headless:
-            self.show(bot.title, self.flipped)
+    def to_channels(self, game_data):
+        return cv2.cvtColor(game_data, cv2.COLOR_BGR2GRAY)
 
-    async def draw_ally(self, bot, game_data):
+    def draw_ally(self, bot, batch):
         for unit in bot.units().ready:
-            pos = unit.position
-            cv2.circle(
-                img=game_data,
-                center=(int(pos[0]), int(pos[1])),
-                radius=int(unit.radius * 8),
-                color=self.ally_color,
-                thickness=math.ceil(int(unit.radius * 0.5))
-            )
-
-    async def draw_enemy(self, bot, game_data):
+            self.draw_unit(batch, unit, self.ally_color)
+
+    def draw_enemy(self, bot, batch):
         for unit in bot.known_enemy_units:
-            pos = unit.position
-            cv2.circle(
-                img=game_data,
-                center=(int(pos[0]), int(pos[1])),
-                radius=int(unit.radius * 8),
-                color=self.enemy_color,
-                thickness=math.ceil(int(unit.radius * 0.5))
-            )
+            self.draw_unit(batch, unit, self.enemy_color)
+
+    @staticmethod
+    def draw_unit(batch, unit, color):
+        batch.add(
+            pos=unit.position,
+            radius=int(unit.radius * 8),
+            color=color,
+            thickness=math.ceil(int(unit.radius * 0.5)),
+            tag=unit.tag
+        )
+
+    @staticmethod
+    def draw_record_unit(batch, unit, color):
+        radius = float(unit['radius'])
+        batch.add(
+            pos=(unit['x'], unit['y']),
+            radius=int(radius * 8),
+            color=color,
+            thickness=math.ceil(int(radius * 0.5))
+        )
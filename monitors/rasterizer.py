@@ -0,0 +1,62 @@
+import cv2
+import numpy as np
+
+
+class CircleBatch:
+    """
+    collect the circles of one frame so they can be stamped all at once
+    """
+
+    def __init__(self):
+        self.centers = list()
+        self.radii = list()
+        self.colors = list()
+        self.thicknesses = list()
+        self.tags = list()
+
+    def add(self, pos, radius, color, thickness=-1, tag=None):
+        self.centers.append((int(pos[0]), int(pos[1])))
+        self.radii.append(radius)
+        self.colors.append(color)
+        self.thicknesses.append(thickness)
+        self.tags.append(tag)
+
+    def records(self):
+        """
+        return (tag, (center, radius, color, thickness)) pairs in draw order
+        """
+        return zip(self.tags, zip(self.centers, self.radii, self.colors, self.thicknesses))
+
+    def __len__(self):
+        return len(self.centers)
+
+    def to_arrays(self):
+        """
+        return centers(n*2), radii(n), thicknesses(n) and colors(n*3) arrays
+        """
+        if len(self) == 0:
+            return (np.zeros((0, 2), np.int32), np.zeros(0, np.int32),
+                    np.zeros(0, np.int32), np.zeros((0, 3), np.uint8))
+        return (np.array(self.centers, np.int32), np.array(self.radii, np.int32),
+                np.array(self.thicknesses, np.int32), np.array(self.colors, np.uint8))
+
+
+class CircleRasterizer:
+    """
+    stamp a whole batch of circles in one tight loop; the output is identical
+    to calling cv2.circle for every unit in batch order
+    """
+
+    @staticmethod
+    def draw(game_data, batch):
+        circle = cv2.circle
+        for center, radius, color, thickness in zip(
+                batch.centers, batch.radii, batch.colors, batch.thicknesses):
+            circle(game_data, center, radius, color, thickness)
+
+    @staticmethod
+    def draw_arrays(game_data, centers, radii, thicknesses, colors):
+        circle = cv2.circle
+        for center, radius, color, thickness in zip(
+                centers.tolist(), radii.tolist(), colors.tolist(), thicknesses.tolist()):
+            circle(game_data, tuple(center), radius, tuple(color), thickness)
@@ -0,0 +1,25 @@
+from .chromatic_monitor import ChromaticMonitor
+from .monochrome_monitor import MonochromeMonitor
+from .unit_record import UnitRecord
+
+
+class RecordRenderer:
+    """
+    turn stored observations into observations of spec: unit records are
+    rasterized by the monitor matching the spec channels, frames are converted
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.monitor = None
+
+    def get_monitor(self):
+        if self.monitor is None:
+            monitor_class = ChromaticMonitor if self.spec.channels == 3 else MonochromeMonitor
+            self.monitor = monitor_class(headless=True, spec=self.spec)
+        return self.monitor
+
+    def __call__(self, observation):
+        if UnitRecord.is_record(observation):
+            return self.get_monitor().render_record(UnitRecord.from_dict(observation))
+        return self.spec.convert(observation)
@@ -0,0 +1,81 @@
+import numpy as np
+
+WORKER_NAMES = ['probe', 'scv', 'drone']
+MAIN_BASE_NAMES = [
+    'nexus',  # Protoss
+    'hatchery'  # Zerg
+    'commandcenter',  # Terran
+    'orbitalcommand',  # Terran(Upgraded)
+    'planetaryfortress'  # Terran(Upgraded)
+]
+
+# the game reports positions and radii as 32-bit floats, so they are stored
+# without loss and rasterize to exactly the same pixels
+UNIT_DTYPE = np.dtype([
+    ('x', np.float32),
+    ('y', np.float32),
+    ('radius', np.float32),
+    ('type_id', np.int32),
+    ('flags', np.uint8)
+])
+
+OWN = 1
+READY = 2
+STRUCTURE = 4
+MAIN_BASE = 8
+WORKER = 16
+
+
+class UnitRecord:
+    """
+    compact observation of one decision: every unit a monitor would draw plus
+    the resource scalars, a few hundred bytes instead of a rasterized frame
+
+    units keep the order of bot.units() and bot.known_enemy_units, which is
+    the order the monitors draw them in
+    """
+
+    def __init__(self, units, resources, map_size):
+        self.units = units
+        self.resources = resources
+        self.map_size = tuple(map_size)
+
+    @staticmethod
+    def from_bot(bot, resources):
+        own_units = bot.units()
+        enemy_units = bot.known_enemy_units
+        units = np.empty(len(own_units) + len(enemy_units), UNIT_DTYPE)
+        for i, unit in enumerate(own_units):
+            flags = OWN | (READY if unit.is_ready else 0)
+            units[i] = UnitRecord.unit_row(unit, flags)
+        for i, unit in enumerate(enemy_units, len(own_units)):
+            name = unit.name.lower()
+            flags = (STRUCTURE if unit.is_structure else 0) \
+                | (MAIN_BASE if name in MAIN_BASE_NAMES else 0) \
+                | (WORKER if name in WORKER_NAMES else 0)
+            units[i] = UnitRecord.unit_row(unit, flags)
+        return UnitRecord(units, np.array(resources, np.float64), bot.game_info.map_size)
+
+    @staticmethod
+    def unit_row(unit, flags):
+        return unit.position[0], unit.position[1], unit.radius, unit.type_id.value, flags
+
+    def own_units(self):
+        return self.units[(self.units['flags'] & OWN) != 0]
+
+    def enemy_units(self):
+        return self.units[(self.units['flags'] & OWN) == 0]
+
+    def to_dict(self):
+        """
+        plain form stored in place of a frame in training files
+        """
+        return {'units': self.units, 'resources': self.resources, 'map_size': self.map_size}
+
+    @staticmethod
+    def from_dict(data):
+        return UnitRecord(data['units'], data['resources'], data['map_size'])
+
+    @staticmethod
+    def is_record(observation):
+        return isinstance(observation, dict) and 'units' in observation
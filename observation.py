@@ -0,0 +1,105 @@
+import json
+
+import cv2
+import numpy as np
+
+# (width, height) of the map the monitors draw, AbyssalReefLE
+MAP_SIZE = (200, 176)
+
+# attribute of the saved HDF5 model which holds its observation spec
+SPEC_ATTR = 'yuri_observation_spec'
+
+
+class ObservationSpec:
+    """
+    describe the frames the models see: which (x0, y0, x1, y1) box of the
+    flipped monitor frame, shrunk by which integer factor, with how many
+    channels
+    """
+
+    def __init__(self, channels, downscale=1, crop=None, map_size=MAP_SIZE):
+        self.channels = channels
+        self.downscale = downscale
+        self.map_size = tuple(map_size)
+        self.crop = tuple(crop) if crop is not None else (0, 0) + self.map_size
+
+    @property
+    def shape(self):
+        """
+        (height, width, channels) of an observation
+        """
+        x0, y0, x1, y1 = self.crop
+        return (y1 - y0) // self.downscale, (x1 - x0) // self.downscale, self.channels
+
+    @property
+    def frame_shape(self):
+        """
+        (height, width, channels) of a full monitor frame
+        """
+        return self.map_size[1], self.map_size[0], self.channels
+
+    def scaled(self, downscale):
+        return ObservationSpec(self.channels, downscale, self.crop, self.map_size)
+
+    def apply(self, flipped):
+        """
+        crop and shrink a flipped monitor frame into an observation
+        """
+        if flipped.shape[:2] != self.frame_shape[:2]:
+            raise ValueError(f'Frame of shape {flipped.shape} does not fit map {self.map_size}')
+        x0, y0, x1, y1 = self.crop
+        observation = flipped[y0:y1, x0:x1]
+        if self.downscale > 1:
+            height, width = self.shape[:2]
+            observation = cv2.resize(observation, (width, height), interpolation=cv2.INTER_AREA)
+        return observation
+
+    def convert(self, frame):
+        """
+        bring a stored frame to this spec; full monitor frames are cropped and
+        shrunk while frames which already are observations pass through
+        """
+        frame = np.asarray(frame)
+        if frame.shape[:2] == self.shape[:2]:
+            return frame
+        if frame.shape[:2] == self.frame_shape[:2]:
+            return self.apply(frame)
+        raise ValueError(f'Frame of shape {frame.shape} does not fit observation {self.shape}')
+
+    def to_json(self):
+        return json.dumps({
+            'channels': self.channels,
+            'downscale': self.downscale,
+            'crop': list(self.crop),
+            'map_size': list(self.map_size)
+        })
+
+    @staticmethod
+    def from_json(text):
+        return ObservationSpec(**json.loads(text))
+
+    def __eq__(self, other):
+        return isinstance(other, ObservationSpec) and self.to_json() == other.to_json()
+
+    def __repr__(self):
+        return f'ObservationSpec({self.to_json()})'
+
+
+def load_spec(model_path):
+    """
+    return the observation spec embedded in a saved model, None for models
+    saved before specs were embedded
+    """
+    # only reading saved models needs h5py
+    import h5py
+    with h5py.File(model_path, 'r') as f:
+        text = f.attrs.get(SPEC_ATTR)
+    if text is None:
+        return None
+    if isinstance(text, bytes):
+        text = text.decode()
+    return ObservationSpec.from_json(text)
+
+
+CHROMATIC_SPEC = ObservationSpec(channels=3)
+MONOCHROME_SPEC = ObservationSpec(channels=1)
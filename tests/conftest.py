@@ -0,0 +1,31 @@
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+# the tests import the package as yuri, the way python -m yuri.main runs it,
+# whatever the directory of the checkout is called
+if 'yuri' not in sys.modules:
+    package = types.ModuleType('yuri')
+    package.__path__ = [os.path.dirname(os.path.dirname(os.path.abspath(__file__)))]
+    sys.modules['yuri'] = package
+
+
+@pytest.fixture
+def write_games():
+    """
+    write_games(data_dir, names, samples_per_game, frame_shape, seed=0) writes
+    one game file of random frames and choices of 4 per name, as the game does
+    """
+    from yuri.datasets import EpisodeWriter
+
+    def write(data_dir, names, samples_per_game, frame_shape, seed=0):
+        rng = np.random.RandomState(seed)
+        for name in names:
+            writer = EpisodeWriter(data_dir, chunk_size=samples_per_game, name=name)
+            for _ in range(samples_per_game):
+                writer.append([np.eye(4)[rng.randint(4)], rng.randint(0, 256, frame_shape, np.uint8)])
+            writer.commit()
+    return write
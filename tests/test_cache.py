@@ -0,0 +1,74 @@
+from yuri.inference import InferenceService, PredictionCache
+
+import asyncio
+
+import numpy as np
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingModel:
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, x):
+        self.calls += 1
+        return np.full((len(x), 4), self.calls, np.float32)
+
+
+def frame(*cells, size=16):
+    observation = np.zeros((size, size, 3), np.uint8)
+    for y, x in cells:
+        observation[y, x, 0] = 255
+    return observation
+
+
+def test_key_is_coarse_in_space_and_resources():
+    cache = PredictionCache(block=8, resource_levels=10)
+    assert cache.key(frame((0, 0))) == cache.key(frame((7, 7)))
+    assert cache.key(frame((0, 0))) != cache.key(frame((8, 0)))
+    assert cache.key(frame()) != cache.key(frame((15, 15)))
+    assert cache.key(frame(), [0.51, 0.2]) == cache.key(frame(), [0.55, 0.29])
+    assert cache.key(frame(), [0.51, 0.2]) != cache.key(frame(), [0.61, 0.2])
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PredictionCache(capacity=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.get_stats()['cache_entries'] == 2
+
+
+def test_entries_expire_after_ttl():
+    clock = Clock()
+    cache = PredictionCache(ttl=1.0, clock=clock)
+    cache.put('a', 1)
+    clock.now = 1.0
+    assert cache.get('a') == 1
+    clock.now = 1.5
+    assert cache.get('a') is None
+    stats = cache.get_stats()
+    assert (stats['cache_hits'], stats['cache_misses'], stats['cache_expired']) == (1, 1, 1)
+    assert stats['cache_hit_rate'] == 0.5
+
+
+def test_service_shares_predictions_of_alike_observations():
+    model = CountingModel()
+    service = InferenceService(model, threaded=False, cache=PredictionCache(block=8))
+    loop = asyncio.get_event_loop()
+    first = loop.run_until_complete(service.predict(frame((1, 1))[np.newaxis], [0.5]))
+    again = loop.run_until_complete(service.predict(frame((6, 2))[np.newaxis], [0.5]))
+    other = loop.run_until_complete(service.predict(frame((1, 1))[np.newaxis], [0.9]))
+    np.testing.assert_array_equal(first, again)
+    assert model.calls == 2 and other[0, 0] == 2
+    assert service.get_stats()['cache_hits'] == 1
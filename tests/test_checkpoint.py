@@ -0,0 +1,104 @@
+import pytest
+
+# the trainers package imports the models, which need keras
+pytest.importorskip('keras')
+
+from yuri.trainers.checkpoint import CheckpointManager  # noqa: E402
+from yuri.trainers.cursor import TrainingCursor, cursor_path  # noqa: E402
+
+import os
+import time
+
+
+class StubSnapshot:
+
+    def __init__(self, value):
+        self.value = value
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            f.write(self.value)
+
+
+class StubModel:
+    """
+    anything with snapshot(); the HDF5 layout is covered by test_snapshot
+    """
+
+    def __init__(self):
+        self.value = 'initial'
+
+    def snapshot(self):
+        return StubSnapshot(self.value)
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def test_policies_keep_last_and_best(tmp_path):
+    save_path = str(tmp_path / 'model')
+    manager = CheckpointManager(save_path, keep_last=2, keep_best=True)
+    model = StubModel()
+    for i, accuracy in enumerate([0.5, 0.7, 0.6, 0.65]):
+        model.value = f'epoch {i}'
+        cursor = TrainingCursor(seed=1, epoch=i).to_dict()
+        assert manager.save(model, accuracy, cursor=cursor)
+    manager.close()
+
+    assert read(save_path) == 'epoch 3'
+    assert read(f'{save_path}-best') == 'epoch 1'
+    assert not os.path.exists(f'{save_path}-1') and not os.path.exists(f'{save_path}-2')
+    assert read(f'{save_path}-3') == 'epoch 2' and read(f'{save_path}-4') == 'epoch 3'
+    assert not os.path.exists(cursor_path(f'{save_path}-2'))
+    assert TrainingCursor.load(f'{save_path}-best').epoch == 1
+    assert TrainingCursor.load(save_path).epoch == 3
+    assert not os.path.exists(f'{save_path}.tmp')
+
+
+def test_every_minutes_skips_until_flushed(tmp_path):
+    save_path = str(tmp_path / 'model')
+    manager = CheckpointManager(save_path, every_minutes=60)
+    model = StubModel()
+    assert manager.save(model)
+    model.value = 'later'
+    assert not manager.save(model)
+    assert manager.flush(model)
+    assert not manager.flush(model)
+    manager.close()
+    assert read(save_path) == 'later'
+
+
+def test_failed_writes_keep_the_last_checkpoint_and_raise(tmp_path):
+    save_path = str(tmp_path / 'model')
+    manager = CheckpointManager(save_path)
+    model = StubModel()
+    manager.save(model)
+
+    class BrokenSnapshot(StubSnapshot):
+        def write(self, path):
+            with open(path, 'w') as f:
+                f.write('half')
+            raise OSError('disk full')
+
+    class BrokenModel(StubModel):
+        def snapshot(self):
+            return BrokenSnapshot('broken')
+
+    manager.save(BrokenModel())
+    with pytest.raises(OSError, match='disk full'):
+        manager.close()
+    assert read(save_path) == 'initial'
+
+
+def test_failed_write_is_raised_by_the_next_save(tmp_path):
+    manager = CheckpointManager(str(tmp_path / 'missing' / 'model'))
+    model = StubModel()
+    manager.save(model)
+    deadline = time.monotonic() + 10
+    while manager.error is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with pytest.raises(FileNotFoundError):
+        manager.save(model)
+
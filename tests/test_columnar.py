@@ -0,0 +1,65 @@
+from yuri.datasets import ColumnarDataset, ColumnarWriter, convert_legacy
+from yuri.observation import ObservationSpec
+
+import os
+
+import numpy as np
+import pytest
+
+
+def write_legacy(path, labels, frames):
+    """
+    a [choice_array, frame] object array with a step without a choice, as the
+    bots used to save them
+    """
+    data = np.empty(len(labels) + 1, dtype=object)
+    for i, (label, frame) in enumerate(zip(labels, frames)):
+        data[i] = [np.eye(4)[label], frame]
+    np.save(path, data)
+
+
+def test_writer_round_trip(tmp_path):
+    path = str(tmp_path / 'dataset')
+    rng = np.random.RandomState(0)
+    frames = rng.randint(0, 256, (7, 4, 5, 3)).astype(np.uint8)
+    labels = np.array([0, 1, 2, 3, 0, 1, 2])
+    writer = ColumnarWriter(path, 4, (4, 5, 3))
+    writer.append_episode('a', labels[:3], frames[:3])
+    writer.append_episode('b', labels[3:], frames[3:])
+    writer.close()
+
+    dataset = ColumnarDataset(path)
+    assert not os.path.exists(f'{path}.tmp')
+    assert len(dataset) == 7
+    assert dataset.episodes == ['a', 'b']
+    assert dataset.offsets.tolist() == [0, 3, 7]
+    np.testing.assert_array_equal(dataset.frames, frames)
+    x, y = dataset.get_batch([5, 1])
+    np.testing.assert_array_equal(x, frames[[1, 5]])
+    np.testing.assert_array_equal(y.argmax(1), labels[[1, 5]])
+
+
+def test_writer_rejects_frames_of_another_shape(tmp_path):
+    writer = ColumnarWriter(str(tmp_path / 'dataset'), 4, (4, 5, 3))
+    with pytest.raises(ValueError):
+        writer.append_episode('a', [0], np.zeros((1, 4, 4, 3), np.uint8))
+
+
+def test_convert_legacy_files(tmp_path):
+    src = tmp_path / 'train'
+    src.mkdir()
+    rng = np.random.RandomState(0)
+    frames = rng.randint(0, 256, (5, 8, 6)).astype(np.uint8)
+    write_legacy(str(src / 'game1.npy'), [0, 3, 1], frames[:3])
+    write_legacy(str(src / 'game2.npy'), [2, 2], frames[3:])
+    np.save(str(src / 'broken.npy'), np.arange(3))
+
+    dataset = convert_legacy(str(src), str(tmp_path / 'dataset'))
+    assert dataset.episodes == ['game1.npy', 'game2.npy']
+    assert dataset.frame_shape == (8, 6, 1)
+    assert dataset.labels.tolist() == [0, 3, 1, 2, 2]
+    np.testing.assert_array_equal(dataset.frames[..., 0], frames)
+
+    spec = ObservationSpec(1, downscale=2, map_size=(6, 8))
+    x, _ = dataset.get_batch([0, 4], spec)
+    assert x.shape == (2,) + spec.shape
@@ -0,0 +1,107 @@
+import pytest
+
+# the trainers package imports the models, which need keras
+pytest.importorskip('keras')
+
+from yuri.trainers.cursor import TrainingCursor  # noqa: E402
+from yuri.observation import ObservationSpec  # noqa: E402
+
+import numpy as np
+
+SPEC = ObservationSpec(3, map_size=(6, 8))
+
+
+def test_order_depends_on_seed_and_epoch_only():
+    cursor = TrainingCursor(seed=7)
+    first = cursor.order(['c', 'a', 'b', 'd'])
+    assert sorted(first) == ['a', 'b', 'c', 'd']
+    assert TrainingCursor(seed=7).order(['d', 'c', 'b', 'a']) == first
+    files = [f'game{i}' for i in range(20)]
+    epochs = list()
+    for _ in range(3):
+        epochs.append(cursor.order(files))
+        cursor.next_epoch()
+    assert epochs[0] != epochs[1] != epochs[2]
+    assert (cursor.epoch, cursor.offset) == (3, 0)
+
+
+def test_saved_cursor_resumes_the_sample_rng(tmp_path):
+    cursor = TrainingCursor(seed=7, epoch=2, offset=400)
+    cursor.rng.permutation(100)
+    path = str(tmp_path / 'model')
+    TrainingCursor.save(cursor.to_dict(), path)
+
+    resumed = TrainingCursor.load(path)
+    assert (resumed.seed, resumed.epoch, resumed.offset) == (7, 2, 400)
+    np.testing.assert_array_equal(resumed.rng.permutation(100), cursor.rng.permutation(100))
+    assert TrainingCursor.load(str(tmp_path / 'other')).epoch == 0
+
+
+class RecordingModel:
+    """
+    fits nothing, records the labels of every batch it is given and can be
+    interrupted after a number of chunks
+    """
+
+    def __init__(self, batches, interrupt_after=None):
+        self.batches = batches
+        self.interrupt_after = interrupt_after
+        self.chunks = 0
+
+    def fit_generator(self, generator, steps, x_test, y_test, epochs):
+        if self.chunks == self.interrupt_after:
+            raise KeyboardInterrupt
+        self.chunks += 1
+        for _ in range(steps * epochs):
+            self.batches.append(next(generator)[1].argmax(1).tolist())
+
+    def val_accuracy(self):
+        return None
+
+    def snapshot(self):
+        return self
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            f.write('model')
+
+
+def make_trainer(data_dir, save_path, model, cursor):
+    from yuri.trainers.base_trainer import BaseTrainer
+
+    trainer = BaseTrainer()
+    trainer.train_data_dir = data_dir
+    trainer.save_path = save_path
+    trainer.spec = SPEC
+    trainer.num_choices = 4
+    trainer.workers = 1
+    trainer.increment = 2
+    trainer.hm_epochs = 2
+    trainer.test_size = 4
+    trainer.batch_size = 8
+    trainer.model = model
+    trainer.cursor = cursor
+    return trainer
+
+
+def test_resumed_training_replays_the_same_batches(tmp_path, write_games):
+    data_dir = str(tmp_path / 'train')
+    write_games(data_dir, [f'game{i}' for i in range(6)], 20, SPEC.shape)
+
+    expected = list()
+    trainer = make_trainer(data_dir, str(tmp_path / 'full'), RecordingModel(expected), TrainingCursor(seed=3))
+    trainer.train_files()
+    trainer.close_checkpoints()
+
+    batches = list()
+    save_path = str(tmp_path / 'resumed')
+    trainer = make_trainer(data_dir, save_path, RecordingModel(batches, interrupt_after=4), TrainingCursor(seed=3))
+    with pytest.raises(KeyboardInterrupt):
+        trainer.train_files()
+    trainer.close_checkpoints()
+    trainer = make_trainer(data_dir, save_path, RecordingModel(batches), TrainingCursor.load(save_path))
+    trainer.train_files()
+    trainer.close_checkpoints()
+
+    assert len(expected) > 0
+    assert batches == expected
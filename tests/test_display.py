@@ -0,0 +1,29 @@
+from yuri.monitors.display import DisplayWorker
+
+import time
+import threading
+
+import numpy as np
+
+
+def test_slow_window_drops_all_but_the_latest_frame():
+    shown, release = list(), threading.Event()
+
+    def show(title, frame):
+        release.wait()
+        shown.append(int(frame[0, 0]))
+
+    worker = DisplayWorker(show)
+    frame = np.zeros((2, 2), np.uint8)
+    for i in range(5):
+        frame[:] = i
+        worker.submit('test', frame)
+        # let the worker take the first frame before the others pile up
+        time.sleep(0.05)
+    release.set()
+    deadline = time.monotonic() + 2
+    while len(shown) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    worker.close()
+    assert shown == [0, 4]
+    assert worker.frames_dropped == 3
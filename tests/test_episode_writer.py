@@ -0,0 +1,76 @@
+from yuri.datasets import EpisodeWriter
+from yuri.datasets.columnar import read_legacy_file
+from yuri.monitors.unit_record import UNIT_DTYPE, UnitRecord
+
+import os
+import time
+
+import numpy as np
+
+
+def sample(label, value, shape=(4, 3)):
+    return [np.eye(5)[label], np.full(shape, value, np.uint8)]
+
+
+def test_episode_writer_commits_or_discards_chunks(tmp_path):
+    out_dir = str(tmp_path / 'train')
+    writer = EpisodeWriter(out_dir, chunk_size=4, name='won')
+    for i in range(10):
+        writer.append(sample(i % 5, i))
+    assert not os.path.exists(out_dir)
+    assert os.listdir(f'{out_dir}.partial') == ['won']
+    committed = writer.commit()
+    assert committed == os.path.join(out_dir, 'won.npy')
+    choices, frames, _ = read_legacy_file(committed)
+    np.testing.assert_array_equal(choices, np.arange(10) % 5)
+    np.testing.assert_array_equal(frames[:, 0, 0], np.arange(10))
+    assert not os.path.exists(f'{out_dir}.partial')
+
+    writer = EpisodeWriter(out_dir, chunk_size=4, name='lost')
+    for i in range(6):
+        writer.append(sample(i % 5, i))
+    writer.discard()
+    assert os.listdir(out_dir) == ['won.npy']
+    assert not os.path.exists(f'{out_dir}.partial')
+
+
+def test_unit_records_are_merged_into_one_file(tmp_path):
+    out_dir = str(tmp_path / 'train')
+    writer = EpisodeWriter(out_dir, chunk_size=2)
+    for i in range(5):
+        record = UnitRecord(np.zeros(i, UNIT_DTYPE), np.zeros(4), (8, 8))
+        writer.append([np.eye(4)[i % 4], record.to_dict()])
+    data = np.load(writer.commit(), allow_pickle=True)
+    assert data.shape == (5, 2)
+    assert [np.argmax(d[0]) for d in data] == [0, 1, 2, 3, 0]
+
+
+def test_games_started_in_the_same_second_do_not_share_a_partial_dir(tmp_path, monkeypatch):
+    out_dir = str(tmp_path / 'train')
+    monkeypatch.setattr(time, 'time', lambda: 1000.0)
+    writers = list()
+    for pid in (101, 102):
+        monkeypatch.setattr(os, 'getpid', lambda: pid)
+        writers.append(EpisodeWriter(out_dir, chunk_size=2))
+    won, lost = writers
+    assert won.name != lost.name
+    for i in range(3):
+        won.append(sample(0, i))
+        lost.append(sample(1, 10 + i))
+    lost.discard()
+    _, frames, _ = read_legacy_file(won.commit())
+    np.testing.assert_array_equal(frames[:, 0, 0], [0, 1, 2])
+
+
+def test_stale_partial_episodes_are_removed(tmp_path):
+    out_dir = str(tmp_path / 'train')
+    crashed = EpisodeWriter(out_dir, chunk_size=1, name='crashed')
+    crashed.append(sample(0, 0))
+    running = EpisodeWriter(out_dir, chunk_size=1, name='running')
+    running.append(sample(0, 0))
+    day_ago = time.time() - 24 * 60 * 60
+    for path in (crashed.partial_path, crashed.partial_dir):
+        os.utime(path, (day_ago, day_ago))
+
+    EpisodeWriter(out_dir, name='next')
+    assert os.listdir(f'{out_dir}.partial') == ['running']
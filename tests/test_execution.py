@@ -0,0 +1,22 @@
+from yuri.execution import ExecutionProfile
+from yuri.loggers import logger
+
+
+def test_cpu_profile_splits_cores_between_games():
+    profile = ExecutionProfile.cpu('game', games=2, game_index=1, pin=True, cores=range(8))
+    assert profile.cores == [4, 5, 6, 7]
+    assert (profile.intra_op_threads, profile.inter_op_threads) == (2, 1)
+    profile = ExecutionProfile.cpu('train', cores=range(8))
+    assert profile.cores is None
+    assert (profile.intra_op_threads, profile.inter_op_threads) == (8, 2)
+
+
+def test_pin_logs_the_profile_without_a_session():
+    messages = list()
+    sink = logger.add(messages.append, format='{message}')
+    try:
+        profile = ExecutionProfile.cpu('game', games=1)
+        assert profile.pin() is profile
+    finally:
+        logger.remove(sink)
+    assert any(message.startswith(f'Execution profile: {profile}') for message in messages)
@@ -0,0 +1,40 @@
+from yuri.datasets import Manifest
+
+import os
+
+import numpy as np
+
+
+def test_manifest_indexes_counts_and_quarantines(tmp_path, write_games):
+    data_dir = str(tmp_path / 'train')
+    write_games(data_dir, ['game0', 'game1'], 20, (8, 6, 3))
+    np.save(os.path.join(data_dir, 'broken.npy'), np.zeros(0))
+    manifest = Manifest(data_dir).update()
+
+    files = manifest.valid_files()
+    assert len(files) == 2
+    assert manifest.quarantined() == ['broken.npy']
+    assert manifest.counts(files).sum() == 40
+    assert manifest.entries[files[0]]['frame_shape'] == [8, 6, 3]
+    assert manifest.balanced_length(files, 4) == manifest.counts(files).min()
+    assert manifest.balanced_length(files, 5) == 0
+    assert os.path.isfile(f'{data_dir}.manifest.json')
+
+
+def test_manifest_rereads_only_changed_files(tmp_path, write_games):
+    data_dir = str(tmp_path / 'train')
+    write_games(data_dir, ['game0', 'game1'], 20, (8, 6, 3))
+    Manifest(data_dir).update()
+
+    first, second = sorted(os.listdir(data_dir))
+    os.remove(os.path.join(data_dir, second))
+    with open(os.path.join(data_dir, first), 'wb') as f:
+        f.write(b'truncated')
+    manifest = Manifest(data_dir)
+    reread = list()
+    index_file = manifest.index_file
+    manifest.index_file = lambda file, stat: reread.append(file) or index_file(file, stat)
+    manifest.update()
+    assert reread == [first]
+    assert manifest.valid_files() == list()
+    assert sorted(manifest.entries) == [first]
@@ -0,0 +1,93 @@
+from yuri.benchmarks.fixtures import make_bot
+from yuri.monitors import ChromaticMonitor, MonochromeMonitor, RecordRenderer, UnitRecord
+from yuri.observation import CHROMATIC_SPEC, MONOCHROME_SPEC
+
+import math
+import random
+import asyncio
+
+import cv2
+import numpy as np
+import pytest
+
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+def legacy_resources(bot, game_data):
+    resources = run(ChromaticMonitor.calculate_resources(bot))
+    ChromaticMonitor.draw_resource_bars(game_data, resources)
+
+
+def legacy_chromatic(monitor, bot):
+    """
+    the frame ChromaticMonitor drew before circles were batched, one
+    cv2.circle per unit
+    """
+    game_data = np.zeros((bot.game_info.map_size[1], bot.game_info.map_size[0], 3), np.uint8)
+    for unit_type, (radius, color) in monitor.draw_dict.items():
+        for unit in bot.units(unit_type):
+            cv2.circle(game_data, (int(unit.position[0]), int(unit.position[1])), radius, color, -1)
+    for building in bot.known_enemy_structures:
+        pos = (int(building.position[0]), int(building.position[1]))
+        if building.name.lower() in monitor.main_base_names:
+            cv2.circle(game_data, pos, 15, (0, 0, 255), -1)
+        else:
+            cv2.circle(game_data, pos, 5, (200, 50, 212), -1)
+    for unit in bot.known_enemy_units:
+        if not unit.is_structure:
+            pos = (int(unit.position[0]), int(unit.position[1]))
+            if unit.name.lower() in monitor.worker_names:
+                cv2.circle(game_data, pos, 1, (55, 0, 155), -1)
+            else:
+                cv2.circle(game_data, pos, 3, (50, 0, 215), -1)
+    legacy_resources(bot, game_data)
+    return cv2.flip(game_data, 0)
+
+
+def legacy_monochrome(monitor, bot):
+    game_data = np.zeros((bot.game_info.map_size[1], bot.game_info.map_size[0], 3), np.uint8)
+    for units, color in ((bot.units().ready, monitor.ally_color), (bot.known_enemy_units, monitor.enemy_color)):
+        for unit in units:
+            cv2.circle(game_data, (int(unit.position[0]), int(unit.position[1])), int(unit.radius * 8),
+                       color, math.ceil(int(unit.radius * 0.5)))
+    legacy_resources(bot, game_data)
+    return cv2.flip(cv2.cvtColor(game_data, cv2.COLOR_BGR2GRAY), 0)
+
+
+@pytest.mark.parametrize('monitor_class, legacy', [(ChromaticMonitor, legacy_chromatic),
+                                                   (MonochromeMonitor, legacy_monochrome)])
+@pytest.mark.parametrize('incremental', [False, True])
+def test_frames_match_the_legacy_monitors(monitor_class, legacy, incremental):
+    random.seed(0)
+    bot = make_bot(300)
+    monitor = monitor_class(headless=True, incremental=incremental)
+    for _ in range(10):
+        bot.jitter(fraction=0.05)
+        run(monitor.draw(bot))
+        assert np.array_equal(monitor.refresh(), legacy(monitor, bot))
+
+
+def test_frames_are_rendered_only_when_read():
+    bot = make_bot(50)
+    monitor = ChromaticMonitor(headless=True)
+    for _ in range(3):
+        run(monitor.draw(bot))
+    observation = monitor.get_flipped()
+    assert observation.shape == CHROMATIC_SPEC.shape
+    assert monitor.get_render_stats() == {'rendered': 1, 'skipped': 2}
+
+
+@pytest.mark.parametrize('monitor_class, spec', [(ChromaticMonitor, CHROMATIC_SPEC),
+                                                 (MonochromeMonitor, MONOCHROME_SPEC)])
+@pytest.mark.parametrize('downscale', [1, 2, 4])
+def test_records_render_like_the_monitor(monitor_class, spec, downscale):
+    spec = spec.scaled(downscale)
+    bot = make_bot(200)
+    monitor = monitor_class(headless=True, spec=spec)
+    run(monitor.draw(bot))
+    record = monitor.get_record()
+    assert UnitRecord.is_record(record)
+    observation = monitor.get_flipped()
+    assert np.array_equal(RecordRenderer(spec)(record), observation)
@@ -0,0 +1,91 @@
+from yuri.inference.numpy_backend import NumpyBackend, conv2d, max_pooling2d
+from yuri.observation import CHROMATIC_SPEC
+
+import os
+
+import numpy as np
+import pytest
+
+# largest difference of a probability between the keras and NumPy backends
+PARITY_TOLERANCE = 1e-5
+
+
+def naive_conv2d(x, kernel, bias, padding):
+    kh, kw, _, filters = kernel.shape
+    if padding == 'same':
+        # TensorFlow pads the odd pixel at the bottom and right
+        top, left = (kh - 1) // 2, (kw - 1) // 2
+        x = np.pad(x, ((0, 0), (top, kh - 1 - top), (left, kw - 1 - left), (0, 0)), 'constant')
+    n, h, w, _ = x.shape
+    out = np.zeros((n, h - kh + 1, w - kw + 1, filters), np.float64)
+    for i in range(out.shape[1]):
+        for j in range(out.shape[2]):
+            out[:, i, j] = np.tensordot(x[:, i:i + kh, j:j + kw], kernel, axes=3)
+    return out + bias
+
+
+@pytest.mark.parametrize('kernel_size', [(3, 3), (2, 2), (1, 3)])
+@pytest.mark.parametrize('padding', ['same', 'valid'])
+def test_conv2d_matches_direct_convolution(kernel_size, padding):
+    rng = np.random.RandomState(0)
+    x = rng.randn(2, 9, 7, 3).astype(np.float32)
+    kernel = rng.randn(*kernel_size, 3, 5).astype(np.float32)
+    bias = rng.randn(5).astype(np.float32)
+    out = conv2d(x, kernel, bias, padding)
+    np.testing.assert_allclose(out, naive_conv2d(x, kernel, bias, padding), atol=1e-4)
+
+
+def test_max_pooling2d_drops_the_odd_edge():
+    x = np.arange(2 * 5 * 4 * 3, dtype=np.float32).reshape(2, 5, 4, 3)
+    out = max_pooling2d(x, (2, 2))
+    assert out.shape == (2, 2, 2, 3)
+    assert out[1, 1, 1, 2] == x[1, 3, 3, 2]
+
+
+def test_save_and_load_keep_the_predictions(tmp_path):
+    rng = np.random.RandomState(0)
+    layers = [{'type': 'conv2d', 'padding': 'same', 'activation': 'relu'},
+              {'type': 'max_pooling2d', 'pool_size': [2, 2]},
+              {'type': 'flatten'},
+              {'type': 'dense', 'activation': 'softmax'}]
+    weights = [rng.randn(3, 3, 3, 4), rng.randn(4), rng.randn(4 * 4 * 4, 4), rng.randn(4)]
+    backend = NumpyBackend(layers, weights, CHROMATIC_SPEC)
+    path = str(tmp_path / 'model.npz')
+    backend.save(path)
+    loaded = NumpyBackend.load(path, CHROMATIC_SPEC)
+    x = rng.randint(0, 256, (3, 8, 8, 3)).astype(np.uint8)
+    np.testing.assert_array_equal(loaded.predict(x), backend.predict(x))
+    assert loaded.spec == CHROMATIC_SPEC
+    with pytest.raises(ValueError):
+        NumpyBackend.load(path, CHROMATIC_SPEC.scaled(2))
+
+
+def keras_models():
+    from keras.models import Sequential
+    from keras.layers import Conv2D, Dense, Dropout, Flatten, MaxPooling2D
+    from yuri.models import AttackCNNModel
+
+    spec = CHROMATIC_SPEC.scaled(8)
+    yield 'attack', AttackCNNModel(spec).init().get_model(), spec
+    even = Sequential()
+    even.add(Conv2D(6, (2, 2), padding='same', input_shape=(9, 8, 1), activation='relu'))
+    even.add(Conv2D(4, (4, 3), padding='same', activation='relu'))
+    even.add(MaxPooling2D(pool_size=(3, 2)))
+    even.add(Dropout(0.5))
+    even.add(Flatten())
+    even.add(Dense(5, activation='softmax'))
+    yield 'even kernels', even, None
+
+
+def test_numpy_backend_matches_keras(tmp_path):
+    pytest.importorskip('keras')
+    from yuri.inference.export import export_model
+
+    rng = np.random.RandomState(0)
+    for name, model, spec in keras_models():
+        x = rng.randint(0, 256, (16,) + model.input_shape[1:]).astype(np.uint8)
+        backend = export_model(model, os.path.join(str(tmp_path), 'model.npz'), spec)
+        expected = model.predict(x.astype(np.float32))
+        predicted = backend.predict(x)
+        assert np.abs(predicted - expected).max() <= PARITY_TOLERANCE, name
+        assert np.array_equal(predicted.argmax(1), expected.argmax(1)), name
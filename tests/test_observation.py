@@ -0,0 +1,23 @@
+from yuri.observation import CHROMATIC_SPEC, MONOCHROME_SPEC, ObservationSpec
+
+import numpy as np
+import pytest
+
+
+def test_spec_shapes_and_json_round_trip():
+    assert CHROMATIC_SPEC.frame_shape == (176, 200, 3)
+    spec = ObservationSpec(1, downscale=4, crop=(8, 0, 200, 176))
+    assert spec.shape == (44, 48, 1)
+    assert ObservationSpec.from_json(spec.to_json()) == spec
+    assert spec != MONOCHROME_SPEC
+
+
+def test_convert_crops_and_shrinks_full_frames():
+    spec = ObservationSpec(3, downscale=2, crop=(2, 0, 10, 6), map_size=(10, 6))
+    frame = np.arange(6 * 10 * 3, dtype=np.uint8).reshape(6, 10, 3)
+    observation = spec.convert(frame)
+    assert observation.shape == spec.shape
+    # observations already of the spec pass through
+    np.testing.assert_array_equal(spec.convert(observation), observation)
+    with pytest.raises(ValueError):
+        spec.convert(np.zeros((5, 5, 3), np.uint8))
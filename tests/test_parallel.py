@@ -0,0 +1,75 @@
+from yuri.datasets import Manifest, ParallelLoader
+from yuri.datasets.columnar import read_legacy_file
+from yuri.observation import ObservationSpec
+
+import os
+
+import numpy as np
+import pytest
+
+SPEC = ObservationSpec(3, map_size=(12, 16))
+
+
+def read_sequentially(data_dir, files, spec):
+    labels, frames = list(), list()
+    for file in files:
+        choices, file_frames, _ = read_legacy_file(os.path.join(data_dir, file))
+        labels.extend(choices)
+        frames.extend(spec.convert(frame) for frame in file_frames)
+    return np.array(frames), np.array(labels)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+@pytest.mark.parametrize('downscale', [1, 2])
+def test_loader_matches_sequential_reads(tmp_path, write_games, workers, downscale):
+    data_dir = str(tmp_path)
+    write_games(data_dir, [f'game{i}' for i in range(5)], 12, SPEC.frame_shape)
+    manifest = Manifest(data_dir).update()
+    files = manifest.valid_files()
+    spec = SPEC.scaled(downscale)
+
+    frames, labels, counts = ParallelLoader(data_dir, manifest, spec, 4, workers).load(files)
+    expected_frames, expected_labels = read_sequentially(data_dir, files, spec)
+    np.testing.assert_array_equal(frames, expected_frames)
+    np.testing.assert_array_equal(labels, expected_labels)
+    assert counts.tolist() == np.bincount(expected_labels, minlength=4).tolist()
+
+
+def test_loader_closes_gaps_of_files_shrunk_since_indexing(tmp_path, write_games):
+    data_dir = str(tmp_path)
+    write_games(data_dir, ['game0', 'game1', 'game2'], 10, SPEC.frame_shape)
+    manifest = Manifest(data_dir).update()
+    files = manifest.valid_files()
+    # the game is written again, shorter, under the same file name
+    write_games(data_dir, ['game1'], 4, SPEC.frame_shape, seed=1)
+
+    frames, labels, counts = ParallelLoader(data_dir, manifest, SPEC, 4).load(files)
+    expected_frames, expected_labels = read_sequentially(data_dir, files, SPEC)
+    assert len(labels) == 24
+    np.testing.assert_array_equal(frames, expected_frames)
+    np.testing.assert_array_equal(labels, expected_labels)
+
+
+def test_loader_keeps_its_pool_across_loads(tmp_path, write_games):
+    data_dir = str(tmp_path)
+    write_games(data_dir, [f'game{i}' for i in range(6)], 8, SPEC.frame_shape)
+    manifest = Manifest(data_dir).update()
+    files = manifest.valid_files()
+    loader = ParallelLoader(data_dir, manifest, SPEC, 4, workers=2)
+    try:
+        loader.load(files[:2])
+        pool = loader.pool
+        for chunk in (files[2:4], files[:3]):
+            frames, labels, _ = loader.load(chunk)
+            expected_frames, expected_labels = read_sequentially(data_dir, chunk, SPEC)
+            np.testing.assert_array_equal(frames, expected_frames)
+            np.testing.assert_array_equal(labels, expected_labels)
+        assert loader.pool is pool
+
+        # a chunk larger than any before grows the buffers
+        frames, _, _ = loader.load(files)
+        assert len(frames) == 48 and loader.capacity >= 48
+        np.testing.assert_array_equal(frames, read_sequentially(data_dir, files, SPEC)[0])
+    finally:
+        loader.close()
+    assert loader.pool is None
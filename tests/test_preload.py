@@ -0,0 +1,51 @@
+from yuri.inference import InferenceService, ModelPreloader, NumpyBackend, check_saved_spec
+from yuri.observation import SPEC_ATTR, ObservationSpec
+
+import asyncio
+
+import h5py
+import numpy as np
+import pytest
+
+LAYERS = [{'type': 'flatten'}, {'type': 'dense', 'activation': 'softmax'}]
+
+
+def test_preloaded_model_is_warm_and_predicts_like_the_saved_one(tmp_path):
+    spec = ObservationSpec(3, map_size=(4, 4))
+    rng = np.random.RandomState(0)
+    backend = NumpyBackend(LAYERS, [rng.randn(int(np.prod(spec.shape)), 4), rng.randn(4)])
+    path = str(tmp_path / 'model.npz')
+    backend.save(path)
+
+    preloader = ModelPreloader(path, spec)
+    model = preloader.future.result(timeout=30)
+    assert preloader.load_seconds is not None and preloader.warmup_seconds is not None
+
+    x = rng.randint(0, 256, (2,) + spec.shape).astype(np.uint8)
+    np.testing.assert_allclose(model.predict(x), backend.predict(x), rtol=1e-6)
+
+
+def test_failed_load_resolves_the_future_with_the_error(tmp_path):
+    preloader = ModelPreloader(str(tmp_path / 'missing.npz'), ObservationSpec(3, map_size=(4, 4)))
+    assert preloader.future.exception(timeout=30) is not None
+
+    service = InferenceService(preloader.future, threaded=False)
+    with pytest.raises(type(preloader.future.exception())):
+        asyncio.get_event_loop().run_until_complete(service.predict(np.zeros((1, 4, 4, 3), np.uint8)))
+
+
+def test_saved_spec_is_checked_without_loading_the_model(tmp_path):
+    spec = ObservationSpec(3, map_size=(4, 4))
+    other = ObservationSpec(1, map_size=(4, 4))
+    npz_path = str(tmp_path / 'model.npz')
+    NumpyBackend(LAYERS, [np.zeros((48, 4)), np.zeros(4)], spec).save(npz_path)
+    h5_path = str(tmp_path / 'model.h5')
+    with h5py.File(h5_path, 'w') as f:
+        f.attrs[SPEC_ATTR] = spec.to_json()
+
+    for path in (npz_path, h5_path):
+        check_saved_spec(path, spec)
+        with pytest.raises(ValueError, match='was trained on'):
+            check_saved_spec(path, other)
+    with pytest.raises(FileNotFoundError):
+        check_saved_spec(str(tmp_path / 'missing.h5'), spec)
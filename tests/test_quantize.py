@@ -0,0 +1,51 @@
+from yuri.inference.numpy_backend import Int8Weight, NumpyBackend
+from yuri.inference.quantize import calibrate, quantize_kernel, report
+
+import numpy as np
+
+LAYERS = [{'type': 'conv2d', 'padding': 'same', 'activation': 'relu'},
+          {'type': 'max_pooling2d', 'pool_size': [2, 2]},
+          {'type': 'flatten'},
+          {'type': 'dense', 'activation': 'relu'},
+          {'type': 'dense', 'activation': 'softmax'}]
+
+
+def make_backend(seed=0):
+    rng = np.random.RandomState(seed)
+    weights = [rng.randn(3, 3, 3, 8) * 0.1, rng.randn(8) * 0.1,
+               rng.randn(4 * 4 * 8, 32) * 0.05, rng.randn(32) * 0.1,
+               rng.randn(32, 4) * 0.2, rng.randn(4) * 0.1]
+    return NumpyBackend(LAYERS, weights)
+
+
+def test_quantize_kernel_per_output_channel():
+    kernel = np.random.RandomState(0).randn(3, 3, 2, 4).astype(np.float32) * [1, 10, 100, 0]
+    weight = quantize_kernel(kernel)
+    assert weight.values.dtype == np.int8
+    assert np.abs(weight.values).max() == 127
+    np.testing.assert_allclose(weight.dequantize(), kernel, atol=np.max(weight.scales) / 2 + 1e-6)
+
+
+def test_int8_dot_matches_dequantized_kernel():
+    rng = np.random.RandomState(0)
+    weight = quantize_kernel(rng.randn(10000, 6).astype(np.float32))
+    x = rng.randn(2, 10000).astype(np.float32)
+    np.testing.assert_allclose(weight.dot(x), x @ weight.dequantize(), rtol=1e-4, atol=1e-3)
+
+
+def test_calibrated_model_agrees_with_float32(tmp_path):
+    backend = make_backend()
+    rng = np.random.RandomState(1)
+    frames = rng.randint(0, 256, (48, 8, 8, 3)).astype(np.uint8)
+    quantized = calibrate(backend, frames[:16])
+    assert all(isinstance(w, Int8Weight) for w in quantized.weights[::2])
+
+    path = str(tmp_path / 'int8.npz')
+    quantized.save(path)
+    loaded = NumpyBackend.load(path)
+    np.testing.assert_array_equal(loaded.predict(frames), quantized.predict(frames))
+
+    labels = backend.predict(frames).argmax(1)
+    result = report(backend, loaded, frames[16:], labels[16:])
+    assert result['argmax_agreement'] >= 0.9
+    assert result['int8_bytes'] < result['float32_bytes'] / 3
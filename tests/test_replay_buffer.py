@@ -0,0 +1,39 @@
+from yuri.datasets import ColumnarDataset, ReplayBuffer
+from yuri.datasets.columnar import read_legacy_file
+
+import numpy as np
+
+
+def sample(label, value, shape=(4, 3)):
+    return [np.eye(5)[label], np.full(shape, value, np.uint8)]
+
+
+def test_ring_keeps_the_latest_samples_oldest_first():
+    buffer = ReplayBuffer(4)
+    for i in range(6):
+        buffer.append(sample(i % 5, i))
+    buffer.append(None)
+    assert len(buffer) == 4
+    assert buffer.get_labels().tolist() == [2, 3, 4, 0]
+    assert buffer.get_frames()[:, 0, 0].tolist() == [2, 3, 4, 5]
+
+
+def test_exported_chunks_read_like_legacy_files(tmp_path):
+    buffer = ReplayBuffer(3)
+    for i in range(5):
+        buffer.append(sample(i % 5, i))
+    path = str(tmp_path / 'chunk.npy')
+    buffer.export_npy(path)
+    choices, frames, num_choices = read_legacy_file(path)
+    assert choices.tolist() == [2, 3, 4]
+    assert frames[:, 0, 0].tolist() == [2, 3, 4]
+    assert num_choices == 5
+    # the trainers index rows as d[0] and d[1]
+    row = np.load(path, allow_pickle=True)[0]
+    assert np.argmax(row[0]) == 2 and row[1].shape == (4, 3)
+
+    buffer.export_columnar(str(tmp_path / 'dataset'), 'game')
+    dataset = ColumnarDataset(str(tmp_path / 'dataset'))
+    assert dataset.labels.tolist() == [2, 3, 4]
+    assert dataset.frame_shape == (4, 3, 1)
+
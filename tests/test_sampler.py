@@ -0,0 +1,47 @@
+from yuri.datasets import ClassSampler
+
+import numpy as np
+import pytest
+
+
+def make_sampler(counts, seed=0):
+    labels = np.repeat(np.arange(len(counts)), counts)
+    return ClassSampler(labels, len(counts), np.random.RandomState(seed))
+
+
+def test_sample_balances_choices():
+    sampler = make_sampler([100, 10, 30, 0])
+    indices = sampler.sample(size=300)
+    labels = np.repeat(np.arange(4), [100, 10, 30, 0])[indices]
+    assert np.bincount(labels, minlength=4).tolist() == [100, 100, 100, 0]
+
+
+def test_hold_out_is_disjoint_from_training():
+    sampler = make_sampler([50, 50])
+    held = sampler.hold_out(20)
+    assert len(held) == 20
+    assert not set(held.tolist()) & set(sampler.sample().tolist())
+
+
+@pytest.mark.parametrize('size', [40, 100])
+def test_sample_after_holding_out_everything(size):
+    sampler = make_sampler([25, 10, 5, 0])
+    held = sampler.hold_out(size)
+    assert len(held) == 40
+    assert sampler.counts().sum() == 0
+    for weights in (None, [1, 2, 3, 4]):
+        indices = sampler.sample(weights)
+        assert len(indices) == 0
+        assert indices.dtype == np.int64
+
+
+def test_fit_chunk_skips_chunk_held_out_entirely():
+    pytest.importorskip('keras')
+    from yuri.trainers.base_trainer import BaseTrainer
+
+    trainer = BaseTrainer()
+    trainer.num_choices = 4
+    # no model: fitting would fail, the chunk has to be skipped before
+    trainer.model = None
+    labels = np.arange(40) % 4
+    assert trainer.fit_chunk(np.zeros((40, 1)), labels) is trainer
@@ -0,0 +1,76 @@
+from yuri.inference import InferenceService
+
+import time
+import asyncio
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+class SlowModel:
+    """
+    predicts the row sums of x after sleeping seconds, or until release is set
+    """
+
+    def __init__(self, seconds=0.0):
+        self.seconds = seconds
+        self.release = threading.Event()
+        self.calls = 0
+
+    def predict(self, x):
+        self.calls += 1
+        self.release.wait(self.seconds)
+        return x.reshape(len(x), -1).sum(axis=1, keepdims=True)
+
+
+X = np.ones((1, 2, 2, 1), np.float32)
+
+
+def test_inline_and_threaded_predictions_agree():
+    for threaded in (False, True):
+        service = InferenceService(SlowModel(), timeout=1.0, threaded=threaded)
+        np.testing.assert_array_equal(run(service.predict(X)), [[4]])
+        assert service.get_stats()['predictions'] == 1
+        service.close()
+
+
+def test_late_prediction_falls_back_without_queueing():
+    model = SlowModel(seconds=10)
+    service = InferenceService(model, timeout=0.05)
+    assert run(service.predict(X)) is None
+    # the late prediction still runs; requests made meanwhile do not queue behind it
+    assert run(service.predict(X)) is None
+    assert model.calls == 1
+    assert service.get_stats()['late'] == 2
+
+    model.release.set()
+    run(asyncio.wait([service.running]))
+    np.testing.assert_array_equal(run(service.predict(X)), [[4]])
+    assert model.calls == 2
+    service.close()
+
+
+def test_loading_model_falls_back_until_it_resolves():
+    future = Future()
+    service = InferenceService(future, timeout=0.05)
+    assert run(service.predict(X)) is None
+    assert service.late == 1
+
+    future.set_result(SlowModel())
+    np.testing.assert_array_equal(run(service.predict(X)), [[4]])
+    service.close()
+
+
+def test_without_timeout_predictions_wait_for_the_model():
+    future = Future()
+    service = InferenceService(future, timeout=None, threaded=False)
+    threading.Timer(0.05, future.set_result, [SlowModel()]).start()
+    start = time.perf_counter()
+    np.testing.assert_array_equal(run(service.predict(X)), [[4]])
+    assert time.perf_counter() - start >= 0.04
+    assert service.late == 0
@@ -0,0 +1,79 @@
+from yuri.datasets import ShardedDataset, compact
+from yuri.datasets.shards import measure_throughput, stratify
+
+import os
+
+import numpy as np
+import pytest
+
+FRAME_SHAPE = (8, 6, 3)
+
+
+def shard_sizes(dataset):
+    return [len(shard) for shard in dataset.shards]
+
+
+def test_stratify_keeps_choice_shares():
+    labels = np.repeat(np.arange(4), [400, 200, 100, 100])
+    shards = stratify(labels, 200)
+    assert [len(indices) for indices in shards] == [200, 200, 200, 200]
+    assert sorted(np.concatenate(shards).tolist()) == list(range(800))
+    for indices in shards:
+        assert np.bincount(labels[indices], minlength=4).tolist() == pytest.approx([100, 50, 25, 25], abs=2)
+
+
+def test_compact_fills_the_last_shard_first(tmp_path, write_games):
+    src, dst = str(tmp_path / 'train'), str(tmp_path / 'shards')
+    write_games(src, [f'game{i:02d}' for i in range(25)], 20, FRAME_SHAPE)
+    dataset = compact(src, dst, shard_size=200)
+    assert shard_sizes(dataset) == [200, 200, 100]
+
+    write_games(src, ['late00', 'late01'], 20, FRAME_SHAPE, seed=1)
+    dataset = compact(src, dst, shard_size=200)
+    assert shard_sizes(dataset) == [200, 200, 140]
+
+    write_games(src, [f'later{i:02d}' for i in range(4)], 20, FRAME_SHAPE, seed=2)
+    dataset = compact(src, dst, shard_size=200)
+    assert shard_sizes(dataset) == [200, 200, 200, 20]
+    assert len(dataset) == 31 * 20
+    assert not os.path.exists(os.path.join(dst, 'staging'))
+
+
+def test_compact_keeps_the_samples(tmp_path, write_games):
+    src, dst = str(tmp_path / 'train'), str(tmp_path / 'shards')
+    write_games(src, ['game00', 'game01'], 30, FRAME_SHAPE)
+    compact(src, dst, shard_size=50)
+    write_games(src, ['game02'], 30, FRAME_SHAPE, seed=1)
+    dataset = compact(src, dst, shard_size=50)
+
+    expected = list()
+    for file in sorted(os.listdir(src)):
+        data = np.load(os.path.join(src, file), allow_pickle=True)
+        expected.extend(frame.tobytes() for frame in data['frame'])
+    frames = [frame.tobytes() for shard in dataset.shards for frame in np.array(shard.frames)]
+    assert sorted(frames) == sorted(expected)
+
+
+def test_compact_skips_rewritten_files(tmp_path, write_games):
+    src, dst = str(tmp_path / 'train'), str(tmp_path / 'shards')
+    write_games(src, ['game00', 'game01'], 20, FRAME_SHAPE)
+    compact(src, dst, shard_size=100)
+    path = os.path.join(src, sorted(os.listdir(src))[0])
+    os.utime(path, (0, 0))
+    dataset = compact(src, dst, shard_size=100)
+    assert shard_sizes(dataset) == [40]
+    assert isinstance(ShardedDataset(dst), ShardedDataset)
+
+
+def test_measure_throughput_reads_legacy_object_arrays(tmp_path):
+    src, dst = str(tmp_path / 'train'), str(tmp_path / 'shards')
+    os.makedirs(src)
+    data = np.empty((3, 2), dtype=object)
+    for i in range(3):
+        data[i, 0] = np.eye(4)[i]
+        data[i, 1] = np.full(FRAME_SHAPE, i, np.uint8)
+    np.save(os.path.join(src, 'legacy.npy'), data)
+    dataset = compact(src, dst, shard_size=10)
+    assert shard_sizes(dataset) == [3]
+    report = measure_throughput(src, dataset)
+    assert report['legacy_samples_per_second'] > 0
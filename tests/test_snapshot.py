@@ -0,0 +1,122 @@
+import json
+
+import h5py
+import numpy as np
+import pytest
+
+keras = pytest.importorskip('keras')
+
+from yuri.models import AttackCNNModel, ModelSnapshot, load_spec  # noqa: E402
+from yuri.models.base_model import SPEC_ATTR  # noqa: E402
+from yuri.models.snapshot import TRAINING_LAYOUT_VERSION  # noqa: E402
+from yuri.observation import CHROMATIC_SPEC  # noqa: E402
+
+from keras.models import load_model, model_from_json  # noqa: E402
+
+SPEC = CHROMATIC_SPEC.scaled(8)
+
+
+def make_model():
+    return AttackCNNModel(SPEC).init()
+
+
+def read_layout(path):
+    """
+    the groups and datasets of an HDF5 file by path, with their attrs and values
+    """
+    layout = dict()
+    with h5py.File(path, 'r') as f:
+        def visit(name, item):
+            if isinstance(item, h5py.Dataset):
+                layout[name] = (dict(item.attrs), item[()])
+            elif len(item) > 0 or any(np.size(attr) > 0 for attr in item.attrs.values()):
+                layout[name] = (dict(item.attrs), None)
+        f.visititems(visit)
+        layout['/'] = (dict(f.attrs), None)
+    return layout
+
+
+def assert_same_layout(snapshot_path, saved_path):
+    """
+    everything model.save wrote is in the snapshot, alike; groups newer keras
+    versions add empty are left out
+    """
+    snapshot, saved = read_layout(snapshot_path), read_layout(saved_path)
+    for name, (attrs, value) in saved.items():
+        assert name in snapshot, name
+        snapshot_attrs, snapshot_value = snapshot[name]
+        np.testing.assert_array_equal(snapshot_value, value)
+        for key, attr in attrs.items():
+            if key == 'model_config':
+                # newer versions write more keys, which describe the same model
+                assert model_from_json(snapshot_attrs[key]).get_config() == \
+                    model_from_json(attr).get_config()
+            elif key == 'training_config':
+                assert json.loads(snapshot_attrs[key]) == json.loads(attr)
+            else:
+                np.testing.assert_array_equal(snapshot_attrs[key], attr)
+
+
+def test_snapshot_is_laid_out_like_model_save(tmp_path):
+    model = make_model().get_model()
+    model.save(str(tmp_path / 'saved.h5'))
+    ModelSnapshot(model).write(str(tmp_path / 'snapshot.h5'))
+    assert_same_layout(str(tmp_path / 'snapshot.h5'), str(tmp_path / 'saved.h5'))
+
+
+@pytest.mark.skipif(keras.__version__.startswith(TRAINING_LAYOUT_VERSION),
+                    reason='compiled models are snapshot on keras 2.2')
+def test_compiled_snapshot_fails_on_other_keras_versions():
+    with pytest.raises(ValueError, match=keras.__version__):
+        model = make_model().get_model()
+        model.compile('adam', 'categorical_crossentropy')
+        ModelSnapshot(model)
+
+
+def test_snapshot_loads_with_load_model(tmp_path):
+    model = make_model()
+    path = str(tmp_path / 'model.h5')
+    model.snapshot().write(path)
+
+    loaded = load_model(path)
+    for saved, original in zip(loaded.get_weights(), model.get_model().get_weights()):
+        np.testing.assert_array_equal(saved, original)
+    x = np.random.RandomState(0).randint(0, 256, (4,) + SPEC.shape).astype(np.float32)
+    np.testing.assert_array_equal(loaded.predict(x), model.get_model().predict(x))
+    assert load_spec(path) == SPEC
+
+
+def test_snapshot_keeps_the_weights_it_was_taken_with(tmp_path):
+    model = make_model().get_model()
+    snapshot = ModelSnapshot(model, {SPEC_ATTR: SPEC.to_json()})
+    expected = model.get_weights()
+    model.set_weights([np.zeros_like(w) for w in expected])
+    assert snapshot.nbytes() == sum(w.nbytes for w in expected)
+
+    path = str(tmp_path / 'model.h5')
+    snapshot.write(path)
+    for saved, original in zip(load_model(path).get_weights(), expected):
+        np.testing.assert_array_equal(saved, original)
+
+
+@pytest.mark.skipif(not keras.__version__.startswith('2.2.'),
+                    reason='the training config is written in the layout of keras 2.2')
+def test_snapshot_restores_the_optimizer_state(tmp_path):
+    model = make_model().compile(lr=0.001)
+    rng = np.random.RandomState(0)
+    x = rng.randint(0, 256, (16,) + SPEC.shape).astype(np.uint8)
+    y = np.eye(4, dtype=np.float32)[rng.randint(4, size=16)]
+    model.get_model().fit(x, y, epochs=1, verbose=0)
+    path = str(tmp_path / 'model.h5')
+    model.snapshot().write(path)
+
+    saved_path = str(tmp_path / 'saved.h5')
+    model.get_model().save(saved_path)
+    assert_same_layout(path, saved_path)
+
+    loaded = load_model(path)
+    saved_state = keras.backend.batch_get_value(loaded.optimizer.weights)
+    state = keras.backend.batch_get_value(model.get_model().optimizer.weights)
+    assert len(saved_state) == len(state) > 0
+    for saved, original in zip(saved_state, state):
+        np.testing.assert_array_equal(saved, original)
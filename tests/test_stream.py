@@ -0,0 +1,61 @@
+from yuri.datasets import BatchStream, Manifest
+from yuri.observation import ObservationSpec
+
+import os
+
+import numpy as np
+import pytest
+
+SPEC = ObservationSpec(3, map_size=(6, 8))
+
+
+def make_stream(data_dir, workers=1, seed=0, **kwargs):
+    manifest = Manifest(data_dir).update()
+    return BatchStream(data_dir, manifest, None, SPEC, 4, 8, buffer_size=16, workers=workers,
+                       seed=seed, **kwargs)
+
+
+def take(stream, batches):
+    try:
+        return [next(stream) for _ in range(batches)]
+    finally:
+        stream.close()
+
+
+def test_batches_are_balanced_and_shaped(tmp_path, write_games):
+    data_dir = str(tmp_path)
+    write_games(data_dir, [f'game{i}' for i in range(6)], 40, SPEC.shape)
+    x, y = take(make_stream(data_dir, workers=2), 1)[0]
+    assert x.shape == (8,) + SPEC.shape and x.dtype == np.uint8
+    assert y.shape == (8, 4)
+    assert np.all(y.sum(axis=1) == 1)
+
+
+def test_seed_reproduces_batches_of_one_worker(tmp_path, write_games):
+    data_dir = str(tmp_path)
+    write_games(data_dir, [f'game{i}' for i in range(6)], 40, SPEC.shape)
+    first = take(make_stream(data_dir, seed=3), 10)
+    second = take(make_stream(data_dir, seed=3), 10)
+    for (x1, y1), (x2, y2) in zip(first, second):
+        assert np.array_equal(x1, x2)
+        assert np.array_equal(y1, y2)
+
+
+def test_undecodable_files_stop_the_stream(tmp_path, write_games):
+    data_dir = str(tmp_path)
+    write_games(data_dir, [f'game{i}' for i in range(3)], 20, SPEC.shape)
+    manifest = Manifest(data_dir).update()
+    for file in os.listdir(data_dir):
+        if file.endswith('.npy'):
+            with open(os.path.join(data_dir, file), 'wb') as f:
+                f.write(b'not a numpy file')
+    stream = BatchStream(data_dir, manifest, None, SPEC, 4, 8, workers=2, seed=0)
+    with pytest.raises(ValueError, match='in a row'):
+        take(stream, 1)
+
+
+def test_assembler_errors_reach_the_consumer(tmp_path, write_games):
+    data_dir = str(tmp_path)
+    write_games(data_dir, [f'game{i}' for i in range(3)], 20, (5, 5, 3))
+    with pytest.raises(ValueError, match='does not fit'):
+        take(make_stream(data_dir), 1)
@@ -1,3 +1,11 @@
+from .checkpoint import CheckpointManager
+from .cursor import TrainingCursor
+from ..datasets import BatchStream, ClassSampler, ColumnarDataset, Manifest, ParallelLoader, ShardedDataset
+from ..loggers import logger
+
+import numpy as np
+
+
 class BaseTrainer:
 
     def __init__(self):
@@ -7,21 +15,234 @@ class BaseTrainer:
         self.hm_epochs = 100
         self.epochs = 1
         self.increment = 200
+        self.num_choices = 0
+        self.stream = False
+        self.stream_buffer_size = 1024
+        self.stream_workers = 2
+        # 'balanced' draws every choice equally often, oversampling rare ones;
+        # 'truncate' cuts every choice down to the rarest one
+        self.sampling = 'balanced'
+        self.class_weights = None
+        # checkpoint policies, see CheckpointManager
+        self.checkpoint_minutes = None
+        self.keep_last = None
+        self.keep_best = False
+        self.checkpoints = None
+        self.cursor = TrainingCursor()
+        self.loader = None
         self.name = 'BaseTrainer'
 
     def prepare_model(self, model):
         """
-        create a basic cnn model or reload a model from path if reuse
+        create a basic cnn model or reload a model from path if reuse; a
+        reloaded model goes on training where its cursor says, with the
+        optimizer state it was saved with
         """
         if model is not None:
             self.load(model)
+            self.cursor = TrainingCursor.load(model)
+            if getattr(self.model.get_model(), 'optimizer', None) is not None:
+                return self
         else:
             self.model.init()
         self.model.compile(lr=self.learning_rate)
         return self
 
     def fit(self, x_train, y_train, x_test, y_test):
-        self.model.fit(x_train, y_train, x_test, y_test, self.epochs, self.batch_size)
+        """
+        x_train may be a BatchStream, which brings its own labels; y_train is
+        None then
+        """
+        if isinstance(x_train, BatchStream):
+            self.model.fit_generator(x_train, x_train.steps, x_test, y_test, self.epochs)
+        else:
+            self.model.fit(x_train, y_train, x_test, y_test, self.epochs, self.batch_size)
+        return self
+
+    def train_stream(self):
+        """
+        train on batches streamed from the training files; one pass over them
+        balanced in expectation is one epoch
+        """
+        stream = BatchStream(
+            self.train_data_dir, self.load_manifest(), self.render, self.spec,
+            self.num_choices, self.batch_size, test_size=self.test_size,
+            buffer_size=self.stream_buffer_size, workers=self.stream_workers,
+            seed=(self.cursor.seed + self.cursor.epoch) % 2 ** 32
+        )
+        logger.info(f'Streaming {len(stream.files)} files in {stream.steps} batches per epoch')
+        try:
+            while self.cursor.epoch < self.hm_epochs:
+                logger.debug(f'Epoch {self.cursor.epoch}')
+                self.fit(stream, None, stream.x_test, stream.y_test)
+                self.cursor.next_epoch()
+                self.checkpoint()
+        finally:
+            stream.close()
+
+    def train_data(self):
+        """
+        train on whatever train_data_dir holds: shards, a columnar dataset or
+        game files, streamed or in chunks
+        """
+        if ShardedDataset.is_sharded(self.train_data_dir):
+            self.train_shards(ShardedDataset(self.train_data_dir))
+        elif ColumnarDataset.is_columnar(self.train_data_dir):
+            self.train_columnar(ColumnarDataset(self.train_data_dir))
+        elif self.stream:
+            self.train_stream()
+        else:
+            self.train_files()
+
+    def train_files(self):
+        """
+        train on the game files increment files at a time; the cursor moves
+        past a chunk once it is fit
+        """
+        manifest = self.load_manifest()
+        self.loader = ParallelLoader(self.train_data_dir, manifest, self.spec, self.num_choices, self.workers)
+        try:
+            while self.cursor.epoch < self.hm_epochs:
+                all_files = self.cursor.order(manifest.valid_files())
+                logger.info(f'Training file num: {len(all_files)}, epoch {self.cursor.epoch}')
+
+                while self.cursor.offset < len(all_files):
+                    current = self.cursor.offset
+                    logger.debug(f'Model {id(self.model)} currently doing {current}:{current + self.increment}')
+                    files = all_files[current:current + self.increment]
+                    if not self.is_trainable(manifest, files):
+                        self.cursor.offset += self.increment
+                        continue
+
+                    frames, labels, _ = self.loader.load(files)
+                    self.fit_chunk(frames, labels)
+                    self.cursor.offset += self.increment
+                    self.checkpoint()
+                self.cursor.next_epoch()
+        finally:
+            self.loader.close()
+
+    def load_manifest(self):
+        """
+        index the training files, reading only those changed since last time
+        """
+        return Manifest(self.train_data_dir).update()
+
+    def is_trainable(self, manifest, files):
+        """
+        whether files hold enough samples to train on, known from the
+        manifest without opening them
+        """
+        if self.sampling == 'truncate':
+            balanced_length = manifest.balanced_length(files, self.num_choices)
+            if balanced_length * self.num_choices <= self.test_size:
+                logger.info(f'Skipping {len(files)} files holding {balanced_length} samples of every choice')
+                return False
+            return True
+        samples = int(manifest.counts(files).sum())
+        if samples <= self.test_size:
+            logger.info(f'Skipping {len(files)} files holding {samples} samples')
+            return False
+        return True
+
+    def split_indices(self, labels, num_choices):
+        """
+        draw the train and test indices of one epoch over labels
+        """
+        sampler = ClassSampler(labels, num_choices, self.cursor.rng)
+        logger.debug(f'Samples of every choice: {sampler.counts().tolist()}')
+        if self.sampling == 'truncate':
+            indices = sampler.truncated()
+            return indices[:-self.test_size], indices[-self.test_size:]
+        test_indices = sampler.hold_out(self.test_size)
+        return sampler.sample(self.class_weights), test_indices
+
+    def fit_indices(self, gather, train_indices, test_indices):
+        """
+        fit on the samples of train_indices, gathered one batch at a time by
+        gather(indices) -> x, y
+        """
+        x_test, y_test = gather(test_indices)
+        steps = int(np.ceil(len(train_indices) / self.batch_size))
+        logger.debug(f'{len(train_indices)} samples in {steps} batches')
+        self.model.fit_generator(
+            self.iterate_batches(gather, train_indices),
+            steps, x_test, y_test, self.epochs
+        )
+        return self
+
+    def fit_chunk(self, frames, labels):
+        """
+        fit on one chunk of frames and labels held in memory
+        """
+        train_indices, test_indices = self.split_indices(labels, self.num_choices)
+        if len(train_indices) == 0:
+            logger.info(f'Skipping a chunk of {len(labels)} samples')
+            return self
+        choice_arrays = np.eye(self.num_choices, dtype=np.float32)
+        return self.fit_indices(lambda indices: (frames[indices], choice_arrays[labels[indices]]),
+                                train_indices, test_indices)
+
+    def train_columnar(self, dataset):
+        """
+        train on a columnar dataset one batch at a time, drawing a new epoch of
+        indices every time
+        """
+        logger.info(f'Training on {len(dataset)} samples of {dataset.path}')
+        while self.cursor.epoch < self.hm_epochs:
+            train_indices, test_indices = self.split_indices(dataset.labels, dataset.num_choices)
+            if len(train_indices) == 0:
+                logger.error(f'Not enough samples to train on in {dataset.path}')
+                return
+            logger.debug(f'Epoch {self.cursor.epoch}')
+            self.fit_indices(lambda indices: dataset.get_batch(indices, self.spec),
+                             train_indices, test_indices)
+            self.cursor.next_epoch()
+            self.checkpoint()
+
+    def train_shards(self, dataset):
+        """
+        train on a sharded dataset shard by shard, like the file chunks; every
+        shard is read with one sequential pass
+        """
+        logger.info(f'Training on {len(dataset)} samples in {len(dataset.shards)} shards of {dataset.path}')
+        while self.cursor.epoch < self.hm_epochs:
+            order = self.cursor.order(range(len(dataset.shards)))
+            while self.cursor.offset < len(order):
+                shard = dataset.shards[order[self.cursor.offset]]
+                logger.debug(f'Epoch {self.cursor.epoch}: {shard.path}')
+                frames, _ = shard.get_batch(np.arange(len(shard)), self.spec)
+                self.fit_chunk(frames, np.array(shard.labels))
+                self.cursor.offset += 1
+                self.checkpoint()
+            self.cursor.next_epoch()
+
+    def iterate_batches(self, gather, indices):
+        while True:
+            for start in range(0, len(indices), self.batch_size):
+                yield gather(indices[start:start + self.batch_size])
+
+    def checkpoint(self, force=False):
+        """
+        hand the model to the checkpoint manager, which saves it in the
+        background if its policies ask for it
+        """
+        if self.checkpoints is None:
+            self.checkpoints = CheckpointManager(self.save_path, self.checkpoint_minutes,
+                                                 self.keep_last, self.keep_best)
+        self.checkpoints.save(self.model, self.model.val_accuracy(), force, self.cursor.to_dict())
+        return self
+
+    def close_checkpoints(self):
+        """
+        save what the policies skipped since the last checkpoint and wait
+        until every checkpoint is written
+        """
+        if self.checkpoints is None:
+            return self
+        self.checkpoints.flush(self.model, self.model.val_accuracy(), self.cursor.to_dict())
+        self.checkpoints.close()
+        self.checkpoints = None
         return self
 
     def save(self, save2path):
@@ -0,0 +1,151 @@
+from .cursor import TrainingCursor, cursor_path
+from ..loggers import logger
+
+import os
+import queue
+import shutil
+import threading
+import time
+
+
+def replace_with_link(src, dst):
+    """
+    point dst at the file src atomically; a hard link costs no write, a copy
+    is the fallback where links are not supported
+    """
+    tmp_path = f'{dst}.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        shutil.copyfile(src, tmp_path)
+    os.replace(tmp_path, dst)
+
+
+class CheckpointManager:
+    """
+    save model checkpoints without holding up training
+
+    save() only copies the weights out of the session; a writer thread
+    writes them to <save_path>.tmp and renames it into place, so a crash never
+    leaves a half written model behind. Policies:
+
+    every_minutes: skip saves until this many minutes passed since the last
+    keep_last: also keep the last k checkpoints as <save_path>-<number>
+    keep_best: also keep the one of best validation accuracy as
+    <save_path>-best; a new best is saved whatever every_minutes says
+
+    a training cursor given with a checkpoint is saved next to every copy of it
+
+    the first error of the writer thread is raised by the next save() or
+    close(), so a run never ends without its last checkpoint unnoticed
+    """
+
+    def __init__(self, save_path, every_minutes=None, keep_last=None, keep_best=False):
+        self.save_path = save_path
+        self.every_minutes = every_minutes
+        self.keep_last = keep_last
+        self.keep_best = keep_best
+        self.best_accuracy = None
+        self.last_save = None
+        self.skipped = False
+        self.number = 0
+        self.kept = list()
+        self.blocked_seconds = 0.0
+        self.error = None
+        # one snapshot waits while another is written, a third blocks save()
+        self.pending = queue.Queue(maxsize=1)
+        self.thread = threading.Thread(target=self.write_loop, daemon=True)
+        self.thread.start()
+
+    def is_due(self):
+        if self.every_minutes is None or self.last_save is None:
+            return True
+        return time.monotonic() - self.last_save >= self.every_minutes * 60
+
+    def save(self, model, accuracy=None, force=False, cursor=None):
+        """
+        snapshot model and the cursor dict if the policies ask for it; return
+        whether it did
+        """
+        self.raise_error()
+        start = time.monotonic()
+        best = self.keep_best and accuracy is not None and \
+            (self.best_accuracy is None or accuracy > self.best_accuracy)
+        if not (force or best or self.is_due()):
+            self.skipped = True
+            return False
+        if best:
+            self.best_accuracy = accuracy
+
+        self.number += 1
+        self.pending.put((self.number, model.snapshot(), cursor, best))
+        self.skipped = False
+        self.last_save = time.monotonic()
+        blocked = self.last_save - start
+        self.blocked_seconds += blocked
+        logger.info(f'Checkpoint {self.number} took {blocked:.2f}s of training, '
+                    f'{self.blocked_seconds:.1f}s in total')
+        return True
+
+    def flush(self, model, accuracy=None, cursor=None):
+        """
+        save model if the policies skipped it since the last checkpoint
+        """
+        if self.skipped:
+            return self.save(model, accuracy, force=True, cursor=cursor)
+        return False
+
+    def write_loop(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            number, snapshot, cursor, best = item
+            start = time.monotonic()
+            try:
+                self.write(number, snapshot, cursor, best)
+                logger.debug(f'Checkpoint {number} written to {self.save_path} '
+                             f'in {time.monotonic() - start:.2f}s')
+            except Exception as e:
+                logger.error(f'Checkpoint {number} not written to {self.save_path}: {e}')
+                if self.error is None:
+                    self.error = e
+
+    def raise_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def write(self, number, snapshot, cursor, best):
+        tmp_path = f'{self.save_path}.tmp'
+        snapshot.write(tmp_path)
+        os.replace(tmp_path, self.save_path)
+
+        paths = [self.save_path]
+        if best:
+            paths.append(f'{self.save_path}-best')
+        if self.keep_last:
+            paths.append(f'{self.save_path}-{number}')
+        for path in paths[1:]:
+            replace_with_link(self.save_path, path)
+        if cursor is not None:
+            for path in paths:
+                TrainingCursor.save(cursor, path)
+
+        if self.keep_last:
+            self.kept.append(paths[-1])
+            while len(self.kept) > self.keep_last:
+                path = self.kept.pop(0)
+                os.remove(path)
+                if os.path.exists(cursor_path(path)):
+                    os.remove(cursor_path(path))
+
+    def close(self):
+        """
+        wait for the pending checkpoints to be written and stop the writer
+        """
+        self.pending.put(None)
+        self.thread.join()
+        self.raise_error()
+        logger.info(f'{self.number} checkpoints took {self.blocked_seconds:.1f}s of training')
@@ -0,0 +1,82 @@
+from ..loggers import logger
+
+import os
+import json
+
+import numpy as np
+
+
+def cursor_path(model_path):
+    return f'{model_path}.cursor.json'
+
+
+class TrainingCursor:
+    """
+    where a training run stands: the epoch, the offset of the next chunk
+    in the order of that epoch, the seed of the file order and the state of
+    the RNG drawing samples; it is saved next to every checkpoint, so a run
+    resumed from one goes on where it stopped
+
+    the file order of an epoch depends only on the seed, the epoch and the
+    files, not on the order the directory is listed in
+    """
+
+    def __init__(self, seed=None, epoch=0, offset=0, rng_state=None):
+        self.seed = int(np.random.randint(2 ** 31)) if seed is None else seed
+        self.epoch = epoch
+        self.offset = offset
+        self.rng = np.random.RandomState(self.seed)
+        if rng_state is not None:
+            self.rng.set_state(rng_state)
+
+    def order(self, items):
+        """
+        the order to visit items in during the current epoch
+        """
+        items = sorted(items)
+        permutation = np.random.RandomState((self.seed + self.epoch) % 2 ** 32).permutation(len(items))
+        return [items[i] for i in permutation]
+
+    def next_epoch(self):
+        self.epoch += 1
+        self.offset = 0
+
+    def to_dict(self):
+        name, keys, pos, has_gauss, cached_gaussian = self.rng.get_state()
+        return {
+            'seed': self.seed,
+            'epoch': self.epoch,
+            'offset': self.offset,
+            'rng_state': [name, keys.tolist(), int(pos), int(has_gauss), float(cached_gaussian)]
+        }
+
+    @staticmethod
+    def from_dict(d):
+        name, keys, pos, has_gauss, cached_gaussian = d['rng_state']
+        rng_state = (name, np.array(keys, np.uint32), pos, has_gauss, cached_gaussian)
+        return TrainingCursor(d['seed'], d['epoch'], d['offset'], rng_state)
+
+    @staticmethod
+    def load(model_path):
+        """
+        the cursor saved with the model at model_path, a new one if there is
+        none, as for models saved before cursors were
+        """
+        path = cursor_path(model_path)
+        if not os.path.exists(path):
+            logger.info(f'No training cursor next to {model_path}, starting at epoch 0')
+            return TrainingCursor()
+        with open(path) as f:
+            cursor = TrainingCursor.from_dict(json.load(f))
+        logger.info(f'Resuming {model_path} at epoch {cursor.epoch}, offset {cursor.offset}')
+        return cursor
+
+    @staticmethod
+    def save(d, model_path):
+        """
+        write the cursor dict d next to the model at model_path
+        """
+        path = cursor_path(model_path)
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(d, f)
+        os.replace(f'{path}.tmp', path)